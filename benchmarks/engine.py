@@ -0,0 +1,231 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from typing import Dict, List, Any, Optional
+
+from pythongame.core.common import Millis
+from pythongame.core.sound_player import init_silent_sound_player
+from pythongame.register_game_data import register_all_game_data
+from pythongame.scenes_game.game_engine import GameEngine
+from pythongame.scenes_game.game_ui_view import InfoMessage
+from benchmarks.scenarios import SCENARIOS, CAMERA_SIZE, Scenario, get_all_entity_counts
+
+# Runs the synthetic stress scenarios (see scenarios.py) with a growing number of NPCs, and measures how long a frame of
+# the game engine takes (and optionally rendering the world into an offscreen surface). The results are printed and
+# saved as JSON, so that a run can be compared with one from another commit:
+#
+#   python -m benchmarks.engine --output before.json
+#   (make changes)
+#   python -m benchmarks.engine --compare before.json
+#
+# Allocations are measured in a separate run of frames with tracemalloc enabled, as it slows down everything else.
+
+SCREEN_SIZE = (800, 600)
+TIME_STEP = Millis(16)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--scenarios', nargs='*', default=list(SCENARIOS), choices=list(SCENARIOS))
+parser.add_argument('--sizes', nargs='*', type=int, default=[10, 100, 1000, 5000], help='numbers of NPCs')
+parser.add_argument('--frames', type=int, default=100, help='number of measured frames per scenario and size')
+parser.add_argument('--warmup-frames', type=int, default=20)
+parser.add_argument('--allocation-frames', type=int, default=20)
+parser.add_argument('--render', action='store_true', help='also render the world into an offscreen surface')
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--output', default='engine_benchmark.json')
+parser.add_argument('--compare', metavar='FILE', help='results from an earlier run to compare with')
+args = parser.parse_args()
+
+
+# Renders the world the same way as the playing scene, but into a surface that is never shown
+class OffscreenRenderer:
+    def __init__(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS
+        from pythongame.core.view.game_world_view import GameWorldView
+        from pythongame.core.view.image_loading import create_lazy_images_by_sprite, IMAGES_BY_SPRITE_MAX_NUM_BYTES
+        pygame.init()
+        # Images can only be converted to the screen's pixel format once there is a display mode
+        pygame.display.set_mode(SCREEN_SIZE)
+        surface = pygame.Surface(SCREEN_SIZE)
+        images_by_sprite = create_lazy_images_by_sprite(ENTITY_SPRITE_INITIALIZERS, IMAGES_BY_SPRITE_MAX_NUM_BYTES)
+        self.world_view = GameWorldView(surface, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
+
+    def render(self, game_state):
+        self.world_view.render_world(
+            all_entities_to_render=game_state.get_all_entities_to_render(),
+            walls_state=game_state.walls_state,
+            decorations_state=game_state.decorations_state,
+            player_entity=game_state.player_entity,
+            is_player_invisible=game_state.player_state.is_invisible,
+            player_active_buffs=game_state.player_state.active_buffs,
+            camera_world_area=game_state.get_camera_world_area_including_camera_shake(),
+            non_player_characters=game_state.non_player_characters,
+            visual_effects=game_state.visual_effects,
+            render_hit_and_collision_boxes=False,
+            player_health=game_state.player_state.health_resource.value,
+            player_max_health=game_state.player_state.health_resource.max_value,
+            entire_world_area=game_state.entire_world_area,
+            entity_action_text=None)
+
+
+def run_scenario(scenario_name: str, num_npcs: int, renderer: Optional[OffscreenRenderer]) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    start_time = time.perf_counter()
+    scenario: Scenario = SCENARIOS[scenario_name](num_npcs, rng)
+    game_state = scenario.game_state
+    game_engine = GameEngine(game_state, InfoMessage())
+    setup_ms = (time.perf_counter() - start_time) * 1000
+
+    def run_frame():
+        scenario.replenish()
+        game_engine.run_one_frame(TIME_STEP)
+        game_engine.info_message.notify_time_passed(TIME_STEP)
+
+    for _ in range(args.warmup_frames):
+        run_frame()
+        if renderer:
+            renderer.render(game_state)
+
+    engine_times = []
+    render_times = []
+    npc_activity_totals = {"active": 0, "dormant": 0, "sleeping": 0}
+    gc_collections_before = gc.get_stats()[0]["collections"]
+    for _ in range(args.frames):
+        scenario.replenish()
+        start_time = time.perf_counter()
+        game_engine.run_one_frame(TIME_STEP)
+        engine_times.append((time.perf_counter() - start_time) * 1000)
+        npc_activity_totals["active"] += game_engine.num_active_npcs
+        npc_activity_totals["dormant"] += game_engine.num_dormant_npcs
+        npc_activity_totals["sleeping"] += game_engine.num_sleeping_npcs
+        game_engine.info_message.notify_time_passed(TIME_STEP)
+        if renderer:
+            start_time = time.perf_counter()
+            renderer.render(game_state)
+            render_times.append((time.perf_counter() - start_time) * 1000)
+    gc_collections = gc.get_stats()[0]["collections"] - gc_collections_before
+    entity_counts = get_all_entity_counts(game_state)
+
+    # tracemalloc only keeps track of memory that is in use, so what is reported is how much memory a frame had
+    # allocated at most (on top of what was in use when it started), and how much of it was still in use at the end
+    peak_bytes = []
+    retained_bytes = []
+    tracemalloc.start()
+    for _ in range(args.allocation_frames):
+        scenario.replenish()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        game_engine.run_one_frame(TIME_STEP)
+        memory_after, memory_peak = tracemalloc.get_traced_memory()
+        peak_bytes.append(memory_peak - memory_before)
+        retained_bytes.append(memory_after - memory_before)
+    tracemalloc.stop()
+
+    result = {
+        "scenario": scenario_name,
+        "num_npcs": num_npcs,
+        "setup_ms": round(setup_ms, 1),
+        "engine_ms_per_frame": _summarize(engine_times),
+        "gc_collections_per_frame": round(gc_collections / args.frames, 3),
+        "allocated_kib_per_frame": round(statistics.mean(peak_bytes) / 1024, 2) if peak_bytes else None,
+        "retained_kib_per_frame": round(statistics.mean(retained_bytes) / 1024, 2) if retained_bytes else None,
+        "entity_counts": entity_counts,
+        "npcs_per_activity_tier": {tier: round(total / args.frames, 1) for tier, total in npc_activity_totals.items()},
+    }
+    if renderer:
+        result["render_ms_per_frame"] = _summarize(render_times)
+    return result
+
+
+def _summarize(times_ms: List[float]) -> Dict[str, float]:
+    times_ms = sorted(times_ms)
+    return {
+        "mean": round(statistics.mean(times_ms), 4),
+        "p50": round(times_ms[len(times_ms) // 2], 4),
+        "p99": round(times_ms[min(len(times_ms) - 1, int(len(times_ms) * 0.99))], 4),
+    }
+
+
+# For each scenario: the mean time per frame for each size, and how fast it grows between two sizes. An exponent of 1
+# means that the time grows linearly with the number of NPCs, and 0 that it doesn't grow at all.
+def get_scaling_curves(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    curves = {}
+    for scenario_name in args.scenarios:
+        points = [(r["num_npcs"], r["engine_ms_per_frame"]["mean"]) for r in results if r["scenario"] == scenario_name]
+        points.sort()
+        exponents = []
+        for (size_1, ms_1), (size_2, ms_2) in zip(points, points[1:]):
+            if ms_1 > 0 and ms_2 > 0 and size_2 > size_1:
+                exponents.append(round(math.log(ms_2 / ms_1) / math.log(size_2 / size_1), 2))
+        curves[scenario_name] = {"ms_per_frame": [[size, ms] for size, ms in points], "exponents": exponents}
+    return curves
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def print_comparison(results: List[Dict[str, Any]], previous_file_path: str):
+    with open(previous_file_path) as file:
+        previous = json.load(file)
+    previous_results = {(r["scenario"], r["num_npcs"]): r for r in previous["results"]}
+    print("Compared with " + previous_file_path + " (commit " + str(previous.get("commit")) + "):")
+    for result in results:
+        previous_result = previous_results.get((result["scenario"], result["num_npcs"]))
+        if previous_result is None:
+            continue
+        ms = result["engine_ms_per_frame"]["mean"]
+        previous_ms = previous_result["engine_ms_per_frame"]["mean"]
+        print("  {:<22}{:>6} NPCs: {:>9.3f}ms -> {:>9.3f}ms ({:+.0%})".format(
+            result["scenario"], result["num_npcs"], previous_ms, ms, ms / previous_ms - 1 if previous_ms else 0))
+
+
+def main():
+    register_all_game_data()
+    init_silent_sound_player()
+    renderer = OffscreenRenderer() if args.render else None
+
+    print("{:<22}{:>6}{:>12}{:>12}{:>12}{:>12}{:>10}".format(
+        "scenario", "NPCs", "ms (mean)", "ms (p99)", "render ms", "alloc KiB", "gc/frame"))
+    results = []
+    for scenario_name in args.scenarios:
+        for num_npcs in args.sizes:
+            result = run_scenario(scenario_name, num_npcs, renderer)
+            results.append(result)
+            render_ms = result["render_ms_per_frame"]["mean"] if renderer else None
+            print("{:<22}{:>6}{:>12.3f}{:>12.3f}{:>12}{:>12}{:>10}".format(
+                scenario_name, num_npcs, result["engine_ms_per_frame"]["mean"], result["engine_ms_per_frame"]["p99"],
+                "{:.3f}".format(render_ms) if render_ms is not None else "-", result["allocated_kib_per_frame"],
+                result["gc_collections_per_frame"]))
+
+    data = {
+        "commit": get_git_commit(),
+        "python": platform.python_version(),
+        "time_step": TIME_STEP,
+        "frames": args.frames,
+        "seed": args.seed,
+        "results": results,
+        "scaling": get_scaling_curves(results),
+    }
+    with open(args.output, 'w') as file:
+        json.dump(data, file, indent=1)
+    print("Results saved to " + args.output)
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+main()
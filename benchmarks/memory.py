@@ -0,0 +1,81 @@
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Any, Tuple
+
+from pythongame.core.common import HeroId
+from pythongame.core.entity_creation import set_global_path_finder, create_wall, create_decoration_entity, \
+    create_npc, create_item_on_ground, create_consumable_on_ground
+from pythongame.core.game_state import PackedDecorationBuckets
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+from pythongame.map_file import load_map_from_file
+from pythongame.register_game_data import register_all_game_data
+
+# Measures how much memory (as allocated by Python, using tracemalloc) the game state of a map takes, and how much
+# each kind of entity takes on average. Images, sounds and fonts are not included.
+
+CAMERA_SIZE = (800, 430)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map', default='map1.json')
+args = parser.parse_args()
+
+
+# Returns the result of the function, and the number of bytes that it allocated and that are still in use
+def measure(function: Callable[[], Any]) -> Tuple[Any, int]:
+    gc.collect()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - memory_before
+
+
+def load_and_pack_decorations(map_file_path: str):
+    game_state = load_map_from_file(CAMERA_SIZE, map_file_path, HeroId.MAGE).game_state
+    game_state.decorations_state.pack()
+    return game_state
+
+
+def print_per_entity(name: str, num_entities: int, num_bytes: int):
+    if num_entities > 0:
+        print("  {:<24}{:>6} x {:>5.0f} bytes = {:>7.0f} KiB".format(
+            name, num_entities, num_bytes / num_entities, num_bytes / 1024))
+
+
+def main():
+    register_all_game_data()
+    set_global_path_finder(GlobalPathFinder())
+    map_file_path = "resources/maps/" + args.map
+    # Loaded once before measuring, so that modules, caches etc are already in place
+    load_map_from_file(CAMERA_SIZE, map_file_path, HeroId.MAGE)
+
+    tracemalloc.start()
+    game_state, num_bytes = measure(lambda: load_map_from_file(CAMERA_SIZE, map_file_path, HeroId.MAGE).game_state)
+    print("Game state of " + args.map + ": {:.0f} KiB".format(num_bytes / 1024))
+    _, num_bytes = measure(lambda: load_and_pack_decorations(map_file_path))
+    print("Game state of " + args.map + ", with decorations packed (as when playing): {:.0f} KiB".format(
+        num_bytes / 1024))
+
+    # Entities are created anew from the ones in the map, and measured one kind at a time
+    walls = game_state.walls_state.walls
+    decorations = game_state.decorations_state.decoration_entities
+    npcs = game_state.non_player_characters
+    items = game_state.items_on_ground
+    consumables = game_state.consumables_on_ground
+    print("Per entity (including the list that holds them):")
+    print_per_entity("Walls", len(walls), measure(
+        lambda: [create_wall(w.wall_type, w.world_entity.get_position()) for w in walls])[1])
+    print_per_entity("Decorations", len(decorations), measure(
+        lambda: [create_decoration_entity(d.get_position(), d.sprite) for d in decorations])[1])
+    print_per_entity("Decorations (packed)", len(decorations), measure(
+        lambda: PackedDecorationBuckets(decorations, game_state.entire_world_area))[1])
+    print_per_entity("NPCs", len(npcs), measure(
+        lambda: [create_npc(n.npc_type, n.world_entity.get_position()) for n in npcs])[1])
+    print_per_entity("Items on ground", len(items), measure(
+        lambda: [create_item_on_ground(i.item_type, i.world_entity.get_position()) for i in items])[1])
+    print_per_entity("Consumables on ground", len(consumables), measure(
+        lambda: [create_consumable_on_ground(c.consumable_type, c.world_entity.get_position())
+                 for c in consumables])[1])
+
+
+main()
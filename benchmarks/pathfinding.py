@@ -0,0 +1,127 @@
+import argparse
+import random
+import time
+from collections import deque
+from typing import List, Tuple
+
+from pythongame.core.common import HeroId
+from pythongame.core.entity_creation import set_global_path_finder
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder, AStarStrategy, GridBasedAStar
+from pythongame.core.pathfinding.hierarchical_pathfinder import HierarchicalPathFinder
+from pythongame.core.pathfinding.jump_point_search import JumpPointSearch
+from pythongame.core.pathfinding.pathfinding_strategy import PathfindingStrategy
+from pythongame.core.pathfinding.wall_grid import WallGrid
+from pythongame.map_file import load_map_from_file
+from pythongame.register_game_data import register_all_game_data
+
+# Compares the pathfinding strategies that can be used by GlobalPathFinder, on random start/goal pairs from a map.
+#
+# "short" pairs are within the area that the (bounded) A* strategy searches. "long" pairs can be anywhere on the map.
+# For those, an unbounded A* is used as reference.
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map', default='map1.json')
+parser.add_argument('--searches', type=int, default=200)
+parser.add_argument('--agent-size', type=int, default=2, help='width and height of the agent, in cells')
+parser.add_argument('--seed', type=int, default=0)
+args = parser.parse_args()
+
+
+# A* without any bounds, to compare against on long paths
+class UnboundedAStarStrategy(PathfindingStrategy):
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        super().__init__(grid, agent_size)
+        self._astar = GridBasedAStar(grid, agent_size)
+        self._astar.set_pathfinding_bounds(0, 0, grid.width, grid.height)
+
+    def find_path(self, start_cell, goal_cell):
+        num_expanded_nodes_before = self._astar.num_expanded_nodes
+        result = self._astar.astar(start_cell, goal_cell)
+        self.num_expanded_nodes += self._astar.num_expanded_nodes - num_expanded_nodes_before
+        return list(result) if result is not None else None
+
+
+def find_connected_area(grid: WallGrid, agent_size: Tuple[int, int], rng: random.Random) -> List[Tuple[int, int]]:
+    clearance_map = grid.get_clearance_map(agent_size)
+    free_cells = [(x, y) for x in range(grid.width) for y in range(grid.height) if clearance_map[x * grid.height + y]]
+    # Pick the largest of a few connected areas, so that most goals are reachable
+    best_area = []
+    for _ in range(5):
+        start = rng.choice(free_cells)
+        area = {start}
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for cell in [(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)]:
+                if cell not in area and 0 <= cell[0] < grid.width and 0 <= cell[1] < grid.height \
+                        and clearance_map[cell[0] * grid.height + cell[1]]:
+                    area.add(cell)
+                    queue.append(cell)
+        if len(area) > len(best_area):
+            best_area = sorted(area)
+    return best_area
+
+
+def pick_pairs(area: List[Tuple[int, int]], num_pairs: int, max_distance: int, rng: random.Random):
+    area_set = set(area)
+    pairs = []
+    while len(pairs) < num_pairs:
+        start = rng.choice(area)
+        if max_distance is None:
+            goal = rng.choice(area)
+        else:
+            goal = (start[0] + rng.randint(-max_distance, max_distance),
+                    start[1] + rng.randint(-max_distance, max_distance))
+        if goal in area_set and goal != start:
+            pairs.append((start, goal))
+    return pairs
+
+
+def benchmark(name: str, strategy: PathfindingStrategy, pairs):
+    # Some strategies preprocess the grid the first time they're used. That is measured separately.
+    start_time = time.perf_counter()
+    strategy.find_path(*pairs[0])
+    preprocessing_ms = (time.perf_counter() - start_time) * 1000
+    strategy.num_expanded_nodes = 0
+
+    start_time = time.perf_counter()
+    num_found = 0
+    total_length = 0
+    for start, goal in pairs:
+        path = strategy.find_path(start, goal)
+        if path is not None:
+            num_found += 1
+            total_length += len(path) - 1
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    average_length = total_length / num_found if num_found else 0
+    print("  {:<20}found: {:>4}/{:<4} avg length: {:>6.1f}  nodes expanded: {:>9}  time: {:>8.1f}ms  "
+          "(first search: {:.1f}ms)".format(name, num_found, len(pairs), average_length, strategy.num_expanded_nodes,
+                                            elapsed_ms, preprocessing_ms))
+
+
+def main():
+    register_all_game_data()
+    rng = random.Random(args.seed)
+    set_global_path_finder(GlobalPathFinder())
+    map_data = load_map_from_file((800, 600), "resources/maps/" + args.map, HeroId.MAGE)
+    grid = map_data.game_state.pathfinder_wall_grid
+    agent_size = (args.agent_size, args.agent_size)
+    area = find_connected_area(grid, agent_size, rng)
+    print("Map: " + args.map + " (" + str(grid.width) + "x" + str(grid.height) + " cells), agent size: "
+          + str(agent_size) + ", searching within a connected area of " + str(len(area)) + " cells")
+
+    short_pairs = pick_pairs(area, args.searches, 15, rng)
+    print("Short paths:")
+    benchmark("A* (bounded)", AStarStrategy(grid, agent_size), short_pairs)
+    benchmark("Jump Point Search", JumpPointSearch(grid, agent_size), short_pairs)
+    benchmark("Hierarchical", HierarchicalPathFinder(grid, agent_size), short_pairs)
+
+    long_pairs = pick_pairs(area, args.searches, None, rng)
+    print("Long paths:")
+    benchmark("A* (bounded)", AStarStrategy(grid, agent_size), long_pairs)
+    benchmark("A* (unbounded)", UnboundedAStarStrategy(grid, agent_size), long_pairs)
+    benchmark("Jump Point Search", JumpPointSearch(grid, agent_size), long_pairs)
+    benchmark("Hierarchical", HierarchicalPathFinder(grid, agent_size), long_pairs)
+
+
+main()
@@ -0,0 +1,93 @@
+import argparse
+import os
+import random
+import time
+
+# Rendering is measured without opening a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from pythongame.core.common import HeroId, Millis
+from pythongame.core.entity_creation import set_global_path_finder
+from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+from pythongame.core.view.game_world_view import GameWorldView
+from pythongame.core.view.image_loading import create_lazy_images_by_sprite, IMAGES_BY_SPRITE_MAX_NUM_BYTES
+from pythongame.core.view.render_util import TRANSPARENT_SURFACE_POOL
+from pythongame.core.visual_effects import VisualParticleSystem
+from pythongame.map_file import load_map_from_file
+from pythongame.register_game_data import register_all_game_data
+
+# Measures how long it takes to render the game world around the player, with a number of particle systems (like the
+# ones from fireball explosions) active on the screen at all times. NPCs and other entities are left out, so that the
+# time is mostly spent on the particles.
+
+SCREEN_SIZE = (800, 600)
+CAMERA_SIZE = (800, 430)
+TIME_STEP = Millis(16)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--map', default='map1.json')
+parser.add_argument('--frames', type=int, default=1000)
+parser.add_argument('--particle-systems', type=int, default=20)
+parser.add_argument('--seed', type=int, default=0)
+args = parser.parse_args()
+
+
+def create_particle_system(camera_world_area, rng: random.Random) -> VisualParticleSystem:
+    position = (camera_world_area.x + rng.randint(50, camera_world_area.w - 50),
+                camera_world_area.y + rng.randint(50, camera_world_area.h - 50))
+    return VisualParticleSystem(num_particles=10, position=position,
+                                colors=[(250, 100, 100), (250, 50, 100), (250, 100, 50)], alpha=100,
+                                duration_interval=(Millis(50), Millis(200)), rng=rng)
+
+
+def main():
+    register_all_game_data()
+    rng = random.Random(args.seed)
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    images_by_sprite = create_lazy_images_by_sprite(ENTITY_SPRITE_INITIALIZERS, IMAGES_BY_SPRITE_MAX_NUM_BYTES)
+    world_view = GameWorldView(screen, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
+    set_global_path_finder(GlobalPathFinder())
+    game_state = load_map_from_file(CAMERA_SIZE, "resources/maps/" + args.map, HeroId.MAGE).game_state
+    world_view.prefetch_images(game_state.get_all_sprites())
+    game_state.center_camera_on_player()
+
+    particle_systems = []
+    num_created_surfaces_before = TRANSPARENT_SURFACE_POOL.num_created_surfaces
+    total_render_time = 0
+    for _ in range(args.frames):
+        # Expired particle systems are replaced, so that there is always the same number of them
+        particle_systems = [p for p in particle_systems if not p.has_expired]
+        while len(particle_systems) < args.particle_systems:
+            particle_systems.append(create_particle_system(game_state.camera_world_area, rng))
+        for particle_system in particle_systems:
+            particle_system.notify_time_passed(TIME_STEP)
+
+        start_time = time.perf_counter()
+        world_view.render_world(
+            all_entities_to_render=[game_state.player_entity],
+            walls_state=game_state.walls_state,
+            decorations_state=game_state.decorations_state,
+            player_entity=game_state.player_entity,
+            is_player_invisible=False,
+            player_active_buffs=[],
+            camera_world_area=game_state.camera_world_area,
+            non_player_characters=[],
+            visual_effects=particle_systems,
+            render_hit_and_collision_boxes=False,
+            player_health=game_state.player_state.health_resource.value,
+            player_max_health=game_state.player_state.health_resource.max_value,
+            entire_world_area=game_state.entire_world_area,
+            entity_action_text=None)
+        total_render_time += time.perf_counter() - start_time
+
+    num_created_surfaces = TRANSPARENT_SURFACE_POOL.num_created_surfaces - num_created_surfaces_before
+    print("Rendered " + str(args.frames) + " frames with " + str(args.particle_systems) + " particle systems")
+    print("Average render time: {:.3f}ms per frame".format(total_render_time / args.frames * 1000))
+    print("Surfaces created for transparent rectangles: " + str(num_created_surfaces))
+
+
+main()
@@ -0,0 +1,215 @@
+import math
+import random
+from typing import Callable, Dict, Tuple
+
+from pygame.rect import Rect
+
+from pythongame.core.buff_effects import get_buff_effect
+from pythongame.core.common import HeroId, NpcType, Millis, Direction, Sprite, WallType, ProjectileType, BuffType
+from pythongame.core.entity_creation import create_npc, create_hero_world_entity, create_player_state, create_wall, \
+    create_decoration_entity, set_global_path_finder
+from pythongame.core.game_state import GameState, WorldEntity, Projectile, NonPlayerCharacter
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+from pythongame.core.projectile_controllers import create_projectile_controller
+from pythongame.core.visual_effects import VisualCircle, VisualRect, VisualParticleSystem, create_visual_damage_text
+
+# Synthetic game states for stress testing the engine. Entities are created with entity_creation, like when a map is
+# loaded, but they're placed randomly in a world that grows with the number of NPCs (so that the NPC density, and the
+# number of NPCs close to the camera, stays about the same as in the real maps).
+#
+# A scenario keeps its load constant while it's running: NPCs that die, projectiles and buffs that expire etc are
+# replaced in between frames (see Scenario.replenish), so that every measured frame does the same amount of work.
+
+CAMERA_SIZE = (800, 430)
+CELL_SIZE = 32
+# World area per NPC, in pixels. Roughly what the story map has.
+AREA_PER_NPC = 200 * 200
+# NPCs are not placed this close to the player, so that they don't all attack it on the first frame
+PLAYER_CLEARANCE = 150
+ENEMY_TYPES = [NpcType.RAT_1, NpcType.RAT_2, NpcType.GOBLIN_WORKER, NpcType.GOBLIN_SPEARMAN, NpcType.GOBLIN_WARLOCK,
+               NpcType.ZOMBIE, NpcType.MUMMY, NpcType.NECROMANCER, NpcType.ICE_WITCH, NpcType.DARK_REAPER,
+               NpcType.VETERAN, NpcType.WARRIOR]
+PROJECTILES = [(ProjectileType.PLAYER_FIREBALL, Sprite.PROJECTILE_PLAYER_FIREBALL, (28, 28), 0.3),
+               (ProjectileType.PLAYER_WHIRLWIND, Sprite.PROJECTILE_PLAYER_WHIRLWIND, (140, 110), 0.1)]
+NPC_BUFFS = [BuffType.BURNT_BY_FIREBALL, BuffType.REDUCED_MOVEMENT_SPEED, BuffType.DEBUFFED_BY_GOATS_RING]
+PLAYER_BUFFS = [BuffType.HEALING_OVER_TIME, BuffType.INCREASED_MOVE_SPEED]
+BUFF_DURATION = Millis(10_000)
+DECORATION_SPRITES = [Sprite.DECORATION_GROUND_STONE, Sprite.DECORATION_GROUND_STONE_GRAY, Sprite.DECORATION_PLANT]
+
+
+class Scenario:
+    def __init__(self, game_state: GameState, num_npcs: int, rng: random.Random):
+        self.game_state = game_state
+        self.num_npcs = num_npcs
+        self.rng = rng
+
+    # Called before each frame, and not included in the measured time
+    def replenish(self):
+        game_state = self.game_state
+        # The player would eventually die when surrounded by thousands of enemies
+        game_state.player_state.health_resource.gain_to_max()
+        num_missing_npcs = self.num_npcs - get_num_npcs(game_state)
+        for _ in range(num_missing_npcs):
+            self.on_npc_added(_add_random_npc(game_state, self.rng))
+
+    def on_npc_added(self, npc: NonPlayerCharacter):
+        pass
+
+
+class ProjectilesScenario(Scenario):
+    def replenish(self):
+        super().replenish()
+        game_state = self.game_state
+        while len(game_state.projectile_entities) < self.num_npcs:
+            projectile_type, sprite, size, speed = self.rng.choice(PROJECTILES)
+            entity = WorldEntity(_random_position(game_state, self.rng), size, sprite,
+                                 self.rng.choice(list(Direction)), speed)
+            game_state.add_projectile(Projectile(entity, create_projectile_controller(projectile_type)))
+
+
+class BuffsScenario(Scenario):
+    def replenish(self):
+        super().replenish()
+        player_state = self.game_state.player_state
+        active_player_buffs = [b.buff_effect.get_buff_type() for b in player_state.active_buffs]
+        for buff_type in PLAYER_BUFFS:
+            if buff_type not in active_player_buffs:
+                player_state.gain_buff_effect(get_buff_effect(buff_type), BUFF_DURATION)
+
+    def on_npc_added(self, npc: NonPlayerCharacter):
+        for buff_type in NPC_BUFFS:
+            npc.gain_buff_effect(get_buff_effect(buff_type), BUFF_DURATION)
+
+
+class VisualEffectsScenario(Scenario):
+    def replenish(self):
+        super().replenish()
+        game_state = self.game_state
+        npcs = game_state.non_player_characters
+        # About as many effects are created per frame as when the player is fighting a group of enemies, for every
+        # 20 NPCs in the world
+        for _ in range(max(1, self.num_npcs // 20)):
+            npc = self.rng.choice(npcs)
+            position = npc.world_entity.get_center_position()
+            effect_type = self.rng.randrange(4)
+            if effect_type == 0:
+                effect = VisualCircle((250, 100, 50), position, 22, 45, Millis(100), 0)
+            elif effect_type == 1:
+                effect = VisualRect((250, 250, 50), position, 50, 100, Millis(200), 2, npc.world_entity)
+            elif effect_type == 2:
+                effect = create_visual_damage_text(npc.world_entity, self.rng.randint(1, 20), game_state.random)
+            else:
+                effect = VisualParticleSystem(num_particles=10, position=position,
+                                              colors=[(250, 100, 100), (250, 50, 100), (250, 100, 50)], alpha=100,
+                                              duration_interval=(Millis(50), Millis(200)), rng=game_state.random)
+            game_state.visual_effects.append(effect)
+
+
+def create_npcs_scenario(num_npcs: int, rng: random.Random) -> Scenario:
+    return Scenario(create_game_state(num_npcs, rng, [], []), num_npcs, rng)
+
+
+def create_projectiles_scenario(num_npcs: int, rng: random.Random) -> Scenario:
+    return ProjectilesScenario(create_game_state(num_npcs, rng, [], []), num_npcs, rng)
+
+
+# Walls are placed on the grid, like in the map editor. They also make the pathfinding of the NPCs more expensive.
+def create_walls_and_decorations_scenario(num_npcs: int, rng: random.Random) -> Scenario:
+    world_area = _get_world_area(num_npcs)
+    player_position = world_area.center
+    walls = []
+    wall_positions = set()
+    for _ in range(num_npcs):
+        position = _random_position_in_area(world_area, rng, player_position)
+        position = (position[0] - position[0] % CELL_SIZE, position[1] - position[1] % CELL_SIZE)
+        if position not in wall_positions:
+            wall_positions.add(position)
+            walls.append(create_wall(WallType.WALL, position))
+    decorations = [create_decoration_entity(_random_position_in_area(world_area, rng, None),
+                                            rng.choice(DECORATION_SPRITES))
+                   for _ in range(num_npcs * 4)]
+    return Scenario(create_game_state(num_npcs, rng, walls, decorations), num_npcs, rng)
+
+
+def create_buffs_scenario(num_npcs: int, rng: random.Random) -> Scenario:
+    scenario = BuffsScenario(create_game_state(num_npcs, rng, [], []), num_npcs, rng)
+    for npc in scenario.game_state.non_player_characters:
+        scenario.on_npc_added(npc)
+    return scenario
+
+
+def create_visual_effects_scenario(num_npcs: int, rng: random.Random) -> Scenario:
+    return VisualEffectsScenario(create_game_state(num_npcs, rng, [], []), num_npcs, rng)
+
+
+SCENARIOS: Dict[str, Callable[[int, random.Random], Scenario]] = {
+    "npcs": create_npcs_scenario,
+    "projectiles": create_projectiles_scenario,
+    "walls_and_decorations": create_walls_and_decorations_scenario,
+    "buffs": create_buffs_scenario,
+    "visual_effects": create_visual_effects_scenario,
+}
+
+
+def create_game_state(num_npcs: int, rng: random.Random, walls, decorations) -> GameState:
+    world_area = _get_world_area(num_npcs)
+    hero_id = HeroId.MAGE
+    player_entity = create_hero_world_entity(hero_id, world_area.center)
+    # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
+    path_finder = GlobalPathFinder()
+    set_global_path_finder(path_finder)
+    game_state = GameState(player_entity=player_entity, consumables_on_ground=[], items_on_ground=[],
+                           money_piles_on_ground=[], non_player_characters=[], walls=walls, camera_size=CAMERA_SIZE,
+                           entire_world_area=world_area, player_state=create_player_state(hero_id),
+                           decoration_entities=decorations, portals=[], chests=[])
+    path_finder.set_grid(game_state.pathfinder_wall_grid)
+    game_state.random.seed(rng.randrange(2 ** 32))
+    for _ in range(num_npcs):
+        _add_random_npc(game_state, rng)
+    game_state.center_camera_on_player()
+    return game_state
+
+
+def _get_world_area(num_npcs: int) -> Rect:
+    side = max(CAMERA_SIZE[0], int(math.sqrt(num_npcs * AREA_PER_NPC)))
+    side -= side % CELL_SIZE
+    return Rect(0, 0, side, side)
+
+
+def _add_random_npc(game_state: GameState, rng: random.Random) -> NonPlayerCharacter:
+    position = _random_position_in_area(game_state.entire_world_area, rng, game_state.player_entity.get_position())
+    npc = create_npc(rng.choice(ENEMY_TYPES), position)
+    game_state.add_non_player_character(npc)
+    return npc
+
+
+def _random_position(game_state: GameState, rng: random.Random) -> Tuple[int, int]:
+    return _random_position_in_area(game_state.entire_world_area, rng, None)
+
+
+def _random_position_in_area(area: Rect, rng: random.Random, avoid_position) -> Tuple[int, int]:
+    while True:
+        position = (rng.randrange(area.x, area.right - 50), rng.randrange(area.y, area.bottom - 50))
+        if avoid_position is None or abs(position[0] - avoid_position[0]) > PLAYER_CLEARANCE \
+                or abs(position[1] - avoid_position[1]) > PLAYER_CLEARANCE:
+            return position
+
+
+# Including the NPCs that the game engine has moved out of the game state, into inactive world regions far away from the
+# camera (see WorldRegions)
+def get_num_npcs(game_state: GameState) -> int:
+    num_npcs = len(game_state.non_player_characters)
+    if game_state.world_regions:
+        num_npcs += game_state.world_regions.get_num_inactive_npcs()
+    return num_npcs
+
+
+def get_all_entity_counts(game_state: GameState) -> Dict[str, int]:
+    return {
+        "npcs": get_num_npcs(game_state),
+        "active_npcs": len(game_state.non_player_characters),
+        "projectiles": len(game_state.projectile_entities),
+        "walls": len(game_state.walls_state.walls),
+        "visual_effects": len(game_state.visual_effects),
+        "npc_buffs": sum(len(npc.active_buffs) for npc in game_state.non_player_characters),
+    }
@@ -0,0 +1,50 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+# Measures how long it takes to start some of the game's scripts, and which modules take the most time to import
+# (using Python's "-X importtime" option). Each script is run to completion, so it should be one that exits by itself.
+
+parser = argparse.ArgumentParser()
+parser.add_argument('scripts', nargs='*', default=['print_items.py', 'print_enemies.py', 'print_abilities.py'])
+parser.add_argument('--runs', type=int, default=5)
+parser.add_argument('--top', type=int, default=10, help='number of slowest modules to list for each script')
+args = parser.parse_args()
+
+
+# Returns the wall time in seconds, and (module, self time in microseconds) for each imported module
+def run_script(script: str) -> Tuple[float, List[Tuple[str, int]]]:
+    start_time = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", script], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    elapsed = time.perf_counter() - start_time
+    if result.returncode != 0:
+        raise Exception("Failed to run " + script + ":\n" + result.stderr)
+    import_times = []
+    # Lines look like this: "import time:       123 |        456 |     some.module"
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("| imported package"):
+            self_time, _, module = line[len("import time:"):].split("|")
+            import_times.append((module.strip(), int(self_time)))
+    return elapsed, import_times
+
+
+def main():
+    for script in args.scripts:
+        wall_times = []
+        import_times = []
+        for _ in range(args.runs):
+            wall_time, import_times = run_script(script)
+            wall_times.append(wall_time)
+        total_import_ms = sum([t for _, t in import_times]) / 1000
+        game_modules = [m for m, _ in import_times if m.startswith("pythongame")]
+        print(script + ": {:.0f}ms (median of {} runs), imports: {:.0f}ms, {} modules ({} from pythongame)".format(
+            statistics.median(wall_times) * 1000, args.runs, total_import_ms, len(import_times), len(game_modules)))
+        for module, self_time in sorted(import_times, key=lambda x: -x[1])[:args.top]:
+            print("  {:>8.1f}ms  {}".format(self_time / 1000, module))
+
+
+main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+from pythongame.core.lazy_game_data import build_game_data_manifest, GAME_DATA_MANIFEST_FILE, REGISTRIES
+from pythongame.register_game_data import REGISTER_FUNCTIONS
+
+# Records which register function registers each entry of game data, so that tools (like print_items.py) only need to
+# import and register the game data that they look up. Run it again after changing any of the game data. (If the game
+# data has changed since the manifest was built, all of it is registered at once, so nothing is missing if you forget.)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--output-file', default=GAME_DATA_MANIFEST_FILE)
+args = parser.parse_args()
+
+
+def main():
+    start_time = time.perf_counter()
+    build_game_data_manifest(REGISTER_FUNCTIONS, args.output_file)
+    num_entries = sum([dict.__len__(registry) for registry in REGISTRIES.values()])
+    print("Recorded " + str(num_entries) + " entries from " + str(len(REGISTER_FUNCTIONS)) + " register functions in "
+          + args.output_file + " ({:.0f}ms)".format((time.perf_counter() - start_time) * 1000))
+
+
+main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import time
+
+# Images are converted to the screen's pixel format, which requires a display (but not a window)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, UI_ICON_SPRITE_PATHS, PORTRAIT_ICON_SPRITE_PATHS
+from pythongame.core.view.image_loading import get_image_recipes_for_sprites, get_image_recipes_for_icons, \
+    load_images
+from pythongame.core.view.sprite_atlas import SpriteAtlas, SPRITE_ATLAS_DIR
+from pythongame.map_editor.map_editor_ui_view import MAP_EDITOR_UI_ICON_SIZE
+from pythongame.register_game_data import register_all_game_data
+from pythongame.scenes_game.game_ui_view import UI_ICON_SIZE, UI_ICON_BIG_SIZE, PORTRAIT_ICON_SIZE
+
+# Packs all images that are used by the game and the map editor into a sprite atlas, which makes the game start
+# faster. Run it again after changing any of the images. (Images that have changed since the atlas was built are
+# loaded from their files instead, so the game still looks right if you forget.)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--output-dir', default=SPRITE_ATLAS_DIR)
+args = parser.parse_args()
+
+
+def main():
+    register_all_game_data()
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    start_time = time.perf_counter()
+    recipes = get_image_recipes_for_sprites(ENTITY_SPRITE_INITIALIZERS) \
+              + get_image_recipes_for_icons(UI_ICON_SPRITE_PATHS, UI_ICON_SIZE) \
+              + get_image_recipes_for_icons(UI_ICON_SPRITE_PATHS, UI_ICON_BIG_SIZE) \
+              + get_image_recipes_for_icons(UI_ICON_SPRITE_PATHS, MAP_EDITOR_UI_ICON_SIZE) \
+              + get_image_recipes_for_icons(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+    images_by_recipe = load_images(recipes)
+    SpriteAtlas.build(images_by_recipe, args.output_dir)
+    print("Packed " + str(len(images_by_recipe)) + " images into " + args.output_dir +
+          " ({:.0f}ms)".format((time.perf_counter() - start_time) * 1000))
+
+
+main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+from pathlib import Path
+
+from pythongame.map_file import MapBinary, BINARY_MAP_FILE_EXTENSION, write_json_to_file
+
+# Converts map files between the JSON format and the compact binary format. JSON maps are converted to binary, and
+# binary maps back to JSON (so that they can be read and edited).
+#
+# Example: ./convert_map.py resources/maps/*.json
+
+parser = argparse.ArgumentParser()
+parser.add_argument('map_files', nargs='+')
+parser.add_argument('--output-dir', help='where to put the converted files (default: next to each input file)')
+args = parser.parse_args()
+
+
+def convert(map_file_path: Path):
+    file_contents = map_file_path.read_bytes()
+    output_dir = Path(args.output_dir) if args.output_dir else map_file_path.parent
+    if MapBinary.is_binary_map(file_contents):
+        output_path = output_dir / (map_file_path.stem + ".json")
+        write_json_to_file(MapBinary.deserialize_to_json(file_contents), str(output_path))
+    else:
+        output_path = output_dir / (map_file_path.stem + BINARY_MAP_FILE_EXTENSION)
+        output_path.write_bytes(MapBinary.serialize_from_json(json.loads(file_contents)))
+    print("%s (%i bytes) -> %s (%i bytes)" % (map_file_path, len(file_contents), output_path,
+                                              output_path.stat().st_size))
+
+
+for path in args.map_files:
+    convert(Path(path))
@@ -14,8 +14,6 @@ from pythongame.core.game_state import DecorationEntity, Wall
 from pythongame.map_file import MapJson, write_json_to_file
 from pythongame.register_game_data import register_all_game_data
 
-register_all_game_data()
-
 MAX_ROOM_ATTEMPTS = 100
 MAX_NUM_ROOMS = 15
 ROOM_ALLOWED_WIDTH = (8, 25)
@@ -327,6 +325,7 @@ def generate_npcs(rooms: List[Rect], start_room: Rect):
 
 
 def main():
+    register_all_game_data()
     grid, rooms = generate_random_grid()
     json = generate_random_map_as_json_from_grid(grid, rooms)
     write_json_to_file(json, "resources/maps/dudmap.json")
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from pythongame.core.common import AbilityType
 from pythongame.core.game_data import ABILITIES
-from pythongame.register_game_data import register_all_game_data
 
 
 def print_abilities():
@@ -10,5 +9,4 @@ def print_abilities():
         print("{:<25}".format(ability_type.name) + str(ability_data.description))
 
 
-register_all_game_data()
 print_abilities()
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from pythongame.core.common import NpcType
 from pythongame.core.game_data import NON_PLAYER_CHARACTERS, NpcCategory
-from pythongame.register_game_data import register_all_game_data
 
 
 def print_enemies():
@@ -17,5 +16,4 @@ def print_line(name, health, exp, speed):
     print("{:<25}".format(name) + "{:<8}".format(health) + "{:<8}".format(speed) + "{:<8}".format(exp))
 
 
-register_all_game_data()
 print_enemies()
@@ -2,7 +2,6 @@
 
 from pythongame.core.game_data import ITEMS
 from pythongame.core.item_inventory import ItemEquipmentCategory
-from pythongame.register_game_data import register_all_game_data
 
 
 def items_with_category(category):
@@ -19,5 +18,4 @@ def print_items():
         print("")
 
 
-register_all_game_data()
 print_items()
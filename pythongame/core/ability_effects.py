@@ -2,6 +2,7 @@ from typing import Dict
 
 from pythongame.core.common import *
 from pythongame.core.game_state import GameState
+from pythongame.core.lazy_game_data import LazyRegistry
 
 
 class AbilityResult:
@@ -18,7 +19,7 @@ class AbilityWasUsedSuccessfully(AbilityResult):
         self.should_regain_mana_and_cd = should_regain_mana_and_cd
 
 
-_ability_effects: Dict[AbilityType, Callable[[GameState], AbilityResult]] = {}
+_ability_effects: Dict[AbilityType, Callable[[GameState], AbilityResult]] = LazyRegistry("ability_effects")
 
 
 # Effect function should return True if ability was used successfully
@@ -2,6 +2,7 @@ from typing import Dict, Type, Union
 
 from pythongame.core.common import *
 from pythongame.core.game_state import GameState, WorldEntity, NonPlayerCharacter, Event, BuffEventOutcome
+from pythongame.core.lazy_game_data import LazyRegistry
 
 
 class AbstractBuffEffect:
@@ -18,6 +19,10 @@ class AbstractBuffEffect:
     def get_buff_type(self):
         raise Exception("This method needs to be overridden")
 
+    # Events are only passed to buff_handle_event if their type is returned here
+    def get_handled_event_types(self) -> List[type]:
+        return []
+
     def buff_handle_event(self, event: Event) -> Optional[BuffEventOutcome]:
         return None
 
@@ -40,7 +45,7 @@ class StatModifyingBuffEffect(AbstractBuffEffect):
         return self.buff_type
 
 
-_buff_effects: Dict[BuffType, Type[AbstractBuffEffect]] = {}
+_buff_effects: Dict[BuffType, Type[AbstractBuffEffect]] = LazyRegistry("buff_effects")
 
 
 def register_buff_effect(buff_type: BuffType, effect: Type[AbstractBuffEffect]):
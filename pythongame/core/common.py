@@ -1,25 +1,84 @@
 import random
 from enum import Enum
-from typing import NewType, Optional, Any, List, Callable
+from typing import NewType, Optional, Any, List, Callable, Dict, Sequence
 
 Millis = NewType('Millis', int)
 
 PLAYER_ENTITY_SIZE = (30, 30)
 
 
+# Stands in for "no value" in Observable, as None is a value that observers can be notified about
+_NO_VALUE = object()
+
+
+# With only_on_change, observers are not notified about a value that is equal to the one they were last notified about.
+# (Don't use it for values that are changed in place, like lists.)
+#
+# With coalesce, observers are notified once at the end of the frame (see FrameNotifications), about the last value of
+# the frame. It's meant for values that change often (maybe several times per frame) but that are only shown in the UI.
 class Observable:
-    def __init__(self):
+    def __init__(self, only_on_change: bool = False, coalesce: bool = False):
         self._observers: List[Callable[[Any], Any]] = []
+        self._only_on_change = only_on_change
+        self._coalesce = coalesce
+        self._last_value = _NO_VALUE
+        self._pending_value = _NO_VALUE
+        # How many times notify() was called, and how many times the observers were actually notified
+        self.num_notify_calls = 0
+        self.num_notifications = 0
 
     def register_observer(self, observer: Callable[[Any], Any]):
         self._observers.append(observer)
 
     def notify(self, event):
+        self.num_notify_calls += 1
+        if not self._observers:
+            return
+        if self._coalesce:
+            if self._pending_value is _NO_VALUE:
+                FRAME_NOTIFICATIONS.add(self)
+            self._pending_value = event
+        else:
+            self._notify_observers(event)
+
+    def notify_pending(self):
+        event = self._pending_value
+        if event is not _NO_VALUE:
+            self._pending_value = _NO_VALUE
+            self._notify_observers(event)
+
+    def _notify_observers(self, event):
+        if self._only_on_change:
+            if event == self._last_value:
+                return
+            self._last_value = event
+        self.num_notifications += 1
         for observer in self._observers:
             # print("DEBUG Notifying observer " + str(observer) + ": " + str(event))
             observer(event)
 
 
+# Keeps the coalescing observables that have been notified during the frame, until their observers are notified at the
+# end of it (before it's rendered)
+class FrameNotifications:
+    def __init__(self):
+        self._observables: List[Observable] = []
+
+    def add(self, observable: Observable):
+        self._observables.append(observable)
+
+    def notify_all(self):
+        while self._observables:
+            # Observers may in turn notify other observables
+            observables = self._observables
+            self._observables = []
+            for observable in observables:
+                observable.notify_pending()
+
+
+FRAME_NOTIFICATIONS = FrameNotifications()
+
+
 class SceneId(Enum):
     STARTING_PROGRAM = 1
     PICKING_HERO = 2
@@ -676,6 +735,11 @@ class AbstractScene:
     def run_one_frame(self, _time_passed: Millis) -> Optional[SceneTransition]:
         pass
 
+    # Called before render(), with how far (0 to 1) the simulation has come from the last call to run_one_frame
+    # towards the next one. Scenes where things move can use it to render them in between simulation ticks.
+    def set_render_interpolation(self, _ratio: float):
+        pass
+
     def render(self):
         pass
 
@@ -686,12 +750,40 @@ class Event:
     pass
 
 
+# Keeps track of which subscribers (buffs, items, upgrades) handle which types of events, so that an event is only
+# dispatched to the ones that handle it. Events are looked up by their exact class.
+class EventBus:
+    def __init__(self):
+        self._subscribers: Dict[type, List[Any]] = {}
+
+    # The lists are replaced rather than changed, so that subscriptions can change while an event is being dispatched
+    def subscribe(self, subscriber: Any, event_types: List[type]):
+        for event_type in event_types:
+            self._subscribers[event_type] = self._subscribers.get(event_type, []) + [subscriber]
+
+    def unsubscribe(self, subscriber: Any, event_types: List[type]):
+        for event_type in event_types:
+            subscribers = list(self._subscribers.get(event_type, []))
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+                if subscribers:
+                    self._subscribers[event_type] = subscribers
+                else:
+                    del self._subscribers[event_type]
+
+    def get_subscribers(self, event_type: type) -> Sequence[Any]:
+        return self._subscribers.get(event_type, ())
+
+
 class HeroUpgrade:
 
     def __init__(self, hero_upgrade_id: HeroUpgradeId):
         self._hero_upgrade_id = hero_upgrade_id
 
-    # Override this method for upgrades that need to actively handle events
+    # Override these methods for upgrades that need to actively handle events
+    def get_handled_event_types(self) -> List[type]:
+        return []
+
     def handle_event(self, event: Event, game_state: Any):
         pass
 
@@ -2,6 +2,7 @@ from typing import Dict
 
 from pythongame.core.common import *
 from pythongame.core.game_state import GameState
+from pythongame.core.lazy_game_data import LazyRegistry
 from pythongame.core.visual_effects import VisualCircle
 
 
@@ -25,7 +26,8 @@ def create_potion_visual_effect_at_player(game_state):
         game_state.player_entity))
 
 
-_consumable_effects: Dict[ConsumableType, Callable[[GameState], AbstractConsumableResult]] = {}
+_consumable_effects: Dict[ConsumableType, Callable[[GameState], AbstractConsumableResult]] = LazyRegistry(
+    "consumable_effects")
 
 
 def register_consumable_effect(consumable_type: ConsumableType,
@@ -34,9 +34,10 @@ def deal_player_damage_to_enemy(game_state: GameState, npc: NonPlayerCharacter,
     if npc.invulnerable:
         return False
     health_lost_integer = npc.health_resource.lose(amount)
+    game_state.may_have_dead_npcs = True
     game_state.player_state.notify_about_event(PlayerDamagedEnemy(npc, damage_source), game_state)
     game_state.visual_effects.append(
-        create_visual_damage_text(npc.world_entity, health_lost_integer, emphasis=visual_emphasis))
+        create_visual_damage_text(npc.world_entity, health_lost_integer, game_state.random, emphasis=visual_emphasis))
     health_from_life_steal = player_state.life_steal_ratio * amount
     player_receive_healing(health_from_life_steal, game_state)
     return True
@@ -52,22 +53,24 @@ def deal_damage_to_player(game_state: GameState, base_amount: float, damage_type
     if damage_type == DamageType.PHYSICAL:
         dodge_chance = player_state.get_effective_dodge_chance()
         block_chance = player_state.get_effective_block_chance()
-        if random.random() < dodge_chance:
-            game_state.visual_effects.append(create_visual_dodge_text(game_state.player_entity))
+        if game_state.random.random() < dodge_chance:
+            game_state.visual_effects.append(create_visual_dodge_text(game_state.player_entity, game_state.random))
             play_sound(SoundId.ENEMY_ATTACK_WAS_DODGED)
             return
-        elif random.random() < block_chance:
+        elif game_state.random.random() < block_chance:
             if player_state.block_damage_reduction > 0:
-                game_state.visual_effects.append(create_visual_block_text(game_state.player_entity))
+                game_state.visual_effects.append(create_visual_block_text(game_state.player_entity, game_state.random))
             damage_reduction += player_state.block_damage_reduction
             player_state.notify_about_event(PlayerBlockedEvent(npc_attacker), game_state)
         # Armor has a random element to it. Example: 5 armor absorbs 0-5 damage
-        damage_reduction += random.randint(0, player_state.get_effective_armor())
+        damage_reduction += game_state.random.randint(0, player_state.get_effective_armor())
     amount = max(0.0, base_amount - damage_reduction)
     health_lost_integer = player_state.health_resource.lose(amount)
     if health_lost_integer > 0:
-        game_state.visual_effects.append(create_visual_damage_text(game_state.player_entity, health_lost_integer))
+        game_state.visual_effects.append(
+            create_visual_damage_text(game_state.player_entity, health_lost_integer, game_state.random))
         play_sound(SoundId.ENEMY_ATTACK)
+        # This only decides which sounds are played, so it doesn't need to use the game state's random generator
         if random.random() < 0.3:
             play_sound(SoundId.PLAYER_PAIN)
         player_state.notify_about_event(PlayerLostHealthEvent(health_lost_integer, npc_attacker), game_state)
@@ -77,8 +80,10 @@ def deal_damage_to_player(game_state: GameState, base_amount: float, damage_type
 
 def deal_npc_damage_to_npc(game_state: GameState, target: NonPlayerCharacter, amount: float):
     health_lost_integer = target.health_resource.lose(amount)
+    game_state.may_have_dead_npcs = True
     if health_lost_integer > 0:
-        game_state.visual_effects.append(create_visual_damage_text(target.world_entity, health_lost_integer))
+        game_state.visual_effects.append(
+            create_visual_damage_text(target.world_entity, health_lost_integer, game_state.random))
 
 
 def deal_npc_damage(damage_amount: float, damage_type: DamageType, game_state: GameState, attacker_entity: WorldEntity,
@@ -95,10 +100,12 @@ def deal_npc_damage(damage_amount: float, damage_type: DamageType, game_state: G
 def player_receive_healing(healing_amount: float, game_state: GameState):
     health_gained_integer = game_state.player_state.health_resource.gain(healing_amount)
     if health_gained_integer > 0:
-        game_state.visual_effects.append(create_visual_healing_text(game_state.player_entity, health_gained_integer))
+        game_state.visual_effects.append(
+            create_visual_healing_text(game_state.player_entity, health_gained_integer, game_state.random))
 
 
 def player_receive_mana(mana_amount: float, game_state: GameState):
     mana_gained_integer = game_state.player_state.mana_resource.gain(mana_amount)
     if mana_gained_integer > 0:
-        game_state.visual_effects.append(create_visual_mana_text(game_state.player_entity, mana_gained_integer))
+        game_state.visual_effects.append(
+            create_visual_mana_text(game_state.player_entity, mana_gained_integer, game_state.random))
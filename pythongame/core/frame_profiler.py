@@ -0,0 +1,102 @@
+import csv
+import json
+import time
+from collections import deque
+from typing import Dict, List, Tuple, Deque
+
+FRAME_HISTORY_LENGTH = 300
+# The time from the start of one frame to the start of the next, as opposed to the time spent in a single phase
+FRAME_PHASE = "frame"
+
+
+# Measures how long each phase of a frame (handling input, running NPC minds, rendering the world etc) takes, and keeps
+# the timings of the most recent frames. Phases are timed by calling start() and stop() around them. Timing the same
+# phase several times in one frame (for instance if the simulation catches up with several ticks) adds up the time.
+#
+# The profiler is disabled by default, and then start() and stop() do nothing, so they can be left in the game loop.
+class FrameProfiler:
+    def __init__(self, history_length: int):
+        self.is_enabled = False
+        self._frames: Deque[Dict[str, float]] = deque(maxlen=history_length)
+        self._current_frame: Dict[str, float] = {}
+        self._phase_start_times: Dict[str, float] = {}
+        self._frame_start_time: float = None
+        # Names of all phases that have been timed, in the order they were first seen
+        self._phase_names: Dict[str, None] = {FRAME_PHASE: None}
+
+    def set_enabled(self, enabled: bool):
+        self.is_enabled = enabled
+        self._current_frame = {}
+        self._phase_start_times = {}
+        self._frame_start_time = None
+
+    def start_frame(self):
+        if self.is_enabled:
+            now = time.perf_counter()
+            if self._frame_start_time is not None:
+                self._current_frame[FRAME_PHASE] = (now - self._frame_start_time) * 1000
+                self._frames.append(self._current_frame)
+            self._current_frame = {}
+            self._frame_start_time = now
+
+    def start(self, phase: str):
+        if self.is_enabled:
+            self._phase_start_times[phase] = time.perf_counter()
+
+    def stop(self, phase: str):
+        if self.is_enabled:
+            start_time = self._phase_start_times.pop(phase, None)
+            if start_time is None:
+                # The profiler was enabled in the middle of the phase
+                return
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            if phase not in self._phase_names:
+                self._phase_names[phase] = None
+            self._current_frame[phase] = self._current_frame.get(phase, 0) + elapsed_ms
+
+    def get_phase_names(self) -> List[str]:
+        return list(self._phase_names)
+
+    def get_num_frames(self) -> int:
+        return len(self._frames)
+
+    # Milliseconds spent in the phase, for each of the recent frames
+    def get_history(self, phase: str) -> List[float]:
+        return [frame.get(phase, 0) for frame in self._frames]
+
+    # Returns the 50th and 99th percentiles (in milliseconds) of the time spent in the phase in recent frames
+    def get_percentiles(self, phase: str) -> Tuple[float, float]:
+        timings = sorted(self.get_history(phase))
+        if not timings:
+            return 0, 0
+        return _percentile(timings, 0.5), _percentile(timings, 0.99)
+
+    def export_csv(self, file_path: str):
+        phase_names = self.get_phase_names()
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(phase_names)
+            for frame in self._frames:
+                writer.writerow(["{:.3f}".format(frame.get(phase, 0)) for phase in phase_names])
+
+    def export_json(self, file_path: str, counters: Dict[str, int]):
+        phase_names = self.get_phase_names()
+        summary = {}
+        for phase in phase_names:
+            p50, p99 = self.get_percentiles(phase)
+            summary[phase] = {"p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+        data = {
+            "phases": phase_names,
+            "summary": summary,
+            "counters": counters,
+            "frames_ms": [[round(frame.get(phase, 0), 3) for phase in phase_names] for frame in self._frames]
+        }
+        with open(file_path, 'w') as file:
+            json.dump(data, file, indent=1)
+
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+FRAME_PROFILER = FrameProfiler(FRAME_HISTORY_LENGTH)
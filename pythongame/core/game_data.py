@@ -6,6 +6,7 @@ import pygame
 from pythongame.core.common import *
 from pythongame.core.common import UiIconSprite, PortraitIconSprite
 from pythongame.core.item_inventory import ItemEquipmentCategory
+from pythongame.core.lazy_game_data import LazyRegistry
 from pythongame.core.loot import LootTable
 from pythongame.core.talents import TalentsConfig
 from pythongame.core.view.image_loading import SpriteInitializer, SpriteSheet, SpriteMapInitializer, Animation
@@ -47,11 +48,41 @@ class NpcCategory(Enum):
     NEUTRAL = 3
 
 
+# The game engine only looks for NPCs to update this far outside of the camera
+MAX_DORMANT_CAMERA_MARGIN = 600
+
+
+# How much of an NPC is simulated, depending on how close it is to the camera:
+#
+# - Active (closer than active_camera_margin): the NPC is controlled by its mind and moves, and its health
+#   regeneration, buffs and animation are updated every frame.
+# - Dormant (closer than dormant_camera_margin): the NPC doesn't think or move, and its health regeneration, buffs and
+#   animation are only updated every dormant_tick_interval.
+# - Sleeping (further away): the NPC isn't touched at all. When it becomes dormant or active again, the time that it
+#   slept is caught up with in one update.
+class NpcActivity:
+    def __init__(self, active_camera_margin: int = 100, dormant_camera_margin: int = 400,
+                 dormant_tick_interval: Millis = Millis(250)):
+        if not 0 <= active_camera_margin <= dormant_camera_margin <= MAX_DORMANT_CAMERA_MARGIN:
+            raise Exception("Invalid NPC activity margins: " + str((active_camera_margin, dormant_camera_margin)))
+        if dormant_tick_interval <= 0:
+            raise Exception("Invalid NPC dormant tick interval: " + str(dormant_tick_interval))
+        self.active_camera_margin = active_camera_margin
+        self.dormant_camera_margin = dormant_camera_margin
+        self.dormant_tick_interval = dormant_tick_interval
+
+
+DEFAULT_NPC_ACTIVITY = NpcActivity()
+# Neutral NPCs have no health regeneration or buffs to keep up to date, so they can go to sleep as soon as they're
+# no longer active
+NEUTRAL_NPC_ACTIVITY = NpcActivity(dormant_camera_margin=DEFAULT_NPC_ACTIVITY.active_camera_margin)
+
+
 class NpcData:
     def __init__(self, sprite: Sprite, size: Tuple[int, int], max_health: int, health_regen: float, speed: float,
                  exp_reward: int, npc_category: NpcCategory, enemy_loot_table: Optional[LootTable],
                  death_sound_id: Optional[SoundId], max_distance_allowed_from_start_position: Optional[int],
-                 is_boss=False):
+                 is_boss=False, activity: NpcActivity = DEFAULT_NPC_ACTIVITY):
         self.sprite = sprite
         self.size = size
         self.max_health = max_health
@@ -63,24 +94,27 @@ class NpcData:
         self.death_sound_id: Optional[SoundId] = death_sound_id
         self.max_distance_allowed_from_start_position = max_distance_allowed_from_start_position
         self.is_boss = is_boss
+        self.activity = activity
 
     @staticmethod
     def enemy(sprite: Sprite, size: Tuple[int, int], max_health: int, health_regen: float, speed: float,
               exp_reward: int, enemy_loot_table: Optional[LootTable], death_sound_id: Optional[SoundId] = None,
-              is_boss: bool = False):
+              is_boss: bool = False, activity: NpcActivity = DEFAULT_NPC_ACTIVITY):
         return NpcData(sprite, size, max_health, health_regen, speed, exp_reward, NpcCategory.ENEMY, enemy_loot_table,
-                       death_sound_id, None, is_boss=is_boss)
+                       death_sound_id, None, is_boss=is_boss, activity=activity)
 
     @staticmethod
-    def player_summon(sprite: Sprite, size: Tuple[int, int], max_health: int, health_regen: float, speed: float):
-        return NpcData(sprite, size, max_health, health_regen, speed, 0, NpcCategory.PLAYER_SUMMON, None, None, None)
+    def player_summon(sprite: Sprite, size: Tuple[int, int], max_health: int, health_regen: float, speed: float,
+                      activity: NpcActivity = DEFAULT_NPC_ACTIVITY):
+        return NpcData(sprite, size, max_health, health_regen, speed, 0, NpcCategory.PLAYER_SUMMON, None, None, None,
+                       activity=activity)
 
     @staticmethod
-    def neutral(sprite: Sprite, size: Tuple[int, int], speed: float):
+    def neutral(sprite: Sprite, size: Tuple[int, int], speed: float, activity: NpcActivity = NEUTRAL_NPC_ACTIVITY):
         # Neutral NPC's shouldn't wander off from their start location
         max_distance_allowed_from_start_position = 40
         return NpcData(sprite, size, 5, 0, speed, 0, NpcCategory.NEUTRAL, None, None,
-                       max_distance_allowed_from_start_position)
+                       max_distance_allowed_from_start_position, activity=activity)
 
 
 class ConsumableCategory(Enum):
@@ -167,33 +201,33 @@ class HeroData:
         self.description = description
 
 
-NON_PLAYER_CHARACTERS: Dict[NpcType, NpcData] = {}
+NON_PLAYER_CHARACTERS: Dict[NpcType, NpcData] = LazyRegistry("NON_PLAYER_CHARACTERS")
 
-ENTITY_SPRITE_INITIALIZERS: Dict[Sprite, Dict[Direction, Animation]] = {}
+ENTITY_SPRITE_INITIALIZERS: Dict[Sprite, Dict[Direction, Animation]] = LazyRegistry("ENTITY_SPRITE_INITIALIZERS")
 
-ENTITY_SPRITE_SIZES: Dict[Sprite, Tuple[int, int]] = {}
+ENTITY_SPRITE_SIZES: Dict[Sprite, Tuple[int, int]] = LazyRegistry("ENTITY_SPRITE_SIZES")
 
-UI_ICON_SPRITE_PATHS: Dict[UiIconSprite, str] = {}
+UI_ICON_SPRITE_PATHS: Dict[UiIconSprite, str] = LazyRegistry("UI_ICON_SPRITE_PATHS")
 
-PORTRAIT_ICON_SPRITE_PATHS: Dict[PortraitIconSprite, str] = {}
+PORTRAIT_ICON_SPRITE_PATHS: Dict[PortraitIconSprite, str] = LazyRegistry("PORTRAIT_ICON_SPRITE_PATHS")
 
-CONSUMABLES: Dict[ConsumableType, ConsumableData] = {}
+CONSUMABLES: Dict[ConsumableType, ConsumableData] = LazyRegistry("CONSUMABLES")
 
-WALLS: Dict[WallType, WallData] = {}
+WALLS: Dict[WallType, WallData] = LazyRegistry("WALLS")
 
-ITEMS: Dict[ItemType, ItemData] = {}
+ITEMS: Dict[ItemType, ItemData] = LazyRegistry("ITEMS")
 
-ABILITIES: Dict[AbilityType, AbilityData] = {}
+ABILITIES: Dict[AbilityType, AbilityData] = LazyRegistry("ABILITIES")
 
 KEYS_BY_ABILITY_TYPE: Dict[AbilityType, UserAbilityKey] = {}
 
-BUFF_TEXTS: Dict[BuffType, str] = {}
+BUFF_TEXTS: Dict[BuffType, str] = LazyRegistry("BUFF_TEXTS")
 
-CHANNELING_BUFFS: List[BuffType] = []
+CHANNELING_BUFFS: Dict[BuffType, bool] = LazyRegistry("CHANNELING_BUFFS")
 
-PORTALS: Dict[PortalId, PortalData] = {}
+PORTALS: Dict[PortalId, PortalData] = LazyRegistry("PORTALS")
 
-HEROES: Dict[HeroId, HeroData] = {}
+HEROES: Dict[HeroId, HeroData] = LazyRegistry("HEROES")
 
 
 def register_npc_data(npc_type: NpcType, npc_data: NpcData):
@@ -256,7 +290,7 @@ def register_buff_text(buff_type: BuffType, text: str):
 # Indicates that this buff should be visualized with a "channeling bar" in the UI,
 # rather than a decreasing buff bar as other buffs
 def register_buff_as_channeling(buff_type: BuffType):
-    CHANNELING_BUFFS.append(buff_type)
+    CHANNELING_BUFFS[buff_type] = True
 
 
 def register_consumable_data(consumable_type: ConsumableType, data: ConsumableData):
@@ -1,21 +1,28 @@
 import math
-from typing import Dict, Tuple, Union
+from array import array
+from typing import Dict, Tuple, Union, Set
 
 from pygame.rect import Rect
 
 from pythongame.core.common import *
 from pythongame.core.consumable_inventory import ConsumableInventory
-from pythongame.core.game_data import NpcCategory, PlayerLevelBonus
+from pythongame.core.game_data import NpcCategory, PlayerLevelBonus, NpcActivity, DEFAULT_NPC_ACTIVITY
 from pythongame.core.item_inventory import ItemInventory
 from pythongame.core.loot import LootTable
 from pythongame.core.math import boxes_intersect, rects_intersect, get_position_from_center_position, \
     translate_in_direction, is_x_and_y_within_distance
+from pythongame.core.pathfinding.wall_grid import WallGrid
 from pythongame.core.talents import TalentsConfig, TalentsState
+from pythongame.core.timing_wheel import TimingWheel, ScheduledCall
 
 GRID_CELL_WIDTH = 25
 
 
 class WorldEntity:
+    __slots__ = ('x', 'y', 'sprite', 'direction', '_speed', '_speed_multiplier', '_effective_speed', '_is_moving',
+                 'pygame_collision_rect', 'movement_animation_progress', 'visible', 'view_z', 'movement_changed',
+                 'position_changed', 'dynamic_buckets', 'dynamic_buckets_item', 'dynamic_bucket_index')
+
     def __init__(self, pos: Tuple[int, int], size: Tuple[int, int], sprite: Sprite, direction=Direction.LEFT, speed=0):
         self.x: int = pos[0]
         self.y: int = pos[1]
@@ -31,6 +38,10 @@ class WorldEntity:
         self.view_z = 0  # increasing Z values = moving into the screen
         self.movement_changed: Observable = None  # space optimization: Only allocate when needed (i.e. for player entity)
         self.position_changed: Observable = None  # space optimization: Only allocate when needed (i.e. for player entity)
+        # Only set for moving entities that are stored in DynamicBuckets (i.e. NPCs and projectiles)
+        self.dynamic_buckets: DynamicBuckets = None
+        self.dynamic_buckets_item: Any = None
+        self.dynamic_bucket_index: Tuple[int, int] = None
 
     def set_moving_in_dir(self, direction: Direction):
         if direction is None:
@@ -93,6 +104,8 @@ class WorldEntity:
         self.y = new_position[1]
         self.pygame_collision_rect.x = self.x
         self.pygame_collision_rect.y = self.y
+        if self.dynamic_buckets is not None:
+            self.dynamic_buckets.update_entity_position(self)
         self.notify_position_observers()
 
     def rotate_right(self):
@@ -115,23 +128,31 @@ class WorldEntity:
 
 
 class LootableOnGround:
+    __slots__ = ('world_entity',)
+
     def __init__(self, world_entity: WorldEntity):
         self.world_entity: WorldEntity = world_entity
 
 
 class ConsumableOnGround(LootableOnGround):
+    __slots__ = ('consumable_type',)
+
     def __init__(self, world_entity: WorldEntity, consumable_type: ConsumableType):
         super().__init__(world_entity)
         self.consumable_type = consumable_type
 
 
 class ItemOnGround(LootableOnGround):
+    __slots__ = ('item_type',)
+
     def __init__(self, world_entity: WorldEntity, item_type: ItemType):
         super().__init__(world_entity)
         self.item_type = item_type
 
 
 class MoneyPileOnGround:
+    __slots__ = ('world_entity', 'amount', 'has_been_picked_up_and_should_be_removed')
+
     def __init__(self, world_entity: WorldEntity, amount: int):
         self.world_entity = world_entity
         self.amount = amount
@@ -140,6 +161,8 @@ class MoneyPileOnGround:
 
 # TODO There is a cyclic dependency here between game_state and projectile_controllers
 class Projectile:
+    __slots__ = ('world_entity', 'has_expired', 'projectile_controller', 'has_collided_and_should_be_removed')
+
     def __init__(self, world_entity: WorldEntity, projectile_controller):
         self.world_entity = world_entity
         self.has_expired = False
@@ -148,13 +171,16 @@ class Projectile:
 
 
 class HealthOrManaResource:
+    __slots__ = ('_value_float', 'value', 'max_value', 'base_regen', 'regen_bonus', 'value_was_updated')
+
     def __init__(self, max_value: int, regen: float):
         self._value_float = max_value
         self.value = max_value
         self.max_value = max_value
         self.base_regen = regen
         self.regen_bonus = 0
-        self.value_was_updated = Observable()
+        # Regeneration changes the value a little every frame, but the observers only care about the integer value
+        self.value_was_updated = Observable(only_on_change=True, coalesce=True)
 
     def gain(self, amount: float) -> int:
         value_before = self.value
@@ -220,6 +246,8 @@ class HealthOrManaResource:
 
 
 class StunStatus:
+    __slots__ = ('_number_of_active_stuns',)
+
     def __init__(self):
         self._number_of_active_stuns = 0
 
@@ -242,10 +270,16 @@ class QuestGiverState(Enum):
 
 
 class NonPlayerCharacter:
+    __slots__ = ('npc_type', 'world_entity', 'health_resource', 'npc_mind', 'active_buffs', 'invulnerable',
+                 'stun_status', 'npc_category', 'is_enemy', 'is_neutral', 'enemy_loot_table', 'death_sound_id',
+                 'start_position', 'max_distance_allowed_from_start_position', 'is_boss', 'quest_giver_state',
+                 'activity', 'last_simulated_time', 'scheduler', '_buffs_to_start', '_expired_buffs', 'is_summoned')
+
     def __init__(self, npc_type: NpcType, world_entity: WorldEntity, health_resource: HealthOrManaResource,
                  npc_mind, npc_category: NpcCategory,
                  enemy_loot_table: Optional[LootTable], death_sound_id: Optional[SoundId],
-                 max_distance_allowed_from_start_position: Optional[int], is_boss: bool = False):
+                 max_distance_allowed_from_start_position: Optional[int], is_boss: bool = False,
+                 activity: NpcActivity = DEFAULT_NPC_ACTIVITY):
         self.npc_type = npc_type
         self.world_entity = world_entity
         self.health_resource = health_resource
@@ -262,6 +296,16 @@ class NonPlayerCharacter:
         self.max_distance_allowed_from_start_position = max_distance_allowed_from_start_position  # Only for neutral NPC
         self.is_boss: bool = is_boss
         self.quest_giver_state: Optional[QuestGiverState] = None  # Only for neutral NPC
+        self.activity = activity
+        # The game state's simulated_time when the NPC's health regeneration and buffs were last updated. It's set when
+        # the NPC is first added to a game state.
+        self.last_simulated_time: Optional[int] = None
+        # Set when the NPC is added to a game state
+        self.scheduler: TimingWheel = None
+        self._buffs_to_start: List[BuffWithDuration] = []
+        self._expired_buffs: List[BuffWithDuration] = []
+        # Summoned by another NPC, that keeps track of it
+        self.is_summoned = False
 
     # TODO There is a cyclic dependancy here between game_state and buff_effects
     def gain_buff_effect(self, buff: Any, duration: Millis):
@@ -270,42 +314,94 @@ class NonPlayerCharacter:
         if existing_buffs_with_this_type:
             existing_buffs_with_this_type[0].set_remaining_duration(duration)
         else:
-            self.active_buffs.append(BuffWithDuration(buff, duration))
+            new_buff = BuffWithDuration(buff, duration, self, self._expired_buffs.append)
+            self.active_buffs.append(new_buff)
+            self._buffs_to_start.append(new_buff)
+
+    def handle_buffs(self) -> 'AgentBuffsUpdate':
+        return _handle_agent_buffs(self.active_buffs, self._buffs_to_start, self._expired_buffs)
 
 
 class Wall:
+    __slots__ = ('wall_type', 'world_entity')
+
     def __init__(self, wall_type: WallType, world_entity: WorldEntity):
         self.wall_type = wall_type
         self.world_entity = world_entity
 
 
 # TODO There is a cyclic dependancy here between game_state and buff_effects
+#
+# A buff isn't counted down every frame. Instead, its expiration is scheduled on the game state's timing wheel, which
+# tells the buffed agent (through on_expired) when the buff may have expired. The agent then ends the buff the next
+# time it handles its buffs, if it's still expired by then (its duration may have been changed in between).
+#
+# Durations are counted from when the agent (the player or an NPC) last handled its buffs (its last_simulated_time),
+# like when buffs were counted down by the time that had passed each time they were handled. A buff that is gained
+# before its agent handles its buffs in a frame is charged for that frame, and one that is gained after isn't.
 class BuffWithDuration:
-    def __init__(self, buff_effect: Any, duration: Optional[Millis]):
+    __slots__ = ('buff_effect', 'has_been_force_cancelled', '_total_duration', 'has_applied_start_effect',
+                 '_agent', '_scheduler', '_on_expired', '_expiration_time', '_scheduled_expiration')
+
+    def __init__(self, buff_effect: Any, duration: Millis, agent: Any, on_expired: Callable[['BuffWithDuration'], None]):
         self.buff_effect = buff_effect
-        self._time_until_expiration: Optional[Millis] = duration
         self.has_been_force_cancelled: bool = False
-        self._total_duration: Optional[Millis] = duration
+        self._total_duration: Millis = duration
         self.has_applied_start_effect: bool = False
+        self._agent = agent
+        self._scheduler: TimingWheel = agent.scheduler
+        self._on_expired = on_expired
+        self._expiration_time: int = None
+        self._scheduled_expiration: Optional[ScheduledCall] = None
+        self._set_expiration_time(agent.last_simulated_time + duration)
 
     def force_cancel(self):
         self.has_been_force_cancelled = True
-        self._time_until_expiration = 0
-
-    def notify_time_passed(self, time: Millis):
-        self._time_until_expiration -= time
+        if self._on_expired:
+            self._set_expiration_time(self._agent.last_simulated_time)
 
     def has_expired(self) -> bool:
-        return self._time_until_expiration <= 0
+        return self._expiration_time <= self._scheduler.time
 
     def get_ratio_duration_remaining(self) -> float:
-        return self._time_until_expiration / self._total_duration
+        return (self._expiration_time - self._agent.last_simulated_time) / self._total_duration
+
+    # How much of the buff's duration was left at the given time (negative if it had already expired)
+    def get_remaining_duration_at(self, time: int) -> Millis:
+        return Millis(self._expiration_time - time)
 
     def change_remaining_duration(self, delta: Millis):
-        self._time_until_expiration = min(self._time_until_expiration + delta, self._total_duration)
+        remaining_duration = self._expiration_time - self._agent.last_simulated_time
+        self.set_remaining_duration(min(remaining_duration + delta, self._total_duration))
 
     def set_remaining_duration(self, time: Millis):
-        self._time_until_expiration = time
+        if self._on_expired:
+            self._set_expiration_time(self._agent.last_simulated_time + time)
+
+    # Called by the agent when it ends the buff. The buff is no longer scheduled after this.
+    def on_ended(self):
+        if self._scheduled_expiration:
+            self._scheduler.cancel(self._scheduled_expiration)
+            self._scheduled_expiration = None
+        self._on_expired = None
+
+    def _set_expiration_time(self, time: int):
+        if self._scheduled_expiration:
+            if self._scheduled_expiration.time == time:
+                return
+            self._scheduler.cancel(self._scheduled_expiration)
+        self._expiration_time = time
+        if time <= self._scheduler.time:
+            # Force cancelled, or out of time. The agent is told right away, so that the buff can end the next time
+            # that the agent handles its buffs (which may be later in this same frame).
+            self._scheduled_expiration = None
+            self._on_expired(self)
+        else:
+            self._scheduled_expiration = self._scheduler.schedule(time, self._expire)
+
+    def _expire(self):
+        self._scheduled_expiration = None
+        self._on_expired(self)
 
     def should_duration_be_visualized_on_enemies(self) -> bool:
         return self._total_duration > 1000
@@ -381,6 +477,39 @@ class AgentBuffsUpdate:
         self.buffs_that_ended = buffs_that_ended
 
 
+# Shared by the player and NPCs. New buffs are started the first time that the agent handles its buffs, and buffs that
+# the timing wheel has reported as expired are ended (but never in the same update as they are started). All buffs
+# that haven't been force cancelled are active, including the ones that end.
+def _handle_agent_buffs(active_buffs: List[BuffWithDuration], buffs_to_start: List[BuffWithDuration],
+                        expired_buffs: List[BuffWithDuration]) -> AgentBuffsUpdate:
+    buffs_that_started = []
+    if buffs_to_start:
+        buffs_that_started = list(buffs_to_start)
+        buffs_to_start.clear()
+        for buff in buffs_that_started:
+            buff.has_applied_start_effect = True
+    buffs_that_were_active = [buff for buff in active_buffs if not buff.has_been_force_cancelled]
+    buffs_that_ended = []
+    if expired_buffs:
+        buffs_to_end = set()
+        for buff in expired_buffs:
+            # It may have been given more time since it expired
+            if buff.has_expired():
+                buffs_to_end.add(buff)
+        expired_buffs.clear()
+        for buff in buffs_that_started:
+            if buff in buffs_to_end:
+                buffs_to_end.remove(buff)
+                expired_buffs.append(buff)
+        if buffs_to_end:
+            # In the order they were gained, like the other lists
+            buffs_that_ended = [buff for buff in active_buffs if buff in buffs_to_end]
+            for buff in buffs_that_ended:
+                active_buffs.remove(buff)
+                buff.on_ended()
+    return AgentBuffsUpdate(buffs_that_started, buffs_that_were_active, buffs_that_ended)
+
+
 class QuestId(Enum):
     MAIN_RETRIEVE_KEY = 1
     RETRIEVE_FROG = 2
@@ -405,6 +534,12 @@ class PlayerState:
         self.abilities: List[AbilityType] = abilities
         self._ability_cooldowns_remaining: Dict[AbilityType, int] = {ability_type: 0 for ability_type in abilities}
         self.active_buffs: List[BuffWithDuration] = []
+        # Set by the game state
+        self.scheduler: TimingWheel = None
+        # The game state's simulated_time when the player's buffs were last handled (see BuffWithDuration)
+        self.last_simulated_time: Optional[int] = None
+        self._buffs_to_start: List[BuffWithDuration] = []
+        self._expired_buffs: List[BuffWithDuration] = []
         self.is_invisible = False
         self.stun_status = StunStatus()
         self.item_inventory = item_inventory
@@ -426,16 +561,23 @@ class PlayerState:
         self.level_bonus = level_bonus
         self._talents_state: TalentsState = TalentsState(talents_config)
         self._upgrades: List[Any] = []
+        # Buffs, items and upgrades subscribe to the events they handle. They have separate buses so that events are
+        # dispatched to buffs first, then items and then upgrades.
+        self._buff_event_bus = EventBus()
+        self._item_event_bus = EventBus()
+        self._upgrade_event_bus = EventBus()
+        # How many events of each type have been dispatched (for profiling)
+        self.event_dispatch_counts: Dict[str, int] = {}
         self.base_block_chance: float = base_block_chance  # depends on which hero is being used
         self.block_chance_bonus: float = 0  # affected by items/buffs. [Change it additively]
         self.block_damage_reduction: int = 0
         self.talents_were_updated = Observable()
-        self.stats_were_updated = Observable()
+        self.stats_were_updated = Observable(coalesce=True)
         self.exp_was_updated = Observable()
         self.money_was_updated = Observable()
         self.abilities_were_updated = Observable()
-        self.cooldowns_were_updated = Observable()
-        self.buffs_were_updated = Observable()
+        self.cooldowns_were_updated = Observable(coalesce=True)
+        self.buffs_were_updated = Observable(coalesce=True)
         self.quests_were_updated = Observable()
         self.completed_quests: List[Quest] = []
         self.active_quests: List[Quest] = []
@@ -526,7 +668,10 @@ class PlayerState:
         if existing_buffs_with_this_type:
             existing_buffs_with_this_type[0].set_remaining_duration(duration)
         else:
-            self.active_buffs.append(BuffWithDuration(buff, duration))
+            new_buff = BuffWithDuration(buff, duration, self, self._expired_buffs.append)
+            self.active_buffs.append(new_buff)
+            self._buffs_to_start.append(new_buff)
+            self._buff_event_bus.subscribe(new_buff, buff.get_handled_event_types())
         self.notify_buff_observers()
 
     def notify_buff_observers(self):
@@ -540,24 +685,15 @@ class PlayerState:
             b.force_cancel()
         self.notify_buff_observers()
 
-    def handle_buffs(self, time_passed: Millis):
-        # NOTE: duplication between NPC's and player's buff handling
-        copied_buffs_list = list(self.active_buffs)
-        buffs_that_started = []
-        buffs_that_ended = []
-        buffs_that_were_active = []
-        for buff in copied_buffs_list:
-            buff.notify_time_passed(time_passed)
-            if not buff.has_been_force_cancelled:
-                buffs_that_were_active.append(buff)
-            if not buff.has_applied_start_effect:
-                buffs_that_started.append(buff)
-                buff.has_applied_start_effect = True
-            elif buff.has_expired():
-                self.active_buffs.remove(buff)
-                buffs_that_ended.append(buff)
-        self.notify_buff_observers()
-        return AgentBuffsUpdate(buffs_that_started, buffs_that_were_active, buffs_that_ended)
+    def handle_buffs(self) -> AgentBuffsUpdate:
+        self.last_simulated_time = self.scheduler.time
+        buffs_update = _handle_agent_buffs(self.active_buffs, self._buffs_to_start, self._expired_buffs)
+        for buff in buffs_update.buffs_that_ended:
+            self._buff_event_bus.unsubscribe(buff, buff.buff_effect.get_handled_event_types())
+        # The remaining durations of the active buffs are shown in the UI, but without buffs there is nothing to update
+        if self.active_buffs or buffs_update.buffs_that_ended:
+            self.notify_buff_observers()
+        return buffs_update
 
     def recharge_ability_cooldowns(self, time_passed: Millis):
         did_update = False
@@ -638,7 +774,10 @@ class PlayerState:
         self.notify_cooldown_observers()
 
     def notify_about_event(self, event: Event, game_state):
-        for buff in self.active_buffs:
+        event_type = type(event)
+        name = event_type.__name__
+        self.event_dispatch_counts[name] = self.event_dispatch_counts.get(name, 0) + 1
+        for buff in self._buff_event_bus.get_subscribers(event_type):
             outcome: Optional[BuffEventOutcome] = buff.buff_effect.buff_handle_event(event)
             if outcome:
                 if outcome.change_remaining_duration:
@@ -646,14 +785,23 @@ class PlayerState:
                 if outcome.cancel_effect:
                     buff.force_cancel()
                 self.notify_buff_observers()
-        for item_effect in self.item_inventory.get_all_active_item_effects():
+        for item_effect in self._item_event_bus.get_subscribers(event_type):
             item_effect.item_handle_event(event, game_state)
-        for upgrade in self._upgrades:
+        for upgrade in self._upgrade_event_bus.get_subscribers(event_type):
             upgrade.handle_event(event, game_state)
 
+    # Called when an item is put in an active inventory slot (see ItemWasActivated)
+    def subscribe_item_effect(self, item_effect: Any):
+        self._item_event_bus.subscribe(item_effect, item_effect.get_handled_event_types())
+
+    # Called when an item is removed from an active inventory slot (see ItemWasDeactivated)
+    def unsubscribe_item_effect(self, item_effect: Any):
+        self._item_event_bus.unsubscribe(item_effect, item_effect.get_handled_event_types())
+
     def choose_talent(self, tier_index: int, option_index: int) -> Tuple[str, HeroUpgradeId]:
         option = self._talents_state.pick(tier_index, option_index)
         self._upgrades.append(option.upgrade)
+        self._upgrade_event_bus.subscribe(option.upgrade, option.upgrade.get_handled_event_types())
         self.notify_talent_observers()
         return option.name, option.upgrade.get_upgrade_id()
 
@@ -672,6 +820,8 @@ class PlayerState:
 
 # TODO Is there a way to handle this better in the view module? This class shouldn't need to masquerade as a WorldEntity
 class DecorationEntity:
+    __slots__ = ('x', 'y', 'sprite', 'direction', 'movement_animation_progress', 'visible')
+
     def __init__(self, pos: Tuple[int, int], sprite: Sprite):
         self.x = pos[0]
         self.y = pos[1]
@@ -724,11 +874,11 @@ class CameraShake:
         self._max_offset = max_offset
         self.offset = (0, 0)
 
-    def notify_time_passed(self, time_passed: Millis):
+    def notify_time_passed(self, time_passed: Millis, rng: random.Random):
         self._time_left -= time_passed
         if self._timer.update_and_check_if_ready(time_passed):
-            self.offset = (random.randint(-self._max_offset, self._max_offset),
-                           random.randint(-self._max_offset, self._max_offset))
+            self.offset = (rng.randint(-self._max_offset, self._max_offset),
+                           rng.randint(-self._max_offset, self._max_offset))
 
     def has_time_left(self) -> bool:
         return self._time_left > 0
@@ -743,6 +893,8 @@ class GameState:
         self.camera_size = camera_size
         self.camera_world_area = Rect((0, 0), self.camera_size)
         self.camera_shake: CameraShake = None
+        # All randomness in the game logic comes from here, so that a game can be replayed exactly by seeding it
+        self.random = random.Random()
         self.player_entity = player_entity
         self.projectile_entities: List[Projectile] = []
         # TODO: unify code for picking up stuff from the ground. The way they are rendered and picked up are similar,
@@ -751,36 +903,45 @@ class GameState:
         self.items_on_ground: List[ItemOnGround] = items_on_ground
         self.money_piles_on_ground: List[MoneyPileOnGround] = money_piles_on_ground
         self.non_player_characters: List[NonPlayerCharacter] = non_player_characters
+        self._npc_buckets = DynamicBuckets(non_player_characters)
+        self._projectile_buckets = DynamicBuckets([])
         self.entire_world_area = entire_world_area
-        self.walls_state = WallsState(walls, entire_world_area)
+        self.pathfinder_wall_grid: WallGrid = self._setup_pathfinder_wall_grid(self.entire_world_area)
+        # Walls state keeps the pathfinder grid up to date as walls are added and removed
+        self.walls_state = WallsState(walls, entire_world_area, self.pathfinder_wall_grid)
         self.visual_effects = []
+        # Set when an NPC may have lost all of its health, so that the list of NPCs only needs to be searched for dead
+        # NPCs when some could have died. (The game engine also notices dead NPCs when it updates them.)
+        self.may_have_dead_npcs = False
+        # The total time that has been simulated (in ms). NPCs that aren't updated every frame use it to catch up.
+        self.simulated_time = 0
+        # Buff expirations are scheduled here. The game engine advances it to simulated_time at the start of each frame.
+        self.scheduler = TimingWheel()
+        for npc in non_player_characters:
+            self._on_npc_added(npc)
         self.player_state: PlayerState = player_state
-        self.pathfinder_wall_grid = self._setup_pathfinder_wall_grid(
-            self.entire_world_area, [w.world_entity for w in walls])
+        self.player_state.scheduler = self.scheduler
+        self.player_state.last_simulated_time = self.simulated_time
         self.decorations_state = DecorationsState(decoration_entities, entire_world_area)
         self.portals: List[Portal] = portals
         self.player_spawn_position: Tuple[int, int] = player_entity.get_position()
         self.warp_points: List[WarpPoint] = []
         self.chests: List[Chest] = chests
-        self.player_movement_speed_was_updated = Observable()
+        self.player_movement_speed_was_updated = Observable(only_on_change=True)
+        # While playing, NPCs that are far away from the camera are kept in inactive world regions instead of in
+        # non_player_characters (see WorldRegions)
+        self.world_regions = None
 
     @staticmethod
-    def _setup_pathfinder_wall_grid(entire_world_area: Rect, walls: List[WorldEntity]):
+    def _setup_pathfinder_wall_grid(entire_world_area: Rect) -> WallGrid:
         # TODO extract world area arithmetic
         grid_width = entire_world_area.w // GRID_CELL_WIDTH
         grid_height = entire_world_area.h // GRID_CELL_WIDTH
-        grid = []
-        for x in range(grid_width + 1):
-            grid.append((grid_height + 1) * [0])
-        for w in walls:
-            cell_x = (w.x - entire_world_area.x) // GRID_CELL_WIDTH
-            cell_y = (w.y - entire_world_area.y) // GRID_CELL_WIDTH
-            grid[cell_x][cell_y] = 1
-        return grid
+        return WallGrid(grid_width + 1, grid_height + 1)
 
     def handle_camera_shake(self, time_passed: Millis):
         if self.camera_shake is not None:
-            self.camera_shake.notify_time_passed(time_passed)
+            self.camera_shake.notify_time_passed(time_passed, self.random)
             if not self.camera_shake.has_time_left():
                 self.camera_shake = None
 
@@ -802,12 +963,61 @@ class GameState:
         self.player_movement_speed_was_updated.notify(self.player_entity.get_speed_multiplier())
 
     def add_non_player_character(self, npc: NonPlayerCharacter):
+        self._on_npc_added(npc)
         self.non_player_characters.append(npc)
+        self._npc_buckets.add(npc)
+
+    def _on_npc_added(self, npc: NonPlayerCharacter):
+        npc.scheduler = self.scheduler
+        if npc.last_simulated_time is None:
+            npc.last_simulated_time = self.simulated_time
+
+    def remove_non_player_character(self, npc: NonPlayerCharacter):
+        npcs = self.non_player_characters
+        index = npcs.index(npc)
+        npcs[index] = npcs[-1]
+        npcs.pop()
+        self._npc_buckets.remove(npc)
+
+    def remove_non_player_characters(self, npcs: List[NonPlayerCharacter]):
+        npcs_to_remove = set(npcs)
+        for npc in _swap_remove_where(self.non_player_characters, lambda n: n in npcs_to_remove):
+            self._npc_buckets.remove(npc)
 
     def remove_all_player_summons(self):
-        self.non_player_characters = [npc for npc in self.non_player_characters
-                                      if npc.npc_category != NpcCategory.PLAYER_SUMMON]
+        for npc in _swap_remove_where(self.non_player_characters,
+                                      lambda n: n.npc_category == NpcCategory.PLAYER_SUMMON):
+            self._npc_buckets.remove(npc)
+        if self.world_regions:
+            self.world_regions.remove_player_summons()
+
+    # Includes NPCs in inactive world regions
+    def is_npc_in_world(self, npc: NonPlayerCharacter) -> bool:
+        if npc in self.non_player_characters:
+            return True
+        return self.world_regions is not None and self.world_regions.has_frozen_npc(npc)
+
+    # Includes enemies in inactive world regions
+    def get_num_enemies(self) -> int:
+        num_enemies = len([npc for npc in self.non_player_characters if npc.is_enemy])
+        if self.world_regions:
+            num_enemies += self.world_regions.get_num_inactive_enemies()
+        return num_enemies
+
+    # Includes NPCs in inactive world regions
+    def get_center_position_of_npc(self, npc_type: NpcType) -> Optional[Tuple[int, int]]:
+        for npc in self.non_player_characters:
+            if npc.npc_type == npc_type:
+                return npc.world_entity.get_center_position()
+        if self.world_regions:
+            return self.world_regions.get_inactive_npc_center_position(npc_type)
+        return None
+
+    def add_projectile(self, projectile: Projectile):
+        self.projectile_entities.append(projectile)
+        self._projectile_buckets.add(projectile)
 
+    # Walls and decorations are not included. The view renders them from walls_state and decorations_state.
     def get_all_entities_to_render(self) -> List[WorldEntity]:
         other_entities = [self.player_entity] + \
                          [p.world_entity for p in self.consumables_on_ground] + \
@@ -818,14 +1028,15 @@ class GameState:
                          [p.world_entity for p in self.portals] + \
                          [w.world_entity for w in self.warp_points] + \
                          [c.world_entity for c in self.chests]
-        return self.get_walls_in_sight_of_player() + other_entities
+        return other_entities
+
+    def get_all_sprites(self) -> Set[Sprite]:
+        entities = self.get_all_entities_to_render() + [w.world_entity for w in self.walls_state.walls]
+        return {e.sprite for e in entities} | self.decorations_state.get_sprites()
 
     def get_walls_in_sight_of_player(self) -> List[WorldEntity]:
         return self.walls_state.get_walls_in_camera(self.camera_world_area)
 
-    def get_decorations_to_render(self) -> List[DecorationEntity]:
-        return self.decorations_state.get_decorations_in_camera(self.camera_world_area)
-
     def center_camera_on_player(self):
         new_camera_pos = get_position_from_center_position(self.player_entity.get_center_position(), self.camera_size)
         new_camera_pos_within_world = self.get_within_world(new_camera_pos, (self.camera_size[0], self.camera_size[1]))
@@ -848,17 +1059,21 @@ class GameState:
         self.camera_world_area.y -= self.camera_world_area.y % cell_size
 
     def get_projectiles_intersecting_with(self, entity: WorldEntity) -> List[Projectile]:
-        return [p for p in self.projectile_entities if boxes_intersect(entity.rect(), p.world_entity.rect())]
+        return self._projectile_buckets.get_items_intersecting_rect(entity.rect())
+
+    def get_npcs_intersecting_rect(self, rect: Rect) -> List[NonPlayerCharacter]:
+        return self._npc_buckets.get_items_intersecting_rect(rect)
 
     def get_enemy_intersecting_with(self, entity: WorldEntity) -> List[NonPlayerCharacter]:
-        return [e for e in self.non_player_characters if
-                e.is_enemy and boxes_intersect(e.world_entity.rect(), entity.rect())]
+        return [e for e in self._npc_buckets.get_items_intersecting_rect(entity.rect()) if e.is_enemy]
 
     def get_enemy_intersecting_rect(self, rect: Rect) -> List[NonPlayerCharacter]:
-        return [e for e in self.non_player_characters if e.is_enemy and rects_intersect(e.world_entity.rect(), rect)]
+        return [e for e in self._npc_buckets.get_items_intersecting_rect(rect) if e.is_enemy]
 
     def get_enemies_within_x_y_distance_of(self, distance: int, position: Tuple[int, int]):
-        return [e for e in self.non_player_characters
+        nearby_npcs = self._npc_buckets.get_items_close_to_area(
+            position[0] - distance, position[1] - distance, distance * 2, distance * 2)
+        return [e for e in nearby_npcs
                 if e.is_enemy
                 and is_x_and_y_within_distance(e.world_entity.get_center_position(), position, distance)]
 
@@ -890,16 +1105,23 @@ class GameState:
     def would_entity_collide_if_new_pos(self, entity, new_pos_within_world):
         if not self.is_position_within_game_world(new_pos_within_world):
             raise Exception("not within game-world: " + str(new_pos_within_world))
-        old_pos = entity.x, entity.y
-        entity.set_position(new_pos_within_world)
-        walls = self.walls_state.get_walls_close_to_position(entity.get_position())
-        other_entities = [e.world_entity for e in self.non_player_characters] + \
-                         [self.player_entity] + walls + [p.world_entity for p in self.portals] + \
+        # Optimization: check against a rect at the new position, instead of moving the entity back and forth (which
+        # would notify observers and move it between buckets)
+        new_rect = entity.pygame_collision_rect.copy()
+        new_rect.x = new_pos_within_world[0]
+        new_rect.y = new_pos_within_world[1]
+        new_int_pos = int(new_pos_within_world[0]), int(new_pos_within_world[1])
+        walls = self.walls_state.get_walls_close_to_position(new_int_pos)
+        for wall in walls:
+            if wall.pygame_collision_rect.colliderect(new_rect):
+                return True
+        for npc in self._npc_buckets.get_items_intersecting_rect(new_rect):
+            if npc.world_entity is not entity:
+                return True
+        other_entities = [self.player_entity] + [p.world_entity for p in self.portals] + \
                          [w.world_entity for w in self.warp_points] + [c.world_entity for c in self.chests]
-        collision = any([other for other in other_entities if self._entities_collide(entity, other)
-                         and entity is not other])
-        entity.set_position(old_pos)
-        return collision
+        return any([other for other in other_entities if other.pygame_collision_rect.colliderect(new_rect)
+                    and entity is not other])
 
     def get_within_world(self, pos: Tuple[int, int], size: Tuple[int, int]):
         # TODO extract world area arithmetic
@@ -912,12 +1134,19 @@ class GameState:
         return self.entire_world_area.collidepoint(position[0], position[1])
 
     def remove_expired_projectiles(self):
-        self.projectile_entities = [p for p in self.projectile_entities if not p.has_expired]
+        for projectile in _swap_remove_where(self.projectile_entities, lambda p: p.has_expired):
+            self._projectile_buckets.remove(projectile)
 
     def remove_dead_npcs(self) -> List[NonPlayerCharacter]:
-        npcs_that_died = [npc for npc in self.non_player_characters if npc.health_resource.is_at_or_below_zero()]
-        self.non_player_characters = [npc for npc in self.non_player_characters if
-                                      not npc.health_resource.is_at_or_below_zero()]
+        npcs_that_died = []
+        if self.may_have_dead_npcs:
+            self.may_have_dead_npcs = False
+            npcs_that_died = _swap_remove_where(self.non_player_characters,
+                                                lambda npc: npc.health_resource.is_at_or_below_zero())
+            for npc in npcs_that_died:
+                self._npc_buckets.remove(npc)
+        if self.world_regions:
+            npcs_that_died += self.world_regions.remove_dead_npcs()
         return npcs_that_died
 
     def remove_expired_visual_effects(self):
@@ -927,8 +1156,8 @@ class GameState:
         self.chests: List[Chest] = [c for c in self.chests if not c.has_been_opened]
 
     def remove_projectiles_that_have_been_destroyed(self):
-        self.projectile_entities: List[Projectile] = [p for p in self.projectile_entities
-                                                      if not p.has_collided_and_should_be_removed]
+        for projectile in _swap_remove_where(self.projectile_entities, lambda p: p.has_collided_and_should_be_removed):
+            self._projectile_buckets.remove(projectile)
 
     def remove_money_piles_that_have_been_picked_up(self):
         self.money_piles_on_ground: List[MoneyPileOnGround] = [m for m in self.money_piles_on_ground
@@ -940,27 +1169,72 @@ class GameState:
         return a.pygame_collision_rect.colliderect(b.pygame_collision_rect)
 
 
+# Removes the items that match from the list, without building a new list. The order of the remaining items is not
+# kept: a removed item is replaced by the last item of the list, so that the items after it don't need to be moved.
+def _swap_remove_where(items: List[Any], should_remove: Callable[[Any], bool]) -> List[Any]:
+    removed_items = []
+    i = 0
+    while i < len(items):
+        item = items[i]
+        if should_remove(item):
+            removed_items.append(item)
+            last_item = items.pop()
+            if i < len(items):
+                items[i] = last_item
+        else:
+            i += 1
+    return removed_items
+
+
 class WallsState:
-    def __init__(self, walls: List[Wall], entire_world_area: Rect):
+    def __init__(self, walls: List[Wall], entire_world_area: Rect, pathfinder_wall_grid: WallGrid):
         self.walls: List[Wall] = walls
         self._buckets = Buckets([w.world_entity for w in walls], entire_world_area)
         self._entire_world_area = entire_world_area
+        self._pathfinder_wall_grid = pathfinder_wall_grid
+        for wall in walls:
+            self._add_to_pathfinder_wall_grid(wall)
+        # Notified with the world entity of a wall that was added or removed, or with None when all walls are removed
+        self.walls_were_updated = Observable()
 
     def add_wall(self, wall: Wall):
         self.walls.append(wall)
         self._buckets.add_entity(wall.world_entity)
+        self._add_to_pathfinder_wall_grid(wall)
+        self.walls_were_updated.notify(wall.world_entity)
 
     def remove_wall(self, wall: Wall):
         self.walls.remove(wall)
         self._buckets.remove_entity(wall.world_entity)
+        self._remove_from_pathfinder_wall_grid(wall)
+        self.walls_were_updated.notify(wall.world_entity)
 
     def remove_all_from_position(self, position: Tuple[int, int]):
         for wall in self.get_walls_at_position(position):
             self.remove_wall(wall)
 
     def clear(self):
+        for wall in self.walls:
+            self._remove_from_pathfinder_wall_grid(wall)
         self.walls.clear()
         self._buckets = Buckets([], self._entire_world_area)
+        self.walls_were_updated.notify(None)
+
+    # Walls outside of the world area (that can be placed in the map editor) can't be reached by the pathfinder, so
+    # they are left out of its grid
+    def _add_to_pathfinder_wall_grid(self, wall: Wall):
+        cell = self._pathfinder_cell(wall.world_entity)
+        if self._pathfinder_wall_grid.contains_cell(*cell):
+            self._pathfinder_wall_grid.add_wall(*cell)
+
+    def _remove_from_pathfinder_wall_grid(self, wall: Wall):
+        cell = self._pathfinder_cell(wall.world_entity)
+        if self._pathfinder_wall_grid.contains_cell(*cell):
+            self._pathfinder_wall_grid.remove_wall(*cell)
+
+    def _pathfinder_cell(self, wall_entity: WorldEntity) -> Tuple[int, int]:
+        return ((wall_entity.x - self._entire_world_area.x) // GRID_CELL_WIDTH,
+                (wall_entity.y - self._entire_world_area.y) // GRID_CELL_WIDTH)
 
     # TODO Use _entities_collide?
     def does_entity_intersect_with_wall(self, entity: WorldEntity):
@@ -984,53 +1258,88 @@ class WallsState:
 
 class DecorationsState:
     def __init__(self, decoration_entities: List[DecorationEntity], entire_world_area: Rect):
-        self.decoration_entities: List[DecorationEntity] = decoration_entities
+        # None when the decorations have been packed
+        self.decoration_entities: Optional[List[DecorationEntity]] = decoration_entities
         self._buckets = Buckets(decoration_entities, entire_world_area)
+        self._packed_buckets: Optional[PackedDecorationBuckets] = None
         self._entire_world_area = entire_world_area
+        # Notified with a decoration that was added or removed, or with None when all decorations are removed
+        self.decorations_were_updated = Observable()
+
+    # Decorations never change while playing (only in the map editor). Packing them stores each one as just a position
+    # and a sprite, instead of as an object. After this, decorations can't be added or removed.
+    def pack(self):
+        if self._packed_buckets is None:
+            self._packed_buckets = PackedDecorationBuckets(self.decoration_entities, self._entire_world_area)
+            self._buckets = None
+            self.decoration_entities = None
+
+    def get_sprites(self) -> Set[Sprite]:
+        if self._packed_buckets is not None:
+            return self._packed_buckets.get_sprites()
+        return {d.sprite for d in self.decoration_entities}
 
     def clear(self):
+        self._raise_if_packed()
         self.decoration_entities.clear()
         self._buckets = Buckets([], self._entire_world_area)
+        self.decorations_were_updated.notify(None)
 
     def add_decoration(self, decoration: DecorationEntity):
+        self._raise_if_packed()
         self.decoration_entities.append(decoration)
         self._buckets.add_entity(decoration)
+        self.decorations_were_updated.notify(decoration)
 
     def remove_decoration(self, decoration: DecorationEntity):
+        self._raise_if_packed()
         self.decoration_entities.remove(decoration)
         self._buckets.remove_entity(decoration)
+        self.decorations_were_updated.notify(decoration)
 
     def get_decorations_in_camera(self, camera_world_area: Rect) -> List[DecorationEntity]:
+        if self._packed_buckets is not None:
+            return self._packed_buckets.get_decorations_close_to_world_area(camera_world_area)
         return self._buckets.get_entitites_close_to_world_area(camera_world_area)
 
     def get_decorations_at_position(self, position: Tuple[int, int]) -> List[DecorationEntity]:
+        self._raise_if_packed()
         return [d for d in self.decoration_entities if d.get_position() == position]
 
+    def _raise_if_packed(self):
+        if self._packed_buckets is not None:
+            raise Exception("Decorations have been packed and can't be changed")
+
 
 # This class provides a way to store entities based on their location in the world,
 # which improves performance mainly for collision checking and rendering
-# NOTE: it should only be used for immovable objects (such as walls and floor tiles)
+# NOTE: it should only be used for immovable objects (such as walls and floor tiles). See DynamicBuckets for moving ones
 class Buckets:
     _BUCKET_WIDTH = 100
     _BUCKET_HEIGHT = 100
 
     def __init__(self, entities: List[Any], entire_world_area: Rect):
-        self._buckets: Dict[int, Dict[int, List[Any]]] = {}
+        # Only buckets that contain something are stored. (Most of a big map is empty, and an empty list for each
+        # bucket would take up more memory than the entities themselves.)
+        self._buckets: Dict[Tuple[int, int], List[Any]] = {}
         self.entire_world_area = entire_world_area
-        for x_bucket in range(self.entire_world_area.w // Buckets._BUCKET_WIDTH + 1):
-            self._buckets[x_bucket] = {}
-            for y_bucket in range(self.entire_world_area.h // Buckets._BUCKET_HEIGHT + 1):
-                self._buckets[x_bucket][y_bucket] = []
+        self._num_x_buckets = self.entire_world_area.w // Buckets._BUCKET_WIDTH + 1
+        self._num_y_buckets = self.entire_world_area.h // Buckets._BUCKET_HEIGHT + 1
         for entity in entities:
             self.add_entity(entity)
 
     def add_entity(self, entity: Any):
-        bucket = self._bucket_for_world_position(entity.get_position())
-        bucket.append(entity)
+        bucket_index = self._bucket_index_for_world_position(entity.get_position())
+        if bucket_index not in self._buckets:
+            self._buckets[bucket_index] = []
+        self._buckets[bucket_index].append(entity)
 
     def remove_entity(self, entity: Any):
-        bucket = self._bucket_for_world_position(entity.get_position())
+        bucket_index = self._bucket_index_for_world_position(entity.get_position())
+        bucket = self._buckets[bucket_index]
         bucket.remove(entity)
+        if not bucket:
+            del self._buckets[bucket_index]
 
     def get_entitites_close_to_world_area(self, world_area: Rect) -> List[Any]:
         x0_bucket, y0_bucket = self._bucket_index_for_world_position(world_area.topleft)
@@ -1044,15 +1353,161 @@ class Buckets:
         return [entity for bucket in buckets for entity in bucket]
 
     def _buckets_between_indices(self, x0: int, x1: int, y0: int, y1: int) -> List[List[Any]]:
-        for x_bucket in range(max(0, x0), min(x1 + 1, len(self._buckets))):
-            for y_bucket in range(max(0, y0), min(y1 + 1, len(self._buckets[x_bucket]))):
-                yield self._buckets[x_bucket][y_bucket]
+        for x_bucket in range(max(0, x0), min(x1 + 1, self._num_x_buckets)):
+            for y_bucket in range(max(0, y0), min(y1 + 1, self._num_y_buckets)):
+                bucket = self._buckets.get((x_bucket, y_bucket))
+                if bucket is not None:
+                    yield bucket
 
-    def _bucket_for_world_position(self, world_position: Tuple[int, int]):
+    def _bucket_index_for_world_position(self, world_position: Tuple[int, int]) -> Tuple[int, int]:
+        x_bucket = int(world_position[0] - self.entire_world_area.x) // Buckets._BUCKET_WIDTH
+        y_bucket = int(world_position[1] - self.entire_world_area.y) // Buckets._BUCKET_HEIGHT
+        return x_bucket, y_bucket
+
+
+# Stores decorations in the same buckets as Buckets does, but packed into a few arrays instead of one object each. The
+# decorations are sorted by bucket, and the decorations of a bucket are found from the bucket's offset into the arrays.
+# DecorationEntity objects are created when they are asked for, which only happens when the static world layer builds
+# a chunk.
+class PackedDecorationBuckets:
+    _SPRITES: List[Sprite] = list(Sprite)
+
+    def __init__(self, decorations: List[DecorationEntity], entire_world_area: Rect):
+        self.entire_world_area = entire_world_area
+        self._num_x_buckets = self.entire_world_area.w // Buckets._BUCKET_WIDTH + 1
+        self._num_y_buckets = self.entire_world_area.h // Buckets._BUCKET_HEIGHT + 1
+        num_buckets = self._num_x_buckets * self._num_y_buckets
+        # Buckets are numbered column by column, so that the buckets of a column within an area are next to each other
+        bucket_numbers = [self._bucket_number(d.get_position()) for d in decorations]
+        # Decorations outside of the world would never be found (Buckets doesn't find them either)
+        indices = sorted([i for i in range(len(decorations)) if 0 <= bucket_numbers[i] < num_buckets],
+                         key=lambda i: bucket_numbers[i])
+        sprite_indices = {sprite: i for i, sprite in enumerate(PackedDecorationBuckets._SPRITES)}
+        # Positions are stored as floats, as they can be floats in map files
+        self._positions = array('d', [coordinate for i in indices for coordinate in decorations[i].get_position()])
+        self._sprite_indices = array('H', [sprite_indices[decorations[i].sprite] for i in indices])
+        # The decorations of bucket number n are found between _offsets[n] and _offsets[n + 1]
+        self._offsets = array('I', [0] * (num_buckets + 1))
+        for i in indices:
+            self._offsets[bucket_numbers[i] + 1] += 1
+        for bucket_number in range(num_buckets):
+            self._offsets[bucket_number + 1] += self._offsets[bucket_number]
+
+    def get_decorations_close_to_world_area(self, world_area: Rect) -> List[DecorationEntity]:
+        x0_bucket, y0_bucket = self._bucket_index_for_world_position(world_area.topleft)
+        x1_bucket, y1_bucket = self._bucket_index_for_world_position(world_area.bottomright)
+        y0_bucket = max(0, y0_bucket - 1)
+        y1_bucket = min(y1_bucket + 1, self._num_y_buckets - 1)
+        decorations = []
+        if y0_bucket > y1_bucket:
+            return decorations
+        for x_bucket in range(max(0, x0_bucket - 1), min(x1_bucket + 2, self._num_x_buckets)):
+            start = self._offsets[x_bucket * self._num_y_buckets + y0_bucket]
+            end = self._offsets[x_bucket * self._num_y_buckets + y1_bucket + 1]
+            for i in range(start, end):
+                decorations.append(DecorationEntity((self._positions[2 * i], self._positions[2 * i + 1]),
+                                                    PackedDecorationBuckets._SPRITES[self._sprite_indices[i]]))
+        return decorations
+
+    def get_sprites(self) -> Set[Sprite]:
+        return {PackedDecorationBuckets._SPRITES[sprite_index] for sprite_index in set(self._sprite_indices)}
+
+    def _bucket_number(self, world_position: Tuple[int, int]) -> int:
         x_bucket, y_bucket = self._bucket_index_for_world_position(world_position)
-        return self._buckets[x_bucket][y_bucket]
+        if x_bucket < 0 or y_bucket < 0 or y_bucket >= self._num_y_buckets:
+            return -1
+        return x_bucket * self._num_y_buckets + y_bucket
 
     def _bucket_index_for_world_position(self, world_position: Tuple[int, int]) -> Tuple[int, int]:
         x_bucket = int(world_position[0] - self.entire_world_area.x) // Buckets._BUCKET_WIDTH
         y_bucket = int(world_position[1] - self.entire_world_area.y) // Buckets._BUCKET_HEIGHT
         return x_bucket, y_bucket
+
+
+# Like Buckets, this class stores entities based on their location in the world, but it supports entities that move
+# around (such as NPCs and projectiles). The stored items are objects with a world_entity (NonPlayerCharacter for
+# instance), and they are moved between buckets whenever the position of their world_entity changes.
+class DynamicBuckets:
+    _BUCKET_WIDTH = 100
+    _BUCKET_HEIGHT = 100
+
+    def __init__(self, items: List[Any]):
+        self._buckets: Dict[Tuple[int, int], List[Any]] = {}
+        # Items are stored in the bucket of their top-left corner. Queries are extended by the size of the largest
+        # entity, so that items that stick out into a neighboring bucket are found too.
+        self._max_entity_width = 0
+        self._max_entity_height = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Any):
+        entity: WorldEntity = item.world_entity
+        if entity.dynamic_buckets is not None:
+            raise Exception("Entity is already stored in buckets: " + str(item))
+        rect = entity.pygame_collision_rect
+        self._max_entity_width = max(self._max_entity_width, rect.w)
+        self._max_entity_height = max(self._max_entity_height, rect.h)
+        bucket_index = (rect.x // DynamicBuckets._BUCKET_WIDTH, rect.y // DynamicBuckets._BUCKET_HEIGHT)
+        entity.dynamic_buckets = self
+        entity.dynamic_buckets_item = item
+        entity.dynamic_bucket_index = bucket_index
+        self._add_to_bucket(bucket_index, item)
+
+    # Removing an item that isn't stored (for instance one that has already been removed) has no effect
+    def remove(self, item: Any):
+        entity: WorldEntity = item.world_entity
+        if entity.dynamic_buckets is not self:
+            return
+        self._remove_from_bucket(entity.dynamic_bucket_index, item)
+        entity.dynamic_buckets = None
+        entity.dynamic_buckets_item = None
+        entity.dynamic_bucket_index = None
+
+    # Called by the entity itself whenever its position changes
+    def update_entity_position(self, entity: WorldEntity):
+        rect = entity.pygame_collision_rect
+        bucket_index = (rect.x // DynamicBuckets._BUCKET_WIDTH, rect.y // DynamicBuckets._BUCKET_HEIGHT)
+        if bucket_index != entity.dynamic_bucket_index:
+            self._remove_from_bucket(entity.dynamic_bucket_index, entity.dynamic_buckets_item)
+            self._add_to_bucket(bucket_index, entity.dynamic_buckets_item)
+            entity.dynamic_bucket_index = bucket_index
+
+    def get_items_intersecting_rect(self, rect: Rect) -> List[Any]:
+        if not self._buckets:
+            return []
+        return [item for item in self.get_items_close_to_area(rect[0], rect[1], rect[2], rect[3])
+                if item.world_entity.pygame_collision_rect.colliderect(rect)]
+
+    # Returns all items that may overlap with the given area. The caller is responsible for exact filtering.
+    def get_items_close_to_area(self, x: int, y: int, w: int, h: int) -> List[Any]:
+        x0_bucket = int(x - self._max_entity_width) // DynamicBuckets._BUCKET_WIDTH
+        y0_bucket = int(y - self._max_entity_height) // DynamicBuckets._BUCKET_HEIGHT
+        x1_bucket = int(x + w) // DynamicBuckets._BUCKET_WIDTH
+        y1_bucket = int(y + h) // DynamicBuckets._BUCKET_HEIGHT
+        items = []
+        # Optimization: when there are few occupied buckets (for instance when there are no projectiles at all), it's
+        # cheaper to go through those than to look up every bucket index in the area
+        if len(self._buckets) < (x1_bucket - x0_bucket + 1) * (y1_bucket - y0_bucket + 1):
+            for (x_bucket, y_bucket), bucket in self._buckets.items():
+                if x0_bucket <= x_bucket <= x1_bucket and y0_bucket <= y_bucket <= y1_bucket:
+                    items += bucket
+            return items
+        for x_bucket in range(x0_bucket, x1_bucket + 1):
+            for y_bucket in range(y0_bucket, y1_bucket + 1):
+                bucket = self._buckets.get((x_bucket, y_bucket))
+                if bucket:
+                    items += bucket
+        return items
+
+    def _add_to_bucket(self, bucket_index: Tuple[int, int], item: Any):
+        bucket = self._buckets.get(bucket_index)
+        if bucket is None:
+            self._buckets[bucket_index] = [item]
+        else:
+            bucket.append(item)
+
+    def _remove_from_bucket(self, bucket_index: Tuple[int, int], item: Any):
+        bucket = self._buckets[bucket_index]
+        bucket.remove(item)
+        if not bucket:
+            del self._buckets[bucket_index]
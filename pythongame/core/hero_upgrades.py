@@ -2,8 +2,9 @@ from typing import Dict
 
 from pythongame.core.common import *
 from pythongame.core.game_state import GameState
+from pythongame.core.lazy_game_data import LazyRegistry
 
-_upgrade_effects: Dict[HeroUpgradeId, Callable[[GameState], Any]] = {}
+_upgrade_effects: Dict[HeroUpgradeId, Callable[[GameState], Any]] = LazyRegistry("upgrade_effects")
 
 
 def register_hero_upgrade_effect(hero_upgrade: HeroUpgradeId, effect: Callable[[GameState], Any]):
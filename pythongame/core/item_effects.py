@@ -3,6 +3,7 @@ from typing import Dict, Union
 from pythongame.core.common import *
 from pythongame.core.game_state import GameState, Event
 from pythongame.core.item_inventory import ItemEquipmentCategory, ItemWasActivated
+from pythongame.core.lazy_game_data import LazyRegistry
 
 
 class AbstractItemEffect:
@@ -22,6 +23,10 @@ class AbstractItemEffect:
     def get_item_type(self):
         return self.item_type
 
+    # Events are only passed to item_handle_event if their type is returned here
+    def get_handled_event_types(self) -> List[type]:
+        return []
+
     def item_handle_event(self, event: Event, game_state: GameState):
         pass
 
@@ -83,7 +88,7 @@ class EmptyItemEffect(AbstractItemEffect):
         super().__init__(item_type)
 
 
-_item_effects: Dict[ItemType, AbstractItemEffect] = {}
+_item_effects: Dict[ItemType, AbstractItemEffect] = LazyRegistry("item_effects")
 
 
 def register_item_effect(item_type: ItemType, effect: AbstractItemEffect):
@@ -102,4 +107,5 @@ def try_add_item_to_inventory(game_state: GameState, item_effect: AbstractItemEf
     if result:
         if isinstance(result, ItemWasActivated):
             item_effect.apply_start_effect(game_state)
+            game_state.player_state.subscribe_item_effect(item_effect)
     return result is not None
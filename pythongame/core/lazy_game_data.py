@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Set, Optional, Callable, Any
+
+GAME_DATA_MANIFEST_FILE = "resources/game_data_manifest.json"
+GAME_DATA_SOURCE_FILES_DIR = "pythongame/game_data"
+REGISTER_GAME_DATA_MODULE = "pythongame.register_game_data"
+VERSION = 1
+
+# All registries, by name. (Used when building the manifest)
+REGISTRIES: Dict[str, 'LazyRegistry'] = {}
+
+
+# A dictionary of game data (for instance the data of all items) that is filled in by the register functions in
+# pythongame/game_data.
+#
+# Until all game data has been registered (see register_all_game_data), an entry that isn't there yet is registered
+# the first time that it's looked up: the manifest tells which register function to call for it. Iterating over the
+# registry calls the register functions of all of its entries. That way, a tool that only needs the items doesn't have
+# to import and register the whole game.
+class LazyRegistry(dict):
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        if name in REGISTRIES:
+            raise Exception("Registry name already in use: " + name)
+        REGISTRIES[name] = self
+
+    def __missing__(self, key):
+        if GAME_DATA_LOADER.is_lazy:
+            GAME_DATA_LOADER.load_entry(self.name, key)
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        if GAME_DATA_LOADER.is_lazy:
+            GAME_DATA_LOADER.load_entry(self.name, key)
+            return dict.__contains__(self, key)
+        return False
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        self._load_all_entries()
+        return dict.__iter__(self)
+
+    def __len__(self) -> int:
+        self._load_all_entries()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._load_all_entries()
+        return dict.keys(self)
+
+    def values(self):
+        self._load_all_entries()
+        return dict.values(self)
+
+    def items(self):
+        self._load_all_entries()
+        return dict.items(self)
+
+    def _load_all_entries(self):
+        if GAME_DATA_LOADER.is_lazy:
+            GAME_DATA_LOADER.load_registry(self.name)
+
+
+# Calls the register functions that are needed, as entries are looked up in the registries.
+#
+# The manifest is built ahead of time with build_game_data_manifest.py. If there is no manifest, or if any of the game
+# data files have changed since it was built, all of the game data is registered the first time something is looked
+# up instead, so that nothing is ever missing.
+class GameDataLoader:
+    def __init__(self):
+        self.is_lazy = True
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._has_read_manifest = False
+        self._called_register_functions: Set[str] = set()
+        self._fully_loaded_registries: Set[str] = set()
+        self.num_lazily_called_register_functions = 0
+
+    # Register functions must only be called once, whether it's done lazily or from register_all_game_data
+    def call_register_function(self, register_function: Callable[[], Any]):
+        name = register_function.__module__ + "." + register_function.__name__
+        if name not in self._called_register_functions:
+            self._called_register_functions.add(name)
+            register_function()
+
+    # Called when all of the game data is about to be registered, in the order that the register functions depend on
+    def stop_lazy_loading(self):
+        self.is_lazy = False
+
+    def load_entry(self, registry_name: str, key):
+        manifest = self._get_manifest()
+        if manifest is None:
+            self._register_all_game_data()
+            return
+        index = manifest["entries"].get(registry_name, {}).get(key.name)
+        if index is not None:
+            self._call_register_function_from_manifest(index)
+
+    def load_registry(self, registry_name: str):
+        if registry_name in self._fully_loaded_registries:
+            return
+        manifest = self._get_manifest()
+        if manifest is None:
+            self._register_all_game_data()
+            return
+        for index in sorted(set(manifest["entries"].get(registry_name, {}).values())):
+            self._call_register_function_from_manifest(index)
+        self._fully_loaded_registries.add(registry_name)
+
+    def _call_register_function_from_manifest(self, index: int):
+        module_name, function_name = self._manifest["register_functions"][index]
+        if module_name + "." + function_name not in self._called_register_functions:
+            self.num_lazily_called_register_functions += 1
+            # __import__ is used rather than importlib, as only the former shows up with "python -X importtime"
+            __import__(module_name)
+            self.call_register_function(getattr(sys.modules[module_name], function_name))
+
+    def _register_all_game_data(self):
+        __import__(REGISTER_GAME_DATA_MODULE)
+        sys.modules[REGISTER_GAME_DATA_MODULE].register_all_game_data()
+
+    def _get_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self._has_read_manifest:
+            self._has_read_manifest = True
+            self._manifest = _read_manifest()
+        return self._manifest
+
+
+GAME_DATA_LOADER = GameDataLoader()
+
+
+# Registers all of the game data, and records which register function registered each entry
+def build_game_data_manifest(register_functions: List[Callable[[], Any]], file_path: str):
+    if any(dict.__len__(registry) > 0 for registry in REGISTRIES.values()):
+        raise Exception("Can't build the game data manifest after game data has been registered")
+    GAME_DATA_LOADER.stop_lazy_loading()
+    entries: Dict[str, Dict[str, int]] = {name: {} for name in REGISTRIES}
+    for index, register_function in enumerate(register_functions):
+        entries_before = {name: dict.copy(registry) for name, registry in REGISTRIES.items()}
+        GAME_DATA_LOADER.call_register_function(register_function)
+        for name, registry in REGISTRIES.items():
+            for key, value in dict.items(registry):
+                if key not in entries_before[name] or entries_before[name][key] is not value:
+                    entries[name][key.name] = index
+    manifest = {
+        "version": VERSION,
+        "source_files_hash": _hash_source_files(),
+        "register_functions": [[f.__module__, f.__name__] for f in register_functions],
+        "entries": entries
+    }
+    with open(file_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+
+
+def _read_manifest() -> Optional[Dict[str, Any]]:
+    if not os.path.exists(GAME_DATA_MANIFEST_FILE):
+        return None
+    with open(GAME_DATA_MANIFEST_FILE) as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != VERSION or manifest.get("source_files_hash") != _hash_source_files():
+        return None
+    return manifest
+
+
+def _hash_source_files() -> str:
+    file_paths = [REGISTER_GAME_DATA_MODULE.replace(".", "/") + ".py"]
+    for directory, _, file_names in os.walk(GAME_DATA_SOURCE_FILES_DIR):
+        file_paths += [os.path.join(directory, f) for f in file_names if f.endswith(".py")]
+    md5 = hashlib.md5()
+    for file_path in sorted(file_paths):
+        md5.update(file_path.encode())
+        with open(file_path, 'rb') as file:
+            md5.update(file.read())
+    return md5.hexdigest()
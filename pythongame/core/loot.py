@@ -43,13 +43,13 @@ class LootTable:
     def __init__(self, groups: List[LootGroup]):
         self.groups = groups
 
-    def generate_loot(self) -> List[LootEntry]:
+    def generate_loot(self, rng: random.Random) -> List[LootEntry]:
         loot: List[LootEntry] = []
         for group in self.groups:
-            if random.random() < group.chance_to_get_group:
+            if rng.random() < group.chance_to_get_group:
                 entries = list(group.entries)
                 for i in range(group.pick_n):
-                    pick_i = random.choice(entries)
+                    pick_i = rng.choice(entries)
                     loot.append(pick_i)
                     entries.remove(pick_i)
         return loot
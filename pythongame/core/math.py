@@ -29,8 +29,8 @@ def rects_intersect(r1: Rect, r2: Rect):
     return r1.colliderect(r2)
 
 
-def random_direction():
-    return random.choice([Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN])
+def random_direction(rng: random.Random):
+    return rng.choice([Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN])
 
 
 # Returns 2 directions, starting with vertical or horizontal depending on which is closer to the true direction
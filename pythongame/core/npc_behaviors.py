@@ -6,6 +6,7 @@ from pythongame.core.enemy_target_selection import EnemyTarget, get_target
 from pythongame.core.game_data import CONSUMABLES, ITEMS
 from pythongame.core.game_state import GameState, NonPlayerCharacter, WorldEntity, QuestId, Quest
 from pythongame.core.item_effects import get_item_effect, try_add_item_to_inventory
+from pythongame.core.lazy_game_data import LazyRegistry
 from pythongame.core.math import is_x_and_y_within_distance, get_perpendicular_directions
 from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
 from pythongame.core.pathfinding.npc_pathfinding import NpcPathfinder
@@ -26,15 +27,20 @@ class AbstractNpcMind:
                     time_passed: Millis):
         pass
 
+    # NPCs far away from the camera may be stored in compact form and created anew later (see WorldRegions). Minds
+    # that keep track of other NPCs override this, so that their NPC stays the same object.
+    def has_state_to_keep(self) -> bool:
+        return False
+
 
 class MeleeEnemyNpcMind(AbstractNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder, attack_interval: Millis, damage_amount: int,
                  chance_to_stray_from_path: float, update_path_interval: Millis):
         super().__init__(global_path_finder)
         self._base_attack_interval = attack_interval
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
         self._attack_interval = None
-        self.randomize_attack_interval()
-        self._time_since_attack = self._attack_interval
+        self._time_since_attack = None
         self._update_path_interval = update_path_interval
         self._time_since_updated_path = self._update_path_interval
         self.pathfinder = NpcPathfinder(global_path_finder)
@@ -45,11 +51,14 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
         self.chance_to_stray_from_path = chance_to_stray_from_path
         self._is_in_melee_with_target = False
 
-    def randomize_attack_interval(self):
-        self._attack_interval = self._base_attack_interval + random.randint(-250, 250)
+    def randomize_attack_interval(self, rng: random.Random):
+        self._attack_interval = self._base_attack_interval + rng.randint(-250, 250)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._attack_interval is None:
+            self.randomize_attack_interval(game_state.random)
+            self._time_since_attack = self._attack_interval
         self._time_since_attack += time_passed
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
@@ -74,8 +83,8 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
             if self.next_waypoint:
                 direction = self.pathfinder.get_dir_towards_considering_collisions(
                     game_state, enemy_entity, self.next_waypoint)
-                if random.random() < self.chance_to_stray_from_path and direction:
-                    direction = random.choice(get_perpendicular_directions(direction))
+                if game_state.random.random() < self.chance_to_stray_from_path and direction:
+                    direction = game_state.random.choice(get_perpendicular_directions(direction))
                 _move_in_dir(enemy_entity, direction)
             else:
                 enemy_entity.set_not_moving()
@@ -86,7 +95,7 @@ class MeleeEnemyNpcMind(AbstractNpcMind):
                 target_center_pos = target.entity.get_center_position()
                 if is_x_and_y_within_distance(enemy_position, target_center_pos, 80):
                     self._time_since_attack = 0
-                    self.randomize_attack_interval()
+                    self.randomize_attack_interval(game_state.random)
                     deal_npc_damage(self.damage_amount, DamageType.PHYSICAL, game_state, enemy_entity, npc, target)
 
 
@@ -184,11 +193,11 @@ class BuyItemNpcAction(AbstractNpcAction):
         ui_view.remove_inventory_highlight()
 
 
-_npc_mind_constructors: Dict[NpcType, Type[AbstractNpcMind]] = {}
+_npc_mind_constructors: Dict[NpcType, Type[AbstractNpcMind]] = LazyRegistry("npc_mind_constructors")
 
-_npc_dialog_data: Dict[NpcType, Callable[[GameState], DialogData]] = {}
+_npc_dialog_data: Dict[NpcType, Callable[[GameState], DialogData]] = LazyRegistry("npc_dialog_data")
 
-_quests: Dict[QuestId, Quest] = {}
+_quests: Dict[QuestId, Quest] = LazyRegistry("quests")
 
 
 def register_quest(quest_id: QuestId, quest: Quest):
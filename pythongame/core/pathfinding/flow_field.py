@@ -0,0 +1,77 @@
+from collections import deque
+from typing import Tuple, Dict, List, Optional
+
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+
+# A flow field covers the area around a goal cell. For every cell that the agent can reach the goal from, it stores the
+# neighboring cell that is one step closer to the goal. It's computed with a breadth-first search outwards from the
+# goal, and can then be shared by any number of agents (of the same size) heading for that goal: finding the next step
+# from a cell is a single lookup.
+class FlowField:
+
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int], max_distance: int):
+        self._grid = grid
+        self._agent_size = agent_size
+        # Cells further away than this from the goal (in x or y) are ignored, to save resources
+        self._max_distance = max_distance
+        self.goal_cell: Tuple[int, int] = None
+        self._next_cells: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {}
+
+    def compute(self, goal_cell: Tuple[int, int]):
+        self.goal_cell = goal_cell
+        goal_x, goal_y = goal_cell
+        height = self._grid.height
+        # The bounds are also clamped to the grid, so that cells within them can be looked up in the clearance map
+        min_x = max(goal_x - self._max_distance, 0)
+        max_x = min(goal_x + self._max_distance, self._grid.width - 1)
+        min_y = max(goal_y - self._max_distance, 0)
+        max_y = min(goal_y + self._max_distance, height - 1)
+        clearance_map = self._grid.get_clearance_map(self._agent_size)
+
+        next_cells = {}
+        queue = deque()
+        # The goal cell may not be free for a large agent (if the goal is right next to a wall for instance). In that
+        # case, the agent can still reach the cell above or to the left of the goal.
+        for cell in [goal_cell, (goal_x, goal_y - 1), (goal_x - 1, goal_y)]:
+            if cell not in next_cells and min_x <= cell[0] <= max_x and min_y <= cell[1] <= max_y \
+                    and clearance_map[cell[0] * height + cell[1]]:
+                next_cells[cell] = None
+                queue.append(cell)
+
+        while queue:
+            cell = queue.popleft()
+            x, y = cell
+            for neighbor in [(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)]:
+                if neighbor not in next_cells and min_x <= neighbor[0] <= max_x and min_y <= neighbor[1] <= max_y \
+                        and clearance_map[neighbor[0] * height + neighbor[1]]:
+                    next_cells[neighbor] = cell
+                    queue.append(neighbor)
+
+        self._next_cells = next_cells
+
+    def clear(self):
+        self.goal_cell = None
+        self._next_cells = {}
+
+    def get_next_cell(self, cell: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        return self._next_cells.get(cell)
+
+    # Returns the path from the given cell to the goal (including both of them), or None if the goal can't be reached
+    def get_path(self, start_cell: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        if start_cell not in self._next_cells:
+            # The start cell isn't free for the agent (it's touching a wall for instance). Like with an A* search, the
+            # agent can still step from there onto a free neighboring cell.
+            x, y = start_cell
+            paths_from_neighbors = [self.get_path(neighbor)
+                                    for neighbor in [(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)]
+                                    if neighbor in self._next_cells]
+            if not paths_from_neighbors:
+                return None
+            return [start_cell] + min(paths_from_neighbors, key=len)
+        path = [start_cell]
+        next_cell = self._next_cells[start_cell]
+        while next_cell is not None:
+            path.append(next_cell)
+            next_cell = self._next_cells[next_cell]
+        return path
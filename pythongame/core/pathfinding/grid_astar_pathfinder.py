@@ -1,19 +1,25 @@
-from typing import Tuple, Dict, List, Any, Optional
+from typing import Tuple, Dict, List, Any, Optional, Callable
 
 from pythongame.core.pathfinding.astar import AStar
+from pythongame.core.pathfinding.flow_field import FlowField
+from pythongame.core.pathfinding.path_cache import PathCache
+from pythongame.core.pathfinding.pathfinding_strategy import PathfindingStrategy
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+# A* searches (and flow fields) never go further away than this (in cells)
+PATH_MAX_DISTANCE = 20
+PATH_CACHE_CAPACITY = 200
 
 
 class GridBasedAStar(AStar):
 
-    def __init__(self, grid, agent_size: Tuple[int, int]):
-        # Grid is a 2d vector with 1s or 0s.
-        # 1 == cell is blocked
-        # 0 == cell is free
-        # We can create the grid based on wall positions
-        # Wall size is (50, 50) and all walls are placed on the (50, 50) grid
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        # The grid is based on wall positions. A cell is free for the agent if the agent can stand there (with its
+        # top-left corner) without touching a wall.
         self.grid = grid
         self.agent_size = agent_size
-        self._cache_is_cell_free: Dict[Tuple[int, int], bool] = {}
+        self._clearance_map: bytearray = grid.get_clearance_map(agent_size)
+        self.num_expanded_nodes = 0
 
         # Need to be initialized before running pathfinder
         self.min_x = 0
@@ -34,6 +40,7 @@ class GridBasedAStar(AStar):
         return 1
 
     def neighbors(self, node):
+        self.num_expanded_nodes += 1
         x, y = node
         adjacent_cells = [
             (x, y - 1),  # up
@@ -47,65 +54,104 @@ class GridBasedAStar(AStar):
         # Ignore cells that are too far out, to save resources. If agent strays too far, the path is aborted.
         if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
             return False
+        if not (0 <= x < self.grid.width and 0 <= y < self.grid.height):
+            return False
+        return self._clearance_map[x * self.grid.height + y] == 1
 
-        if (x, y) in self._cache_is_cell_free:
-            return self._cache_is_cell_free[(x, y)]
-        else:
-            is_free = self._compute_is_cell_free(x, y)
-            self._cache_is_cell_free[(x, y)] = is_free
-            return is_free
+    # Must be called if walls have changed
+    def update_clearance_map(self):
+        self._clearance_map = self.grid.get_clearance_map(self.agent_size)
 
-    def _compute_is_cell_free(self, x, y):
-        # Check that all relevant cells are within the map
-        if x < 0 or y < 0 or x + self.agent_size[0] >= len(self.grid) or y + self.agent_size[1] >= len(self.grid[x]):
-            return False
-        for _x in range(x, x + self.agent_size[0]):
-            for _y in range(y, y + self.agent_size[1]):
-                # Check if there is a wall at cell: if so, it's not free
-                if self.grid[_x][_y] == 1:
-                    return False
-        return True
+
+# The default pathfinding strategy. Searches are bounded to the area around the start cell, as they get expensive for
+# long paths.
+class AStarStrategy(PathfindingStrategy):
+
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        super().__init__(grid, agent_size)
+        self._astar = GridBasedAStar(grid, agent_size)
+
+    def find_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        self._astar.set_pathfinding_bounds(start_cell[0] - PATH_MAX_DISTANCE,
+                                           start_cell[1] - PATH_MAX_DISTANCE,
+                                           start_cell[0] + PATH_MAX_DISTANCE,
+                                           start_cell[1] + PATH_MAX_DISTANCE)
+        num_expanded_nodes_before = self._astar.num_expanded_nodes
+        result = self._astar.astar(start_cell, goal_cell)
+        self.num_expanded_nodes += self._astar.num_expanded_nodes - num_expanded_nodes_before
+        if result is None:
+            return None
+        return list(result)
+
+    def handle_changed_walls(self):
+        self._astar.update_clearance_map()
 
 
 # One instance of this class is shared by all enemies. This should allow for better caching of computations
 class GlobalPathFinder:
-    def __init__(self):
-        self.grid = None  # grid must be set before you can use the pathfinder
-        self.astars_by_entity_size: Dict[Tuple[int, int], GridBasedAStar] = {}
-
-    def set_grid(self, grid):
+    def __init__(self,
+                 create_strategy: Callable[[WallGrid, Tuple[int, int]], PathfindingStrategy] = AStarStrategy):
+        self.grid: WallGrid = None  # grid must be set before you can use the pathfinder
+        self._grid_version = None
+        self._create_strategy = create_strategy
+        self.strategies_by_entity_size: Dict[Tuple[int, int], PathfindingStrategy] = {}
+        self.flow_fields_by_entity_size: Dict[Tuple[int, int], FlowField] = {}
+        self.path_cache = PathCache(PATH_CACHE_CAPACITY)
+
+    def set_grid(self, grid: WallGrid):
         self.grid = grid
+        self._grid_version = grid.version
 
     def register_entity_size(self, size: Tuple[int, int]):
-        if not size in self.astars_by_entity_size:
-            self.astars_by_entity_size[size] = GridBasedAStar(self.grid, size)
+        if not size in self.strategies_by_entity_size:
+            self.strategies_by_entity_size[size] = self._create_strategy(self.grid, size)
+            self.flow_fields_by_entity_size[size] = FlowField(self.grid, size, PATH_MAX_DISTANCE)
 
     def run(self, entity_size: Tuple[int, int], start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) \
             -> Optional[List[Any]]:
+        self._handle_changed_walls()
+        is_cached, cached_path = self.path_cache.get(entity_size, start_cell, goal_cell)
+        if is_cached:
+            return cached_path
+
+        path = self._search(entity_size, start_cell, goal_cell)
+        self.path_cache.put(entity_size, start_cell, goal_cell, path)
+        return path
 
-        astar = self.astars_by_entity_size[entity_size]
-        path_max_distance_from_start = 20
-        astar.set_pathfinding_bounds(start_cell[0] - path_max_distance_from_start,
-                                     start_cell[1] - path_max_distance_from_start,
-                                     start_cell[0] + path_max_distance_from_start,
-                                     start_cell[1] + path_max_distance_from_start)
-        result = astar.astar(start_cell, goal_cell)
+    def _search(self, entity_size: Tuple[int, int], start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) \
+            -> Optional[List[Any]]:
+        strategy = self.strategies_by_entity_size[entity_size]
+        path = strategy.find_path(start_cell, goal_cell)
 
         # TODO: Handle this in a better way
         # HACK:
-        if result is None:
+        if path is None:
             # print("Couldn't find path. Trying with position right above player instead.")
             goal_cell_2 = (goal_cell[0], goal_cell[1] - 1)
-            result = astar.astar(start_cell, goal_cell_2)
-            if result is None:
+            path = strategy.find_path(start_cell, goal_cell_2)
+            if path is None:
                 goal_cell_3 = (goal_cell[0] - 1, goal_cell[1])
-                result = astar.astar(start_cell, goal_cell_3)
-
-        if result is None:
-            return None
-
-        path_list = []
-        for x in result:
-            path_list.append(x)
-
-        return path_list
+                path = strategy.find_path(start_cell, goal_cell_3)
+
+        return path
+
+    # Use this instead of run() when many agents are heading for the same goal (i.e. the player). Rather than searching
+    # for a path from each agent, a flow field is computed around the goal and shared by all agents of the same size.
+    # It's only recomputed when the goal moves to another cell.
+    def run_with_flow_field(self, entity_size: Tuple[int, int], start_cell: Tuple[int, int],
+                            goal_cell: Tuple[int, int]) -> Optional[List[Any]]:
+        self._handle_changed_walls()
+        flow_field = self.flow_fields_by_entity_size[entity_size]
+        if flow_field.goal_cell != goal_cell:
+            flow_field.compute(goal_cell)
+        return flow_field.get_path(start_cell)
+
+    # Walls can be added and removed (in the map editor), which invalidates anything computed from the old walls
+    def _handle_changed_walls(self):
+        if self._grid_version != self.grid.version:
+            self._grid_version = self.grid.version
+            for strategy in self.strategies_by_entity_size.values():
+                strategy.handle_changed_walls()
+            for flow_field in self.flow_fields_by_entity_size.values():
+                flow_field.clear()
+            self.path_cache.clear()
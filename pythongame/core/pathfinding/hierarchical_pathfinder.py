@@ -0,0 +1,222 @@
+from collections import deque
+from heapq import heappush, heappop
+from typing import Tuple, List, Optional, Dict
+
+from pythongame.core.pathfinding.pathfinding_strategy import PathfindingStrategy
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+CLUSTER_SIZE = 10
+# Entrances that are wider than this get two transitions (one at each end) instead of one in the middle
+MAX_SINGLE_TRANSITION_ENTRANCE_WIDTH = 6
+
+Cell = Tuple[int, int]
+
+
+# Hierarchical pathfinding (HPA*)
+#
+# The grid is divided into square clusters. Where two neighboring clusters share an open border (an "entrance"), a
+# transition is placed: a pair of cells, one on each side. The transition cells are the nodes of an abstract graph,
+# with edges between cells of the same cluster (with the length of the shortest path between them within the cluster)
+# and between the two cells of each transition.
+#
+# A path is found by connecting the start and goal to the graph, searching the (small) abstract graph, and then
+# filling in the cells between the nodes with searches that are restricted to single clusters. Long paths across the
+# whole world are cheap to find, but they aren't always the shortest possible, as they have to go through the
+# transitions. Goals in the same or a neighboring cluster are searched for directly instead. On map1 (2x2 agent),
+# paths are on average 1-2% longer than the shortest, but some short paths to a goal two clusters away are up to 1.7
+# times as long.
+#
+# The graph is built the first time it's needed, and rebuilt after walls have changed.
+class HierarchicalPathFinder(PathfindingStrategy):
+
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        super().__init__(grid, agent_size)
+        self._clearance_map = grid.get_clearance_map(agent_size)
+        # Abstract graph: transition cell -> [(other transition cell, distance)]
+        self._edges: Dict[Cell, List[Tuple[Cell, int]]] = None
+        self._nodes_by_cluster: Dict[Cell, List[Cell]] = None
+
+    def handle_changed_walls(self):
+        self._clearance_map = self.grid.get_clearance_map(self.agent_size)
+        self._edges = None
+        self._nodes_by_cluster = None
+
+    def find_path(self, start_cell: Cell, goal_cell: Cell) -> Optional[List[Cell]]:
+        if start_cell == goal_cell:
+            return [start_cell]
+        if not self._is_free(goal_cell[0], goal_cell[1]):
+            return None
+        if self._edges is None:
+            self._build_graph()
+
+        start_cluster = _cluster_of(start_cell)
+        goal_cluster = _cluster_of(goal_cell)
+        start_distances, start_parents = self._search_within_cluster(start_cell)
+        if start_cluster == goal_cluster and goal_cell in start_parents:
+            return _reconstruct_path(start_parents, goal_cell)
+        # Short paths would often be a lot longer than needed if they went through the transitions, so when the goal
+        # is in a neighboring cluster, the two clusters are searched directly first
+        if abs(start_cluster[0] - goal_cluster[0]) <= 1 and abs(start_cluster[1] - goal_cluster[1]) <= 1:
+            first_cluster = (min(start_cluster[0], goal_cluster[0]), min(start_cluster[1], goal_cluster[1]))
+            last_cluster = (max(start_cluster[0], goal_cluster[0]), max(start_cluster[1], goal_cluster[1]))
+            _distances, parents = self._search_within_clusters(start_cell, first_cluster, last_cluster)
+            if goal_cell in parents:
+                return _reconstruct_path(parents, goal_cell)
+
+        # Connect start and goal to the abstract graph
+        start_edges = [(node, start_distances[node]) for node in self._nodes_by_cluster.get(start_cluster, [])
+                       if node in start_distances]
+        goal_distances, _ = self._search_within_cluster(goal_cell)
+        goal_edges = {node: goal_distances[node] for node in self._nodes_by_cluster.get(goal_cluster, [])
+                      if node in goal_distances}
+        if not start_edges or not goal_edges:
+            return None
+
+        abstract_path = self._search_abstract_graph(start_cell, start_edges, goal_cell, goal_edges)
+        if abstract_path is None:
+            return None
+        return self._refine(abstract_path, start_parents)
+
+    def _is_free(self, x: int, y: int) -> bool:
+        return 0 <= x < self.grid.width and 0 <= y < self.grid.height \
+               and self._clearance_map[x * self.grid.height + y] == 1
+
+    def _build_graph(self):
+        # The searches done while building the graph aren't counted as part of any path search
+        num_expanded_nodes = self.num_expanded_nodes
+        self._edges = {}
+        self._nodes_by_cluster = {}
+        num_clusters_x = (self.grid.width + CLUSTER_SIZE - 1) // CLUSTER_SIZE
+        num_clusters_y = (self.grid.height + CLUSTER_SIZE - 1) // CLUSTER_SIZE
+        for cluster_x in range(num_clusters_x):
+            for cluster_y in range(num_clusters_y):
+                # Border between this cluster and the one to the right
+                x = (cluster_x + 1) * CLUSTER_SIZE - 1
+                if x + 1 < self.grid.width:
+                    y_range = range(cluster_y * CLUSTER_SIZE, min((cluster_y + 1) * CLUSTER_SIZE, self.grid.height))
+                    self._add_transitions([((x, y), (x + 1, y)) for y in y_range])
+                # Border between this cluster and the one below
+                y = (cluster_y + 1) * CLUSTER_SIZE - 1
+                if y + 1 < self.grid.height:
+                    x_range = range(cluster_x * CLUSTER_SIZE, min((cluster_x + 1) * CLUSTER_SIZE, self.grid.width))
+                    self._add_transitions([((x, y), (x, y + 1)) for x in x_range])
+
+        for nodes in self._nodes_by_cluster.values():
+            for node in nodes:
+                distances, _ = self._search_within_cluster(node)
+                for other_node in nodes:
+                    if other_node != node and other_node in distances:
+                        self._edges[node].append((other_node, distances[other_node]))
+        self.num_expanded_nodes = num_expanded_nodes
+
+    # Takes the pairs of cells along a border, and adds transitions for each entrance (each run of pairs where both
+    # cells are free)
+    def _add_transitions(self, border: List[Tuple[Cell, Cell]]):
+        entrance = []
+        for pair in border + [None]:
+            if pair is not None and self._is_free(*pair[0]) and self._is_free(*pair[1]):
+                entrance.append(pair)
+            elif entrance:
+                if len(entrance) > MAX_SINGLE_TRANSITION_ENTRANCE_WIDTH:
+                    self._add_transition(entrance[0])
+                    self._add_transition(entrance[-1])
+                else:
+                    self._add_transition(entrance[len(entrance) // 2])
+                entrance = []
+
+    def _add_transition(self, pair: Tuple[Cell, Cell]):
+        for node, other_node in [pair, (pair[1], pair[0])]:
+            if node not in self._edges:
+                self._edges[node] = []
+                self._nodes_by_cluster.setdefault(_cluster_of(node), []).append(node)
+            self._edges[node].append((other_node, 1))
+
+    # Breadth-first search from the cell, without leaving its cluster. The cell itself doesn't have to be free (an
+    # agent may be standing a bit too close to a wall).
+    def _search_within_cluster(self, start_cell: Cell) -> Tuple[Dict[Cell, int], Dict[Cell, Optional[Cell]]]:
+        cluster = _cluster_of(start_cell)
+        return self._search_within_clusters(start_cell, cluster, cluster)
+
+    # Same as above, but within the rectangle of clusters from first_cluster to last_cluster (inclusive)
+    def _search_within_clusters(self, start_cell: Cell, first_cluster: Cell, last_cluster: Cell) \
+            -> Tuple[Dict[Cell, int], Dict[Cell, Optional[Cell]]]:
+        min_x = first_cluster[0] * CLUSTER_SIZE
+        min_y = first_cluster[1] * CLUSTER_SIZE
+        max_x = (last_cluster[0] + 1) * CLUSTER_SIZE - 1
+        max_y = (last_cluster[1] + 1) * CLUSTER_SIZE - 1
+        distances = {start_cell: 0}
+        parents = {start_cell: None}
+        queue = deque([start_cell])
+        while queue:
+            cell = queue.popleft()
+            self.num_expanded_nodes += 1
+            x, y = cell
+            for neighbor in [(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)]:
+                if neighbor not in distances and min_x <= neighbor[0] <= max_x and min_y <= neighbor[1] <= max_y \
+                        and self._is_free(neighbor[0], neighbor[1]):
+                    distances[neighbor] = distances[cell] + 1
+                    parents[neighbor] = cell
+                    queue.append(neighbor)
+        return distances, parents
+
+    def _search_abstract_graph(self, start_cell: Cell, start_edges: List[Tuple[Cell, int]], goal_cell: Cell,
+                               goal_edges: Dict[Cell, int]) -> Optional[List[Cell]]:
+        came_from = {start_cell: None}
+        g_scores = {start_cell: 0}
+        closed = set()
+        open_set = [(_distance(start_cell, goal_cell), 0, start_cell)]
+        counter = 0
+        while open_set:
+            _f_score, _, node = heappop(open_set)
+            if node in closed:
+                continue
+            if node == goal_cell:
+                return _reconstruct_path(came_from, node)
+            closed.add(node)
+            self.num_expanded_nodes += 1
+            edges = self._edges.get(node, [])
+            if node == start_cell:
+                edges = edges + start_edges
+            if node in goal_edges:
+                edges = edges + [(goal_cell, goal_edges[node])]
+            for neighbor, distance in edges:
+                if neighbor in closed:
+                    continue
+                g_score = g_scores[node] + distance
+                if g_score < g_scores.get(neighbor, g_score + 1):
+                    g_scores[neighbor] = g_score
+                    came_from[neighbor] = node
+                    counter += 1
+                    heappush(open_set, (g_score + _distance(neighbor, goal_cell), counter, neighbor))
+        return None
+
+    # Fills in the cells between the nodes of the abstract path. Consecutive nodes are either the two (adjacent) cells
+    # of a transition, or two cells in the same cluster.
+    def _refine(self, abstract_path: List[Cell], start_parents: Dict[Cell, Optional[Cell]]) -> List[Cell]:
+        path = [abstract_path[0]]
+        for node, next_node in zip(abstract_path, abstract_path[1:]):
+            if _distance(node, next_node) == 1:
+                path.append(next_node)
+            else:
+                # We have already searched from the start cell
+                parents = start_parents if node == abstract_path[0] else self._search_within_cluster(node)[1]
+                path += _reconstruct_path(parents, next_node)[1:]
+        return path
+
+
+def _cluster_of(cell: Cell) -> Cell:
+    return cell[0] // CLUSTER_SIZE, cell[1] // CLUSTER_SIZE
+
+
+def _distance(a: Cell, b: Cell) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _reconstruct_path(parents: Dict[Cell, Optional[Cell]], last: Cell) -> List[Cell]:
+    path = []
+    cell = last
+    while cell is not None:
+        path.append(cell)
+        cell = parents[cell]
+    path.reverse()
+    return path
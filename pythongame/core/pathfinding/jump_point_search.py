@@ -0,0 +1,210 @@
+from heapq import heappush, heappop
+from typing import Tuple, List, Optional, Dict
+
+from pythongame.core.common import Direction
+from pythongame.core.pathfinding.pathfinding_strategy import PathfindingStrategy
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+
+# Jump Point Search, for the 4-connected grid where every step has the same cost.
+#
+# Like A*, but instead of adding every neighbor of a cell to the open set, the search "jumps" in a straight line until
+# it reaches a cell where something interesting happens: the goal, or a cell next to the corner of a wall (where a
+# shortest path may turn). Only those jump points are added to the open set, which makes the search expand far fewer
+# nodes than A* in open areas. When moving vertically, a cell is also a jump point if there is a jump point to the
+# left or right of it, since 4-connected paths can only turn by first moving horizontally.
+#
+# To make jumps cheap, the distance to the next jump point (or wall) is precomputed for each cell and direction (this
+# is known as "JPS+"). Only the goal has to be checked for during the search. Since searches are cheap, they aren't
+# bounded to the area around the start cell.
+class JumpPointSearch(PathfindingStrategy):
+
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        super().__init__(grid, agent_size)
+        self._clearance_map = grid.get_clearance_map(agent_size)
+        # For each direction: a positive value is the distance from the cell to the next jump point. Otherwise, it's
+        # the negated number of steps that can be taken before hitting a wall (and there is no jump point on the way).
+        # Computed the first time they're needed.
+        self._jump_distances: Dict[Direction, List[int]] = None
+
+    def handle_changed_walls(self):
+        self._clearance_map = self.grid.get_clearance_map(self.agent_size)
+        self._jump_distances = None
+
+    def find_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        if start_cell == goal_cell:
+            return [start_cell]
+        # Otherwise the whole area reachable from the start would be searched in vain
+        if not self._is_free(goal_cell[0], goal_cell[1]):
+            return None
+        if self._jump_distances is None:
+            self._precompute_jump_distances()
+
+        came_from: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {start_cell: None}
+        g_scores: Dict[Tuple[int, int], int] = {start_cell: 0}
+        closed = set()
+        open_set = []
+        # The counter breaks ties between nodes with the same score, in the order they were added
+        counter = 0
+        heappush(open_set, (_distance(start_cell, goal_cell), counter, start_cell))
+        while open_set:
+            _f_score, _, node = heappop(open_set)
+            if node in closed:
+                continue
+            if node == goal_cell:
+                return _expand_path(_reconstruct_path(came_from, node))
+            closed.add(node)
+            self.num_expanded_nodes += 1
+            for direction in _pruned_directions(node, came_from[node]):
+                jump_point = self._jump(node, direction, goal_cell)
+                if jump_point is None or jump_point in closed:
+                    continue
+                g_score = g_scores[node] + _distance(node, jump_point)
+                if g_score < g_scores.get(jump_point, g_score + 1):
+                    g_scores[jump_point] = g_score
+                    came_from[jump_point] = node
+                    counter += 1
+                    heappush(open_set, (g_score + _distance(jump_point, goal_cell), counter, jump_point))
+        return None
+
+    def _is_free(self, x: int, y: int) -> bool:
+        return 0 <= x < self.grid.width and 0 <= y < self.grid.height \
+               and self._clearance_map[x * self.grid.height + y] == 1
+
+    # Returns the first jump point (or the goal) when moving from the cell in the given direction, or None if a wall is
+    # hit before that
+    def _jump(self, cell: Tuple[int, int], direction: Direction, goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        x, y = cell
+        if not (0 <= x < self.grid.width and 0 <= y < self.grid.height):
+            return None
+        height = self.grid.height
+        jump_distance = self._jump_distances[direction][x * height + y]
+        max_steps = jump_distance if jump_distance > 0 else -jump_distance
+        dx, dy = _DIRECTION_VECTORS[direction]
+        if dx != 0:
+            if goal[1] == y and 0 < (goal[0] - x) * dx <= max_steps:
+                return goal
+        else:
+            steps_to_goal_row = (goal[1] - y) * dy
+            # The goal row is a jump point if the goal can be reached by moving horizontally from it. (Cells where it
+            # would have been a jump point for any goal are already covered by the precomputed distance.)
+            if 0 < steps_to_goal_row <= max_steps and (jump_distance <= 0 or steps_to_goal_row < jump_distance):
+                index = x * height + goal[1]
+                if goal[0] == x \
+                        or 0 < goal[0] - x <= -self._jump_distances[Direction.RIGHT][index] \
+                        or 0 < x - goal[0] <= -self._jump_distances[Direction.LEFT][index]:
+                    return x, goal[1]
+        if jump_distance > 0:
+            return x + dx * jump_distance, y + dy * jump_distance
+        return None
+
+    def _precompute_jump_distances(self):
+        width = self.grid.width
+        height = self.grid.height
+        is_free = self._is_free
+        right = [0] * (width * height)
+        left = [0] * (width * height)
+        down = [0] * (width * height)
+        up = [0] * (width * height)
+
+        # Horizontal: a cell that is entered from the side is a jump point if it has a "forced neighbor": a free cell
+        # above or below it, next to a wall that blocks the corresponding cell that was passed
+        for y in range(height):
+            for x in range(width - 1, -1, -1):
+                index = x * height + y
+                next_x = x + 1
+                if not is_free(next_x, y):
+                    right[index] = 0
+                elif (is_free(next_x, y - 1) and not is_free(x, y - 1)) \
+                        or (is_free(next_x, y + 1) and not is_free(x, y + 1)):
+                    right[index] = 1
+                else:
+                    following = right[index + height]
+                    right[index] = following + 1 if following > 0 else following - 1
+            for x in range(width):
+                index = x * height + y
+                next_x = x - 1
+                if not is_free(next_x, y):
+                    left[index] = 0
+                elif (is_free(next_x, y - 1) and not is_free(x, y - 1)) \
+                        or (is_free(next_x, y + 1) and not is_free(x, y + 1)):
+                    left[index] = 1
+                else:
+                    following = left[index - height]
+                    left[index] = following + 1 if following > 0 else following - 1
+
+        # Vertical: forced neighbors to the left or right, or a jump point when moving horizontally from the cell
+        for x in range(width):
+            for y in range(height - 1, -1, -1):
+                index = x * height + y
+                next_y = y + 1
+                if not is_free(x, next_y):
+                    down[index] = 0
+                elif (is_free(x - 1, next_y) and not is_free(x - 1, y)) \
+                        or (is_free(x + 1, next_y) and not is_free(x + 1, y)) \
+                        or right[index + 1] > 0 or left[index + 1] > 0:
+                    down[index] = 1
+                else:
+                    following = down[index + 1]
+                    down[index] = following + 1 if following > 0 else following - 1
+            for y in range(height):
+                index = x * height + y
+                next_y = y - 1
+                if not is_free(x, next_y):
+                    up[index] = 0
+                elif (is_free(x - 1, next_y) and not is_free(x - 1, y)) \
+                        or (is_free(x + 1, next_y) and not is_free(x + 1, y)) \
+                        or right[index - 1] > 0 or left[index - 1] > 0:
+                    up[index] = 1
+                else:
+                    following = up[index - 1]
+                    up[index] = following + 1 if following > 0 else following - 1
+
+        self._jump_distances = {Direction.RIGHT: right, Direction.LEFT: left, Direction.DOWN: down, Direction.UP: up}
+
+
+_DIRECTION_VECTORS = {
+    Direction.RIGHT: (1, 0),
+    Direction.LEFT: (-1, 0),
+    Direction.DOWN: (0, 1),
+    Direction.UP: (0, -1),
+}
+
+
+# When arriving at a jump point, there's no need to turn back
+def _pruned_directions(node: Tuple[int, int], parent: Optional[Tuple[int, int]]) -> List[Direction]:
+    if parent is None:
+        return [Direction.UP, Direction.LEFT, Direction.RIGHT, Direction.DOWN]
+    if parent[1] == node[1]:
+        return [Direction.RIGHT if node[0] > parent[0] else Direction.LEFT, Direction.UP, Direction.DOWN]
+    return [Direction.DOWN if node[1] > parent[1] else Direction.UP, Direction.LEFT, Direction.RIGHT]
+
+
+def _distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _reconstruct_path(came_from: Dict[Tuple[int, int], Optional[Tuple[int, int]]], last: Tuple[int, int]) \
+        -> List[Tuple[int, int]]:
+    path = []
+    node = last
+    while node is not None:
+        path.append(node)
+        node = came_from[node]
+    path.reverse()
+    return path
+
+
+# Jump points are connected by straight lines. Fill in the cells between them, so that the path moves one cell at a
+# time (like the paths found by A*).
+def _expand_path(jump_points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    path = [jump_points[0]]
+    for (x, y) in jump_points[1:]:
+        current_x, current_y = path[-1]
+        step_x = (x > current_x) - (x < current_x)
+        step_y = (y > current_y) - (y < current_y)
+        while (current_x, current_y) != (x, y):
+            current_x += step_x
+            current_y += step_y
+            path.append((current_x, current_y))
+    return path
@@ -25,7 +25,11 @@ class NpcPathfinder:
         agent_cell_size = (agent_entity.pygame_collision_rect.w // GRID_CELL_WIDTH + 1,
                            agent_entity.pygame_collision_rect.h // GRID_CELL_WIDTH + 1)
         self.global_path_finder.register_entity_size(agent_cell_size)
-        path_with_cells = self.global_path_finder.run(agent_cell_size, agent_cell, target_cell)
+        if target_entity is game_state.player_entity:
+            # Most NPCs are chasing the player, so they can share one flow field instead of running a search each
+            path_with_cells = self.global_path_finder.run_with_flow_field(agent_cell_size, agent_cell, target_cell)
+        else:
+            path_with_cells = self.global_path_finder.run(agent_cell_size, agent_cell, target_cell)
         if path_with_cells:
             # Note: Cells are expressed in non-negative values (and need to be translated to game world coordinates)
             path = [_translate_cell_to_world_position(cell, game_state.entire_world_area) for cell in path_with_cells]
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Tuple, Dict, List, Optional, Any
+
+CacheKey = Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]  # (agent size, start cell, goal cell)
+
+
+class _CachedPath:
+    def __init__(self, path: Optional[List[Tuple[int, int]]]):
+        self.path = path
+        # Lets us find out quickly if some other start cell lies along the path
+        self.index_by_cell: Dict[Tuple[int, int], int] = {cell: i for i, cell in enumerate(path)} if path else {}
+
+
+# Remembers the most recently found paths. Agents of the same size often stand in (almost) the same place and look for
+# paths to the same goal. If an agent's start cell lies along a path that was found for some other agent, the rest of
+# that path is reused.
+#
+# Paths only depend on walls, so the cache must be cleared whenever walls change.
+class PathCache:
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._paths: Dict[CacheKey, _CachedPath] = OrderedDict()
+        # Cached keys, grouped by (agent size, goal cell), for looking up path suffixes
+        self._keys_by_size_and_goal: Dict[Tuple[Tuple[int, int], Tuple[int, int]], List[CacheKey]] = {}
+        self.num_hits = 0
+        self.num_suffix_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+
+    # Returns (True, path) if there is a cached result (the path is None if it was found that there is no path), and
+    # (False, None) otherwise
+    def get(self, agent_size: Tuple[int, int], start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) \
+            -> Tuple[bool, Optional[List[Any]]]:
+        key = (agent_size, start_cell, goal_cell)
+        cached = self._paths.get(key)
+        if cached is not None:
+            self._paths.move_to_end(key)
+            self.num_hits += 1
+            return True, list(cached.path) if cached.path else None
+
+        for other_key in self._keys_by_size_and_goal.get((agent_size, goal_cell), []):
+            other = self._paths[other_key]
+            index = other.index_by_cell.get(start_cell)
+            if index is not None:
+                self._paths.move_to_end(other_key)
+                self.num_suffix_hits += 1
+                return True, other.path[index:]
+
+        self.num_misses += 1
+        return False, None
+
+    def put(self, agent_size: Tuple[int, int], start_cell: Tuple[int, int], goal_cell: Tuple[int, int],
+            path: Optional[List[Any]]):
+        key = (agent_size, start_cell, goal_cell)
+        if key in self._paths:
+            self._remove(key)
+        self._paths[key] = _CachedPath(list(path) if path else None)
+        self._keys_by_size_and_goal.setdefault((agent_size, goal_cell), []).append(key)
+        if len(self._paths) > self._capacity:
+            least_recently_used_key = next(iter(self._paths))
+            self._remove(least_recently_used_key)
+            self.num_evictions += 1
+
+    def clear(self):
+        self._paths.clear()
+        self._keys_by_size_and_goal.clear()
+
+    def get_hit_rate(self) -> float:
+        num_lookups = self.num_hits + self.num_suffix_hits + self.num_misses
+        return (self.num_hits + self.num_suffix_hits) / num_lookups if num_lookups > 0 else 0
+
+    def _remove(self, key: CacheKey):
+        del self._paths[key]
+        agent_size, _start_cell, goal_cell = key
+        keys = self._keys_by_size_and_goal[(agent_size, goal_cell)]
+        keys.remove(key)
+        if not keys:
+            del self._keys_by_size_and_goal[(agent_size, goal_cell)]
@@ -0,0 +1,22 @@
+from typing import Tuple, List, Optional
+
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+
+# A pathfinding engine that finds paths between cells for agents of one specific size. GlobalPathFinder creates one
+# instance for each agent size, using the strategy it has been configured with.
+class PathfindingStrategy:
+
+    def __init__(self, grid: WallGrid, agent_size: Tuple[int, int]):
+        self.grid = grid
+        self.agent_size = agent_size
+        # Total number of nodes that have been expanded by all searches so far. Used for benchmarking.
+        self.num_expanded_nodes = 0
+
+    # Returns the path from start to goal, including both of them. Returns None if no path is found.
+    def find_path(self, start_cell: Tuple[int, int], goal_cell: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        pass
+
+    # Is called whenever walls have been added or removed
+    def handle_changed_walls(self):
+        pass
@@ -0,0 +1,96 @@
+from array import array
+from itertools import accumulate
+from operator import add
+from typing import Tuple, Dict, List
+
+
+# The walls of the game world, as seen by the pathfinder. Cells are stored column by column in a flat array (the cell
+# (x, y) is at index x * height + y).
+#
+# For each agent size, a "clearance map" is computed on demand, telling whether an agent of that size can stand with
+# its top-left corner in a given cell without overlapping any wall. This makes checking a cell a single lookup, no
+# matter how big the agent is. Clearance maps are thrown away whenever a wall is added or removed (in the map editor).
+class WallGrid:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        # Number of walls in each cell (a cell may contain several walls, in the map editor)
+        self._wall_counts = array('H', [0]) * (width * height)
+        self._clearance_maps_by_agent_size: Dict[Tuple[int, int], bytearray] = {}
+        self._summed_area_table: List[List[int]] = None
+        # Incremented whenever walls change, so that users of the grid can invalidate their own caches
+        self.version = 0
+
+    def contains_cell(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    # Cells outside of the grid are treated as walls
+    def is_wall(self, x: int, y: int) -> bool:
+        if not self.contains_cell(x, y):
+            return True
+        return self._wall_counts[x * self.height + y] > 0
+
+    def add_wall(self, x: int, y: int):
+        index = self._get_index(x, y)
+        self._wall_counts[index] += 1
+        if self._wall_counts[index] == 1:
+            self._on_walls_changed()
+
+    def remove_wall(self, x: int, y: int):
+        index = self._get_index(x, y)
+        if self._wall_counts[index] == 0:
+            raise Exception("No wall to remove at cell " + str((x, y)))
+        self._wall_counts[index] -= 1
+        if self._wall_counts[index] == 0:
+            self._on_walls_changed()
+
+    def get_clearance_map(self, agent_size: Tuple[int, int]) -> bytearray:
+        clearance_map = self._clearance_maps_by_agent_size.get(agent_size)
+        if clearance_map is None:
+            clearance_map = self._compute_clearance_map(agent_size)
+            self._clearance_maps_by_agent_size[agent_size] = clearance_map
+        return clearance_map
+
+    # Without this check, a cell outside of the grid would wrap around to a cell on the other side of it
+    def _get_index(self, x: int, y: int) -> int:
+        if not self.contains_cell(x, y):
+            raise Exception("Cell " + str((x, y)) + " is outside of the wall grid " + str((self.width, self.height)))
+        return x * self.height + y
+
+    def _on_walls_changed(self):
+        self._clearance_maps_by_agent_size.clear()
+        self._summed_area_table = None
+        self.version += 1
+
+    # 1 == the agent fits with its top-left corner in the cell
+    # 0 == the agent would overlap a wall, or stick out of the grid
+    def _compute_clearance_map(self, agent_size: Tuple[int, int]) -> bytearray:
+        width = self.width
+        height = self.height
+        agent_w, agent_h = agent_size
+        sums = self._get_summed_area_table()
+
+        clearance_map = bytearray(width * height)
+        # Note: agents are never allowed to touch the last row/column of the grid
+        for x in range(width - agent_w):
+            # walls_per_row[y] is the number of walls within columns [x, x + agent_w) and rows [0, y)
+            walls_per_row = [far - near for far, near in zip(sums[x + agent_w], sums[x])]
+            column_start = x * height
+            for y in range(height - agent_h):
+                if walls_per_row[y + agent_h] == walls_per_row[y]:
+                    clearance_map[column_start + y] = 1
+        return clearance_map
+
+    # Summed-area table: sums[x][y] is the number of wall cells that are above and to the left of cell (x, y), i.e.
+    # within columns [0, x) and rows [0, y). It's shared by the clearance maps of all agent sizes.
+    def _get_summed_area_table(self) -> List[List[int]]:
+        if self._summed_area_table is None:
+            height = self.height
+            column_sums = [0] * (height + 1)
+            table = [column_sums]
+            for x in range(self.width):
+                walls_in_column = (1 if count > 0 else 0 for count in self._wall_counts[x * height: (x + 1) * height])
+                column_sums = list(map(add, column_sums, accumulate(walls_in_column, initial=0)))
+                table.append(column_sums)
+            self._summed_area_table = table
+        return self._summed_area_table
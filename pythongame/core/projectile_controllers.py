@@ -2,6 +2,7 @@ from typing import Dict, Type
 
 from pythongame.core.common import *
 from pythongame.core.game_state import Projectile, NonPlayerCharacter, GameState
+from pythongame.core.lazy_game_data import LazyRegistry
 
 
 class AbstractProjectileController:
@@ -31,7 +32,8 @@ class AbstractProjectileController:
         pass
 
 
-_projectile_controllers: Dict[ProjectileType, Type[AbstractProjectileController]] = {}
+_projectile_controllers: Dict[ProjectileType, Type[AbstractProjectileController]] = LazyRegistry(
+    "projectile_controllers")
 
 
 def register_projectile_controller(projectile_type: ProjectileType, controller: Type[AbstractProjectileController]):
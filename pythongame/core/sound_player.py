@@ -9,6 +9,9 @@ _sounds_by_id: Dict[SoundId, List[Any]] = {}
 
 muted = False
 
+# When running without audio (headless simulation), all sounds are silently dropped
+_silent = False
+
 LOOPING_SOUNDS = [SoundId.FOOTSTEPS]
 
 
@@ -85,9 +88,16 @@ def init_sound_player():
     }
 
 
+def init_silent_sound_player():
+    global _silent
+    if _sounds_by_id:
+        raise Exception("Sound player has already been initialized with sounds!")
+    _silent = True
+
+
 def play_sound(sound_id: SoundId):
     global muted
-    if muted:
+    if muted or _silent:
         return
     if not _sounds_by_id:
         raise Exception("Initialize sound player before playing sounds!")
@@ -105,6 +115,8 @@ def play_sound(sound_id: SoundId):
 def stop_looping_sound(sound_id: SoundId):
     if sound_id not in LOOPING_SOUNDS:
         raise Exception("Only use this method for looping sounds!")
+    if _silent:
+        return
     if not _sounds_by_id:
         raise Exception("Initialize sound player before playing sounds!")
     if sound_id in _sounds_by_id:
@@ -0,0 +1,94 @@
+from typing import Callable, Dict, List
+
+# Level 0 has a slot for each millisecond of the current level 1 slot, and level 1 has a slot for each level 1 span of
+# the current level 2 slot. Level 2 slots cover everything further into the future.
+LEVEL_1_SLOT_MS = 256
+LEVEL_2_SLOT_MS = LEVEL_1_SLOT_MS * 64
+
+
+class ScheduledCall:
+    __slots__ = ('time', 'callback', 'is_cancelled')
+
+    def __init__(self, time: int, callback: Callable[[], None]):
+        self.time = time
+        self.callback = callback
+        self.is_cancelled = False
+
+
+# A hierarchical timing wheel: calls are scheduled at a point in (simulated) time, and are made when the wheel is
+# advanced past that point. Calls that are far into the future are kept in coarse slots, and are moved down to finer
+# slots as time gets closer to them, so the work of advancing the wheel grows with the number of calls that are made
+# rather than with the number of calls that are waiting.
+#
+# Calls that are due at the same time are made in the order they were scheduled. Cancelled calls are dropped when
+# their time comes. A call that is scheduled for the current time (or earlier) is made the next time the wheel is
+# advanced.
+class TimingWheel:
+    def __init__(self):
+        self.time = 0
+        self._due: List[ScheduledCall] = []
+        # Slots are keyed by their absolute number (time // slot size), and only the occupied slots are stored
+        self._level_0: Dict[int, List[ScheduledCall]] = {}
+        self._level_1: Dict[int, List[ScheduledCall]] = {}
+        self._level_2: Dict[int, List[ScheduledCall]] = {}
+        self.num_scheduled_calls = 0
+        self.num_made_calls = 0
+        self.num_cancelled_calls = 0
+
+    def schedule(self, time: int, callback: Callable[[], None]) -> ScheduledCall:
+        call = ScheduledCall(time, callback)
+        self._insert(call)
+        self.num_scheduled_calls += 1
+        return call
+
+    def cancel(self, call: ScheduledCall):
+        if not call.is_cancelled:
+            call.is_cancelled = True
+            self.num_cancelled_calls += 1
+
+    def advance_to(self, time: int):
+        if self._due:
+            due = self._due
+            self._due = []
+            self._make_calls(due)
+        while self.time < time:
+            # Skip ahead over time where there is nothing to call, and nothing to move down to a finer level
+            if self._level_0:
+                now = self.time + 1
+            elif self._level_1:
+                now = min(time, (self.time // LEVEL_1_SLOT_MS + 1) * LEVEL_1_SLOT_MS)
+            elif self._level_2:
+                now = min(time, (self.time // LEVEL_2_SLOT_MS + 1) * LEVEL_2_SLOT_MS)
+            else:
+                now = time
+            self.time = now
+            if now % LEVEL_2_SLOT_MS == 0:
+                for call in self._level_2.pop(now // LEVEL_2_SLOT_MS, ()):
+                    self._level_1.setdefault(call.time // LEVEL_1_SLOT_MS, []).append(call)
+            if now % LEVEL_1_SLOT_MS == 0:
+                for call in self._level_1.pop(now // LEVEL_1_SLOT_MS, ()):
+                    self._level_0.setdefault(call.time, []).append(call)
+            calls = self._level_0.pop(now, None)
+            if calls:
+                self._make_calls(calls)
+
+    def get_num_pending_calls(self) -> int:
+        return len(self._due) + sum(len(calls) for level in (self._level_0, self._level_1, self._level_2)
+                                    for calls in level.values())
+
+    def _insert(self, call: ScheduledCall):
+        time = call.time
+        if time <= self.time:
+            self._due.append(call)
+        elif time // LEVEL_1_SLOT_MS == self.time // LEVEL_1_SLOT_MS:
+            self._level_0.setdefault(time, []).append(call)
+        elif time // LEVEL_2_SLOT_MS == self.time // LEVEL_2_SLOT_MS:
+            self._level_1.setdefault(time // LEVEL_1_SLOT_MS, []).append(call)
+        else:
+            self._level_2.setdefault(time // LEVEL_2_SLOT_MS, []).append(call)
+
+    def _make_calls(self, calls: List[ScheduledCall]):
+        for call in calls:
+            if not call.is_cancelled:
+                self.num_made_calls += 1
+                call.callback()
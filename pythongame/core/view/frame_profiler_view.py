@@ -0,0 +1,70 @@
+from typing import Dict, List, Tuple
+
+import pygame
+from pygame.rect import Rect
+
+from pythongame.core.frame_profiler import FrameProfiler, FRAME_PHASE
+from pythongame.core.view.render_util import DrawableArea
+
+DIR_FONTS = './resources/fonts/'
+COLOR_TEXT = (250, 250, 250)
+COLOR_GRAPH = (100, 200, 100)
+COLOR_GRAPH_SLOW_FRAME = (250, 100, 50)
+# The percentiles are only recalculated this often, so that they can be read and so that the overlay doesn't take up a
+# large part of the frame time that it shows
+UPDATE_INTERVAL_MS = 500
+GRAPH_HEIGHT = 60
+GRAPH_MAX_FRAME_TIME_MS = 50
+# Frames slower than this (i.e. below 60 fps) are highlighted in the graph
+SLOW_FRAME_TIME_MS = 1000 / 60
+
+
+# Shows how long the phases of a frame take (as p50 / p99 over the recent frames), a few counters from caches etc, and
+# a graph of the recent frame times. It's drawn on top of whatever scene is active.
+class FrameProfilerView:
+    def __init__(self, pygame_screen, screen_size: Tuple[int, int]):
+        self.screen_render = DrawableArea(pygame_screen)
+        self.font = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 12)
+        self.width = 270
+        self.x = screen_size[0] - self.width - 5
+        self.y = 25
+        self._phase_lines: List[Tuple[str, str]] = []
+        self._counter_lines: List[Tuple[str, str]] = []
+        self._time_of_last_update = None
+
+    def render(self, profiler: FrameProfiler, counters: Dict[str, int]):
+        now = pygame.time.get_ticks()
+        if self._time_of_last_update is None or now - self._time_of_last_update >= UPDATE_INTERVAL_MS:
+            self._time_of_last_update = now
+            self._phase_lines = []
+            for phase in profiler.get_phase_names():
+                p50, p99 = profiler.get_percentiles(phase)
+                self._phase_lines.append((phase, "{:6.2f} {:6.2f}".format(p50, p99)))
+            self._counter_lines = [(name, str(value)) for name, value in counters.items()]
+
+        line_height = 14
+        num_lines = 1 + len(self._phase_lines) + len(self._counter_lines)
+        height = 10 + num_lines * line_height + GRAPH_HEIGHT + 10
+        self.screen_render.rect_transparent(Rect(self.x, self.y, self.width, height), 180, (0, 0, 0))
+
+        x = self.x + 5
+        y = self.y + 5
+        self.screen_render.text(self.font, "ms (" + str(profiler.get_num_frames()) + " frames)", (x, y), COLOR_TEXT)
+        self.screen_render.text(self.font, "p50    p99", (x + 180, y), COLOR_TEXT)
+        for name, timings in self._phase_lines:
+            y += line_height
+            self.screen_render.text(self.font, name, (x, y), COLOR_TEXT)
+            self.screen_render.text(self.font, timings, (x + 166, y), COLOR_TEXT)
+        for name, value in self._counter_lines:
+            y += line_height
+            self.screen_render.text(self.font, name, (x, y), COLOR_TEXT)
+            self.screen_render.text(self.font, value, (x + 208, y), COLOR_TEXT)
+
+        # One vertical line per frame, with the most recent frame to the right
+        graph_bottom = y + line_height + 5 + GRAPH_HEIGHT
+        frame_times = profiler.get_history(FRAME_PHASE)[-(self.width - 10):]
+        graph_x = self.x + self.width - 5 - len(frame_times)
+        for i, frame_time in enumerate(frame_times):
+            bar_height = min(GRAPH_HEIGHT, int(frame_time * GRAPH_HEIGHT / GRAPH_MAX_FRAME_TIME_MS))
+            color = COLOR_GRAPH_SLOW_FRAME if frame_time > SLOW_FRAME_TIME_MS else COLOR_GRAPH
+            self.screen_render.line(color, (graph_x + i, graph_bottom), (graph_x + i, graph_bottom - bar_height), 1)
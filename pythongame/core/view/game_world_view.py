@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Dict, List, Tuple, Optional, Union, Iterable
 
 import pygame
 from pygame.rect import Rect
@@ -6,15 +6,18 @@ from pygame.rect import Rect
 from pythongame.core.common import Direction, Sprite
 from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, CHANNELING_BUFFS
 from pythongame.core.game_state import WorldEntity, DecorationEntity, NonPlayerCharacter, BuffWithDuration, \
-    QuestGiverState
-from pythongame.core.view.image_loading import ImageWithRelativePosition
+    QuestGiverState, WallsState, DecorationsState
+from pythongame.core.view.image_loading import ImageWithRelativePosition, LazyImageMapping
 from pythongame.core.view.render_util import DrawableArea, split_text_into_lines
+from pythongame.core.view.text_cache import GlyphAtlas
+from pythongame.core.view.static_world_layer import StaticWorldLayer
 from pythongame.core.visual_effects import VisualLine, VisualCircle, VisualRect, VisualText, VisualSprite, VisualCross, \
     VisualParticleSystem
 
 COLOR_BACKGROUND = (88 + 30, 72 + 30, 40 + 30)
 COLOR_BACKGROUND_LINES = (93 + 30, 77 + 30, 45 + 30)
 COLOR_RED = (250, 0, 0)
+GROUND_SQUARE_WIDTH = 35
 RENDER_WORLD_COORDINATES = False
 DIR_FONTS = './resources/fonts/'
 
@@ -30,7 +33,7 @@ class EntityActionText:
 class GameWorldView:
 
     def __init__(self, pygame_screen, camera_size: Tuple[int, int], screen_size: Tuple[int, int],
-                 images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]]):
+                 images_by_sprite: LazyImageMapping):
         pygame.font.init()
         self.screen_render = DrawableArea(pygame_screen)
         self.ui_render = DrawableArea(pygame_screen, self._translate_ui_position_to_screen)
@@ -46,8 +49,13 @@ class GameWorldView:
         self.font_visual_text = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 14)
         self.font_visual_text_large = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 16)
         self.font_quest_giver_mark = pygame.font.Font(DIR_FONTS + 'Courier New Bold.ttf', 28)
+        self.world_coordinates_glyph_atlas = GlyphAtlas(self.font_debug_info, (250, 250, 250))
 
-        self.images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]] = images_by_sprite
+        self.images_by_sprite: LazyImageMapping = images_by_sprite
+        self.static_world_layer = StaticWorldLayer(images_by_sprite)
+
+        # Drawing the ground is just a matter of blitting a part of this image
+        self.ground_image = _create_ground_image(camera_size)
 
         # This is updated every time the view is called
         self.camera_world_area = None
@@ -80,40 +88,37 @@ class GameWorldView:
     # ------------------------------------
 
     def _world_ground(self, entire_world_area: Rect):
-        grid_width = 35
-        # TODO num squares should depend on map size. Ideally this dumb looping logic should change.
-        num_squares = 200
-        column_screen_y_0 = self._translate_world_y_to_screen(self.camera_world_area.y)
-        column_screen_y_1 = self._translate_world_y_to_screen(
-            min(entire_world_area.y + entire_world_area.h, self.camera_world_area.y + self.camera_world_area.h))
-        for i_col in range(num_squares):
-            world_x = entire_world_area.x + i_col * grid_width
-            if entire_world_area.x < world_x < entire_world_area.x + entire_world_area.w:
-                screen_x = self._translate_world_x_to_screen(world_x)
-                self.screen_render.line(COLOR_BACKGROUND_LINES, (screen_x, column_screen_y_0),
-                                        (screen_x, column_screen_y_1),
-                                        1)
-        row_screen_x_0 = self._translate_world_x_to_screen(self.camera_world_area.x)
-        row_screen_x_1 = self._translate_world_x_to_screen(
-            min(entire_world_area.x + entire_world_area.w, self.camera_world_area.x + self.camera_world_area.w))
-        for i_row in range(num_squares):
-            world_y = entire_world_area.y + i_row * grid_width
-            if entire_world_area.y < world_y < entire_world_area.y + entire_world_area.h:
-                screen_y = self._translate_world_y_to_screen(world_y)
-                self.screen_render.line(COLOR_BACKGROUND_LINES, (row_screen_x_0, screen_y), (row_screen_x_1, screen_y),
-                                        1)
+        # There are grid lines between the squares of the ground, but not along the left and top edges of the world
+        ground_world_area = Rect(entire_world_area.x + 1, entire_world_area.y + 1, entire_world_area.w,
+                                 entire_world_area.h)
+        visible_ground_world_area = ground_world_area.clip(self.camera_world_area)
+        if visible_ground_world_area.w > 0 and visible_ground_world_area.h > 0:
+            # The ground image has grid lines along its left and top edges, so it needs to be offset accordingly
+            ground_image_area = Rect(
+                (visible_ground_world_area.x - entire_world_area.x) % GROUND_SQUARE_WIDTH,
+                (visible_ground_world_area.y - entire_world_area.y) % GROUND_SQUARE_WIDTH,
+                visible_ground_world_area.w, visible_ground_world_area.h)
+            self.world_render.image_area(self.ground_image, visible_ground_world_area.topleft, ground_image_area)
 
         if RENDER_WORLD_COORDINATES:
-            for i_col in range(num_squares):
-                for i_row in range(num_squares):
-                    if i_col % 4 == 0 and i_row % 4 == 0:
-                        world_x = entire_world_area.x + i_col * grid_width
-                        screen_x = self._translate_world_x_to_screen(world_x)
-                        world_y = entire_world_area.y + i_row * grid_width
-                        screen_y = self._translate_world_y_to_screen(world_y)
-                        self.screen_render.text(self.font_debug_info, str(world_x) + "," + str(world_y),
-                                                (screen_x, screen_y),
-                                                (250, 250, 250))
+            label_spacing = GROUND_SQUARE_WIDTH * 4
+            # Labels that start a bit outside of the camera may still be partly visible
+            i_col_0 = max(0, (self.camera_world_area.x - entire_world_area.x) // label_spacing - 1)
+            i_col_1 = (min(self.camera_world_area.right, entire_world_area.right) - entire_world_area.x) // label_spacing
+            i_row_0 = max(0, (self.camera_world_area.y - entire_world_area.y) // label_spacing - 1)
+            i_row_1 = (min(self.camera_world_area.bottom, entire_world_area.bottom) - entire_world_area.y) \
+                      // label_spacing
+            for i_col in range(i_col_0, i_col_1 + 1):
+                for i_row in range(i_row_0, i_row_1 + 1):
+                    world_x = entire_world_area.x + i_col * label_spacing
+                    world_y = entire_world_area.y + i_row * label_spacing
+                    self.world_render.text_from_atlas(self.world_coordinates_glyph_atlas,
+                                                      str(world_x) + "," + str(world_y), (world_x, world_y))
+
+    # Loads the images for the given sprites (like the ones of all entities in a map) ahead of time, so that it doesn't
+    # have to be done while playing
+    def prefetch_images(self, sprites: Iterable[Sprite]):
+        self.images_by_sprite.prefetch(sprites)
 
     def _world_entity(self, entity: Union[WorldEntity, DecorationEntity]):
         if not entity.visible:
@@ -240,8 +245,9 @@ class GameWorldView:
         self.world_render.text(self.font_quest_giver_mark, mark, (entity_pos[0] - 8, entity_pos[1] - 64), (0, 0, 0))
         self.world_render.text(self.font_quest_giver_mark, mark, (entity_pos[0] - 9, entity_pos[1] - 65), color)
 
-    def render_world(self, all_entities_to_render: List[WorldEntity], decorations_to_render: List[DecorationEntity],
-                     camera_world_area, non_player_characters: List[NonPlayerCharacter], is_player_invisible: bool,
+    def render_world(self, all_entities_to_render: List[WorldEntity], walls_state: WallsState,
+                     decorations_state: DecorationsState, camera_world_area,
+                     non_player_characters: List[NonPlayerCharacter], is_player_invisible: bool,
                      player_active_buffs: List[BuffWithDuration],
                      player_entity: WorldEntity, visual_effects, render_hit_and_collision_boxes, player_health,
                      player_max_health, entire_world_area: Rect, entity_action_text: Optional[EntityActionText]):
@@ -250,10 +256,13 @@ class GameWorldView:
         self.screen_render.fill(COLOR_BACKGROUND)
         self._world_ground(entire_world_area)
 
-        all_entities_to_render.sort(key=lambda entry: (-entry.view_z, entry.y))
+        # Decorations and most walls are pre-rendered. The remaining walls are sorted together with the other entities.
+        self.static_world_layer.set_world(walls_state, decorations_state, entire_world_area)
+        self.static_world_layer.render(self.screen_render, camera_world_area)
+        all_entities_to_render = all_entities_to_render + \
+                                 self.static_world_layer.get_walls_to_render_with_entities(camera_world_area)
 
-        for decoration_entity in decorations_to_render:
-            self._world_entity(decoration_entity)
+        all_entities_to_render.sort(key=lambda entry: (-entry.view_z, entry.y))
 
         for entity in all_entities_to_render:
             self._world_entity(entity)
@@ -274,7 +283,7 @@ class GameWorldView:
                                                 (150, 150, 250))
 
         if render_hit_and_collision_boxes:
-            for entity in all_entities_to_render:
+            for entity in all_entities_to_render + walls_state.get_walls_in_camera(camera_world_area):
                 self.world_render.rect((250, 250, 250), entity.rect(), 1)
 
         for npc in non_player_characters:
@@ -306,3 +315,17 @@ class GameWorldView:
 
         if entity_action_text:
             self._entity_action_text(entity_action_text)
+
+
+# The ground image is covered with grid lines, with one along its left and top edges. It is one square larger than the
+# camera, so that it can be shifted to line up with the squares of the world wherever the camera is.
+def _create_ground_image(camera_size: Tuple[int, int]):
+    width = camera_size[0] + GROUND_SQUARE_WIDTH
+    height = camera_size[1] + GROUND_SQUARE_WIDTH
+    ground_image = pygame.Surface((width, height))
+    ground_image.fill(COLOR_BACKGROUND)
+    for x in range(0, width, GROUND_SQUARE_WIDTH):
+        pygame.draw.line(ground_image, COLOR_BACKGROUND_LINES, (x, 0), (x, height - 1), 1)
+    for y in range(0, height, GROUND_SQUARE_WIDTH):
+        pygame.draw.line(ground_image, COLOR_BACKGROUND_LINES, (0, y), (width - 1, y), 1)
+    return ground_image
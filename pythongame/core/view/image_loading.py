@@ -1,9 +1,20 @@
-from typing import Tuple, Optional, List, Any, Dict
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, List, Any, Dict, Callable, Iterable
 
 import pygame
 from pygame.rect import Rect
 
-from pythongame.core.common import Direction, Sprite, UiIconSprite, PortraitIconSprite
+from pythongame.core.common import Direction, Sprite
+
+# Describes how an image is created: which file it's loaded from, which area of the file it's cut out from (only for
+# sprite sheets) and the size that it's scaled to
+ImageRecipe = Tuple[str, Optional[Tuple[int, int, int, int]], Tuple[int, int]]
+
+# Memory budgets for the images that are kept loaded (see LazyImageMapping)
+IMAGES_BY_SPRITE_MAX_NUM_BYTES = 16 * 1024 * 1024
+IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES = 4 * 1024 * 1024
 
 
 class SpriteInitializer:
@@ -15,22 +26,6 @@ class SpriteInitializer:
 class SpriteSheet(object):
     def __init__(self, file_path: str):
         self.file_path = file_path
-        self.sheet = None
-
-    def _load_sheet(self):
-        self.sheet = pygame.image.load(self.file_path).convert_alpha()
-
-    def image_at(self, rect: Rect):
-        if self.sheet is None:
-            self._load_sheet()
-
-        # noinspection PyArgumentList
-        image = pygame.Surface(rect.size, pygame.SRCALPHA)
-        destination_in_image = (0, 0)
-        image.blit(self.sheet, destination_in_image, rect)
-        transparent_color_in_image = (0, 0, 0)
-        image.set_colorkey(transparent_color_in_image, pygame.RLEACCEL)
-        return image
 
 
 class SpriteMapInitializer:
@@ -59,54 +54,152 @@ class ImageWithRelativePosition:
         self.position_relative_to_entity = position_relative_to_entity
 
 
-def load_and_scale_sprite(sprite_initializer: SpriteInitializer):
-    return _load_and_scale_sprite(sprite_initializer.image_file_path, sprite_initializer.scaling_size)
-
-
-def load_and_scale_directional_sprites(
-        animations_by_dir: Dict[Direction, Animation]) -> Dict[Direction, List[ImageWithRelativePosition]]:
-    images: Dict[Direction, List[ImageWithRelativePosition]] = {}
-    for direction in animations_by_dir:
-        animation = animations_by_dir[direction]
-        images_for_dir: List[ImageWithRelativePosition] = []
-        if animation.sprite_initializers:
-            for sprite_init in animation.sprite_initializers:
-                scaled_image = load_and_scale_sprite(sprite_init)
-                images_for_dir.append(ImageWithRelativePosition(scaled_image, animation.position_relative_to_entity))
-        elif animation.sprite_map_initializers:
-            for sprite_map_init in animation.sprite_map_initializers:
-                sprite_sheet = sprite_map_init.sprite_sheet
-                index_position_within_map = sprite_map_init.index_position_within_map
-                original_sprite_size = sprite_map_init.original_sprite_size
-                rectangle = Rect(index_position_within_map[0] * original_sprite_size[0],
-                                 index_position_within_map[1] * original_sprite_size[1],
-                                 original_sprite_size[0],
-                                 original_sprite_size[1])
-                image = sprite_sheet.image_at(rectangle)
-                scaled_image = pygame.transform.scale(image, sprite_map_init.scaling_size)
-                images_for_dir.append(ImageWithRelativePosition(scaled_image, animation.position_relative_to_entity))
-        else:
-            raise Exception("Invalid animation: " + str(animation))
-        images[direction] = images_for_dir
+def get_image_recipes_for_animation(animation: Animation) -> List[ImageRecipe]:
+    if animation.sprite_initializers:
+        return [(sprite_init.image_file_path, None, sprite_init.scaling_size)
+                for sprite_init in animation.sprite_initializers]
+    elif animation.sprite_map_initializers:
+        recipes = []
+        for sprite_map_init in animation.sprite_map_initializers:
+            index_position_within_map = sprite_map_init.index_position_within_map
+            original_sprite_size = sprite_map_init.original_sprite_size
+            area_within_file = (index_position_within_map[0] * original_sprite_size[0],
+                                index_position_within_map[1] * original_sprite_size[1],
+                                original_sprite_size[0],
+                                original_sprite_size[1])
+            recipes.append((sprite_map_init.sprite_sheet.file_path, area_within_file, sprite_map_init.scaling_size))
+        return recipes
+    else:
+        raise Exception("Invalid animation: " + str(animation))
+
+
+def get_image_recipes_for_sprites(dictionary: Dict[Sprite, Dict[Direction, Animation]]) -> List[ImageRecipe]:
+    return [recipe for animations_by_dir in dictionary.values() for animation in animations_by_dir.values()
+            for recipe in get_image_recipes_for_animation(animation)]
+
+
+def get_image_recipes_for_icons(dictionary: Dict[Any, str], icon_size: Tuple[int, int]) -> List[ImageRecipe]:
+    return [(dictionary[sprite], None, icon_size) for sprite in dictionary]
+
+
+# Images are taken from the sprite atlas when possible. The rest are created from the image files, which are decoded
+# in parallel (decoding PNGs is what takes the most time).
+def load_images(recipes: List[ImageRecipe], sprite_atlas=None) -> Dict[ImageRecipe, Any]:
+    images = sprite_atlas.get_images(recipes) if sprite_atlas else {}
+    recipes_to_create = [recipe for recipe in recipes if recipe not in images]
+    if recipes_to_create:
+        decoded_files = _decode_image_files_in_parallel(list({recipe[0] for recipe in recipes_to_create}))
+        for recipe in recipes_to_create:
+            if recipe not in images:
+                images[recipe] = _create_image(decoded_files[recipe[0]], recipe)
     return images
 
 
-def _load_and_scale_sprite(image_file_path: str, scaling_size: Tuple[int, int]):
-    image = pygame.image.load(image_file_path).convert_alpha()
-    return pygame.transform.scale(image, scaling_size)
-
+def _decode_image_files_in_parallel(file_paths: List[str]) -> Dict[str, Any]:
+    with ThreadPoolExecutor() as executor:
+        decoded_images = executor.map(pygame.image.load, file_paths)
+    # Converting the images to the screen's pixel format has to be done on the main thread
+    return {file_path: image.convert_alpha() for file_path, image in zip(file_paths, decoded_images)}
 
-def load_images_by_sprite(dictionary: Dict[Sprite, Dict[Direction, Animation]]) \
-        -> Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]]:
-    return {sprite: load_and_scale_directional_sprites(dictionary[sprite]) for sprite in dictionary}
 
-
-def load_images_by_ui_sprite(dictionary: Dict[UiIconSprite, str], icon_size: Tuple[int, int]) \
-        -> Dict[UiIconSprite, Any]:
-    return {sprite: load_and_scale_sprite(SpriteInitializer(dictionary[sprite], icon_size)) for sprite in dictionary
-            }
+def _create_image(decoded_file, recipe: ImageRecipe):
+    _file_path, area_within_file, scaling_size = recipe
+    if area_within_file is None:
+        return pygame.transform.scale(decoded_file, scaling_size)
+    image = pygame.Surface(area_within_file[2:], pygame.SRCALPHA)
+    image.blit(decoded_file, (0, 0), Rect(area_within_file))
+    transparent_color_in_image = (0, 0, 0)
+    image.set_colorkey(transparent_color_in_image, pygame.RLEACCEL)
+    return pygame.transform.scale(image, scaling_size)
 
 
-def load_images_by_portrait_sprite(dictionary: Dict[PortraitIconSprite, str], icon_size: Tuple[int, int]) \
-        -> Dict[PortraitIconSprite, Any]:
-    return {sprite: load_and_scale_sprite(SpriteInitializer(dictionary[sprite], icon_size)) for sprite in dictionary}
+def _get_images_for_sprite(animations_by_dir: Dict[Direction, Animation], images: Dict[ImageRecipe, Any]) \
+        -> Dict[Direction, List[ImageWithRelativePosition]]:
+    return {direction: [ImageWithRelativePosition(images[recipe], animation.position_relative_to_entity)
+                        for recipe in get_image_recipes_for_animation(animation)]
+            for direction, animation in animations_by_dir.items()}
+
+
+# Can be used instead of a dict of images (like images_by_sprite), but the images for a key are only loaded the first
+# time that they are asked for. The least recently used ones are thrown away when they take up more memory than
+# allowed, and are loaded again if they're needed later.
+#
+# Images that are known to be needed soon (like the ones for all entities in a map) can be loaded together with
+# prefetch(). That's faster than loading them one key at a time, as image files that are shared between keys (sprite
+# sheets) are only decoded once.
+class LazyImageMapping(Mapping):
+    def __init__(self, recipes_by_key: Dict[Any, List[ImageRecipe]],
+                 create_value: Callable[[Any, Dict[ImageRecipe, Any]], Any], max_num_bytes: int, sprite_atlas=None):
+        self._recipes_by_key = recipes_by_key
+        self._create_value = create_value
+        self._max_num_bytes = max_num_bytes
+        self._sprite_atlas = sprite_atlas
+        self._values: Dict[Any, Any] = OrderedDict()
+        self._num_bytes_by_key: Dict[Any, int] = {}
+        self._num_bytes = 0
+        self.num_loaded_keys = 0
+        self.num_evictions = 0
+
+    def __getitem__(self, key):
+        if key in self._values:
+            self._values.move_to_end(key)
+            return self._values[key]
+        if key not in self._recipes_by_key:
+            raise KeyError(key)
+        self._load([key])
+        return self._values[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._recipes_by_key
+
+    def __iter__(self):
+        return iter(self._recipes_by_key)
+
+    def __len__(self) -> int:
+        return len(self._recipes_by_key)
+
+    def prefetch(self, keys: Iterable[Any]):
+        keys_to_load = [key for key in set(keys) if key in self._recipes_by_key and key not in self._values]
+        if keys_to_load:
+            self._load(keys_to_load)
+
+    def get_num_loaded_keys(self) -> int:
+        return len(self._values)
+
+    def get_num_bytes(self) -> int:
+        return self._num_bytes
+
+    def _load(self, keys: List[Any]):
+        images = load_images([recipe for key in keys for recipe in self._recipes_by_key[key]], self._sprite_atlas)
+        for key in keys:
+            self._values[key] = self._create_value(key, images)
+            num_bytes = sum([get_surface_num_bytes(images[recipe]) for recipe in set(self._recipes_by_key[key])])
+            self._num_bytes_by_key[key] = num_bytes
+            self._num_bytes += num_bytes
+            self.num_loaded_keys += 1
+        while self._num_bytes > self._max_num_bytes and len(self._values) > 1:
+            evicted_key, _value = self._values.popitem(last=False)
+            self._num_bytes -= self._num_bytes_by_key.pop(evicted_key)
+            self.num_evictions += 1
+
+
+def create_lazy_images_by_sprite(dictionary: Dict[Sprite, Dict[Direction, Animation]], max_num_bytes: int,
+                                 sprite_atlas=None) -> LazyImageMapping:
+    recipes_by_sprite = {sprite: get_image_recipes_for_sprites({sprite: dictionary[sprite]}) for sprite in dictionary}
+    return LazyImageMapping(recipes_by_sprite,
+                            lambda sprite, images: _get_images_for_sprite(dictionary[sprite], images),
+                            max_num_bytes, sprite_atlas)
+
+
+# Works for both UiIconSprite and PortraitIconSprite
+def create_lazy_images_by_icon_sprite(dictionary: Dict[Any, str], icon_size: Tuple[int, int], max_num_bytes: int,
+                                      sprite_atlas=None) -> LazyImageMapping:
+    recipes_by_sprite = {sprite: [(dictionary[sprite], None, icon_size)] for sprite in dictionary}
+    return LazyImageMapping(recipes_by_sprite, lambda sprite, images: images[(dictionary[sprite], None, icon_size)],
+                            max_num_bytes, sprite_atlas)
+
+
+# How much memory the pixels of a surface (loaded image, rendered text etc) take up. Used by the caches that have a
+# memory budget.
+def get_surface_num_bytes(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
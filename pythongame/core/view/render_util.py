@@ -1,12 +1,51 @@
-from typing import Tuple, Callable, List, Optional
+from collections import OrderedDict
+from typing import Tuple, Callable, List, Optional, Dict
 
 import pygame
 from pygame.rect import Rect
 
 from pythongame.core.math import sum_of_vectors
-from pythongame.core.view.image_loading import ImageWithRelativePosition
+from pythongame.core.view.image_loading import ImageWithRelativePosition, get_surface_num_bytes
+from pythongame.core.view.text_cache import GlyphAtlas, TEXT_SURFACE_CACHE, is_numeric_text
 
 COLOR_WHITE = (250, 250, 250)
+# Surfaces used for transparent rectangles are kept until they take up more memory than this
+TRANSPARENT_SURFACE_POOL_MAX_NUM_BYTES = 16 * 1024 * 1024
+
+
+# Transparent rectangles are drawn by blitting a separate surface. The same few kinds of rectangles (particles, text
+# boxes, UI backgrounds) are drawn every frame, so their surfaces are reused instead of being created on every call.
+# The least recently used ones are thrown away when the pool grows too large.
+class TransparentSurfacePool:
+    def __init__(self, max_num_bytes: int):
+        self._max_num_bytes = max_num_bytes
+        self._surfaces: Dict[Tuple[int, int, Tuple[int, int, int], int], pygame.Surface] = OrderedDict()
+        self._num_bytes = 0
+        self.num_created_surfaces = 0
+        self.num_evictions = 0
+
+    def get_surface(self, size: Tuple[int, int], color: Tuple[int, int, int], alpha: int) -> pygame.Surface:
+        key = (size[0], size[1], color, alpha)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = pygame.Surface(size)
+        surface.set_alpha(alpha)
+        surface.fill(color)
+        self.num_created_surfaces += 1
+        self._surfaces[key] = surface
+        self._num_bytes += get_surface_num_bytes(surface)
+        while self._num_bytes > self._max_num_bytes and len(self._surfaces) > 1:
+            _key, evicted_surface = self._surfaces.popitem(last=False)
+            self._num_bytes -= get_surface_num_bytes(evicted_surface)
+            self.num_evictions += 1
+        return surface
+
+
+# Shared by all views
+TRANSPARENT_SURFACE_POOL = TransparentSurfacePool(TRANSPARENT_SURFACE_POOL_MAX_NUM_BYTES)
 
 
 class DrawableArea:
@@ -25,9 +64,7 @@ class DrawableArea:
 
     def rect_transparent(self, rect: Rect, alpha: int, color):
         # Using a separate surface is the only way to render a transparent rectangle
-        surface = pygame.Surface((rect[2], rect[3]))
-        surface.set_alpha(alpha)
-        surface.fill(color)
+        surface = TRANSPARENT_SURFACE_POOL.get_surface((int(rect[2]), int(rect[3])), color, alpha)
         self.screen.blit(surface, self._translate_pos((rect[0], rect[1])))
 
     def line(self, color, start_pos: Tuple[int, int], end_pos: Tuple[int, int], line_width: int):
@@ -44,14 +81,28 @@ class DrawableArea:
         self.rect_filled(color, Rect(x, y, max(w * ratio_filled, 0), h))
 
     def text(self, font, text: str, pos: Tuple[int, int], color=COLOR_WHITE):
-        self.screen.blit(font.render(text, True, color), self._translate_pos(pos))
+        if is_numeric_text(text):
+            self.text_from_atlas(TEXT_SURFACE_CACHE.get_glyph_atlas(font, color), text, pos)
+        else:
+            self.screen.blit(TEXT_SURFACE_CACHE.get_text_surface(font, text, color), self._translate_pos(pos))
 
     def text_centered(self, font, text: str, pos: Tuple[int, int], digit_pixel_width: float, color=COLOR_WHITE):
         self.text(font, text, (int(pos[0] - len(text) * digit_pixel_width), pos[1]), color)
 
+    def text_from_atlas(self, glyph_atlas: GlyphAtlas, text: str, pos: Tuple[int, int]):
+        if glyph_atlas.can_compose_text():
+            self.screen.blits(glyph_atlas.get_glyphs_for_text(text, self._translate_pos(pos)), False)
+        else:
+            text_surface = TEXT_SURFACE_CACHE.get_text_surface(glyph_atlas.font, text, glyph_atlas.color)
+            self.screen.blit(text_surface, self._translate_pos(pos))
+
     def image(self, image, pos: Tuple[int, int]):
         self.screen.blit(image, self._translate_pos(pos))
 
+    # Only the given part of the image is drawn
+    def image_area(self, image, pos: Tuple[int, int], image_area: Rect):
+        self.screen.blit(image, self._translate_pos(pos), image_area)
+
     def image_with_relative_pos(self, image_with_relative_position: ImageWithRelativePosition, pos: Tuple[int, int]):
         translated_pos = sum_of_vectors(pos, image_with_relative_position.position_relative_to_entity)
         self.image(image_with_relative_position.image, translated_pos)
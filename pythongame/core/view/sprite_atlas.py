@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional, Any
+
+import pygame
+from pygame.rect import Rect
+
+from pythongame.core.view.image_loading import ImageRecipe
+
+SPRITE_ATLAS_DIR = "resources/sprite_atlas"
+INDEX_FILE_NAME = "index.json"
+PAGE_SIZE = 1024
+VERSION = 1
+# Decoded pages are kept for loading more images from them later, but only this many (each takes 4 MiB)
+MAX_NUM_LOADED_PAGES = 2
+
+
+# All of the game's images, already cut out and scaled, packed together into a few big "pages". Loading the atlas
+# means decoding a few big PNG files instead of a lot of small ones, and the images are then copied out of the pages.
+# Pages are loaded the first time that one of their images is asked for, and the least recently used ones are thrown
+# away. (The images are copies, so that they don't keep their page alive when it has been thrown away, and so that
+# throwing away an image in LazyImageMapping frees its memory.)
+#
+# The atlas is built ahead of time with build_sprite_atlas.py. Images whose source file has changed since then are
+# left out when the atlas is loaded, so that they get created from the file instead.
+class SpriteAtlas:
+    def __init__(self, directory: str, page_file_names: List[str],
+                 entries_by_recipe: Dict[ImageRecipe, Tuple[int, Tuple[int, int], bool]], num_stale_images: int):
+        self._directory = directory
+        self._page_file_names = page_file_names
+        # (page index, position within page, whether the image has a color key)
+        self._entries_by_recipe = entries_by_recipe
+        self._pages: Dict[int, Any] = OrderedDict()
+        self.num_page_loads = 0
+        self.num_stale_images = num_stale_images
+
+    def get_image(self, recipe: ImageRecipe) -> Optional[Any]:
+        entry = self._entries_by_recipe.get(recipe)
+        if entry is None:
+            return None
+        page_index, position, has_colorkey = entry
+        image = self._get_page(page_index).subsurface(Rect(position, recipe[2])).copy()
+        if has_colorkey:
+            image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return image
+
+    # The images are taken one page at a time, so that each page is only loaded once
+    def get_images(self, recipes: List[ImageRecipe]) -> Dict[ImageRecipe, Any]:
+        recipes_in_atlas = [recipe for recipe in recipes if recipe in self._entries_by_recipe]
+        recipes_in_atlas.sort(key=lambda recipe: self._entries_by_recipe[recipe][0])
+        return {recipe: self.get_image(recipe) for recipe in recipes_in_atlas}
+
+    def get_num_loaded_pages(self) -> int:
+        return len(self._pages)
+
+    def _get_page(self, page_index: int):
+        if page_index in self._pages:
+            self._pages.move_to_end(page_index)
+            return self._pages[page_index]
+        page_path = os.path.join(self._directory, self._page_file_names[page_index])
+        page = pygame.image.load(page_path).convert_alpha()
+        self.num_page_loads += 1
+        self._pages[page_index] = page
+        while len(self._pages) > MAX_NUM_LOADED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    @staticmethod
+    def build(images_by_recipe: Dict[ImageRecipe, Any], directory: str):
+        os.makedirs(directory, exist_ok=True)
+        pages, positions = _pack(images_by_recipe)
+        page_file_names = []
+        for page_index, page in enumerate(pages):
+            page_file_name = "page_" + str(page_index) + ".png"
+            pygame.image.save(page, os.path.join(directory, page_file_name))
+            page_file_names.append(page_file_name)
+        index = {
+            "version": VERSION,
+            "source_files": {file_path: _file_hash(file_path) for file_path in
+                             sorted({recipe[0] for recipe in images_by_recipe})},
+            "pages": page_file_names,
+            "images": [{"file": recipe[0],
+                        "area": recipe[1],
+                        "size": recipe[2],
+                        "page": positions[recipe][0],
+                        "position": positions[recipe][1],
+                        "colorkey": images_by_recipe[recipe].get_colorkey() is not None}
+                       for recipe in images_by_recipe]
+        }
+        with open(os.path.join(directory, INDEX_FILE_NAME), 'w') as index_file:
+            json.dump(index, index_file)
+
+    # Returns None if there is no atlas (or if it was built by an older version of the game)
+    @staticmethod
+    def load(directory: str) -> Optional['SpriteAtlas']:
+        index_path = os.path.join(directory, INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+        if index.get("version") != VERSION:
+            return None
+
+        up_to_date_files = {file_path for file_path, file_hash in index["source_files"].items()
+                            if os.path.exists(file_path) and _file_hash(file_path) == file_hash}
+        entries_by_recipe = {}
+        for entry in index["images"]:
+            if entry["file"] in up_to_date_files:
+                area_within_file = tuple(entry["area"]) if entry["area"] is not None else None
+                recipe = (entry["file"], area_within_file, tuple(entry["size"]))
+                entries_by_recipe[recipe] = (entry["page"], tuple(entry["position"]), entry["colorkey"])
+        return SpriteAtlas(directory, index["pages"], entries_by_recipe, len(index["images"]) - len(entries_by_recipe))
+
+
+# Images are placed on rows ("shelves"), tallest first, and a new page is started when a page is full.
+#
+# The pixels are copied as they are, as RGBA bytes, since blitting the images onto the page would blend them with it.
+# The color key is stored in the index.
+def _pack(images_by_recipe: Dict[ImageRecipe, Any]) -> Tuple[List[Any], Dict[ImageRecipe, Tuple[int, List[int]]]]:
+    page_pixels: List[bytearray] = []
+    positions = {}
+    x, y, shelf_height = PAGE_SIZE, PAGE_SIZE, 0
+    for recipe in sorted(images_by_recipe, key=lambda r: (-r[2][1], -r[2][0])):
+        w, h = recipe[2]
+        if w > PAGE_SIZE or h > PAGE_SIZE:
+            raise Exception("Image doesn't fit in the sprite atlas: " + str(recipe))
+        if x + w > PAGE_SIZE:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h > PAGE_SIZE:
+            page_pixels.append(bytearray(PAGE_SIZE * PAGE_SIZE * 4))
+            x, y, shelf_height = 0, 0, 0
+        # The color key is removed while the pixels are read, as pixels that have the color key would otherwise be
+        # read as fully transparent. (They are drawn as they are, since the images also have per-pixel alpha.)
+        image = images_by_recipe[recipe]
+        colorkey = image.get_colorkey()
+        image.set_colorkey(None)
+        image_pixels = pygame.image.tostring(image, "RGBA")
+        if colorkey is not None:
+            image.set_colorkey(colorkey, pygame.RLEACCEL)
+        for row in range(h):
+            page_offset = ((y + row) * PAGE_SIZE + x) * 4
+            page_pixels[-1][page_offset:page_offset + w * 4] = image_pixels[row * w * 4:(row + 1) * w * 4]
+        positions[recipe] = (len(page_pixels) - 1, [x, y])
+        x += w
+        shelf_height = max(shelf_height, h)
+    pages = [pygame.image.fromstring(bytes(pixels), (PAGE_SIZE, PAGE_SIZE), "RGBA") for pixels in page_pixels]
+    return pages, positions
+
+
+def _file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.md5(file.read()).hexdigest()
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional, Union
+
+import pygame
+from pygame.rect import Rect
+
+from pythongame.core.common import Direction, Sprite
+from pythongame.core.game_state import WallsState, DecorationsState, WorldEntity, DecorationEntity, Buckets
+from pythongame.core.view.image_loading import ImageWithRelativePosition
+
+CHUNK_SIZE = 512
+# Each chunk uses 1MB of memory (512 x 512 pixels, 4 bytes each)
+MAX_NUM_CHUNKS = 24
+# Chunks that are this close to the camera are built ahead of time, so that they are ready when they come into view
+CHUNK_PREFETCH_MARGIN = 128
+MAX_NUM_CHUNKS_PREFETCHED_PER_FRAME = 1
+
+ChunkIndex = Tuple[int, int]
+
+
+# Walls and decorations never move (unless the map editor is used), so instead of drawing each of them separately
+# every frame, they are drawn once onto transparent "chunk" surfaces that each cover a square part of the world.
+# Rendering the static part of the world is then just a matter of drawing the few chunks that the camera can see.
+#
+# Chunks are built when the camera comes close to them, and the least recently used ones are thrown away when there
+# are too many of them. They are rebuilt when walls or decorations are added or removed.
+#
+# Only walls whose image lies within their own collision box are drawn onto the chunks. Other walls (statues, shelves
+# etc) reach up above their base, and need to be drawn in order together with moving entities. Those are returned by
+# get_walls_to_render_with_entities().
+class StaticWorldLayer:
+
+    def __init__(self, images_by_sprite: Dict[Sprite, Dict[Direction, List[ImageWithRelativePosition]]]):
+        self._images_by_sprite = images_by_sprite
+        self._walls_state: WallsState = None
+        self._decorations_state: DecorationsState = None
+        self._entire_world_area: Rect = None
+        # Chunks that don't contain anything are stored as None
+        self._chunks: Dict[ChunkIndex, Optional[pygame.Surface]] = OrderedDict()
+        self._is_flat_by_sprite_and_size: Dict[Tuple[Sprite, int, int], bool] = {}
+        # Walls that can't be drawn onto chunks. Computed when needed.
+        self._non_flat_walls: Buckets = None
+
+    # The layer follows one world at a time. Switching to another one (like when the map editor loads a map) throws
+    # away everything that was cached for the old one.
+    def set_world(self, walls_state: WallsState, decorations_state: DecorationsState, entire_world_area: Rect):
+        if walls_state is self._walls_state and decorations_state is self._decorations_state:
+            return
+        self._walls_state = walls_state
+        self._decorations_state = decorations_state
+        self._entire_world_area = entire_world_area
+        walls_state.walls_were_updated.register_observer(
+            lambda wall: self._on_world_updated(walls_state, wall, True))
+        decorations_state.decorations_were_updated.register_observer(
+            lambda decoration: self._on_world_updated(decorations_state, decoration, False))
+        self._chunks.clear()
+        self._non_flat_walls = None
+
+    def render(self, screen_render, camera_world_area: Rect):
+        x0, y0, x1, y1 = _chunk_indices_covering(camera_world_area)
+        for chunk_x in range(x0, x1 + 1):
+            for chunk_y in range(y0, y1 + 1):
+                chunk = self._get_chunk((chunk_x, chunk_y))
+                if chunk is not None:
+                    screen_render.image(chunk, (chunk_x * CHUNK_SIZE - camera_world_area.x,
+                                                chunk_y * CHUNK_SIZE - camera_world_area.y))
+
+        num_prefetched = 0
+        x0, y0, x1, y1 = _chunk_indices_covering(camera_world_area.inflate(2 * CHUNK_PREFETCH_MARGIN,
+                                                                           2 * CHUNK_PREFETCH_MARGIN))
+        for chunk_x in range(x0, x1 + 1):
+            for chunk_y in range(y0, y1 + 1):
+                if num_prefetched == MAX_NUM_CHUNKS_PREFETCHED_PER_FRAME:
+                    return
+                if (chunk_x, chunk_y) not in self._chunks:
+                    self._get_chunk((chunk_x, chunk_y))
+                    num_prefetched += 1
+
+    def get_walls_to_render_with_entities(self, camera_world_area: Rect) -> List[WorldEntity]:
+        if self._non_flat_walls is None:
+            non_flat_walls = [w.world_entity for w in self._walls_state.walls if not self._is_flat(w.world_entity)]
+            self._non_flat_walls = Buckets(non_flat_walls, self._entire_world_area)
+        return self._non_flat_walls.get_entitites_close_to_world_area(camera_world_area)
+
+    def _get_chunk(self, chunk_index: ChunkIndex) -> Optional[pygame.Surface]:
+        if chunk_index not in self._chunks:
+            chunk = self._build_chunk(chunk_index)
+            self._chunks[chunk_index] = chunk
+            if len(self._chunks) > MAX_NUM_CHUNKS:
+                self._chunks.popitem(last=False)
+        else:
+            chunk = self._chunks[chunk_index]
+            self._chunks.move_to_end(chunk_index)
+        return chunk
+
+    def _build_chunk(self, chunk_index: ChunkIndex) -> Optional[pygame.Surface]:
+        chunk_world_area = Rect(chunk_index[0] * CHUNK_SIZE, chunk_index[1] * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        # Same order as when entities are rendered one by one: decorations first, and then walls sorted by y.
+        # Invisible entities are skipped, like they are when rendered one by one.
+        decorations = [d for d in self._decorations_state.get_decorations_in_camera(chunk_world_area) if d.visible]
+        walls = [w for w in self._walls_state.get_walls_in_camera(chunk_world_area) if w.visible and self._is_flat(w)]
+        walls.sort(key=lambda w: w.y)
+        if not decorations and not walls:
+            return None
+        chunk = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE), pygame.SRCALPHA)
+        for entity in decorations + walls:
+            image_with_relative_position = self._get_image(entity)
+            image_world_x = entity.x + image_with_relative_position.position_relative_to_entity[0]
+            image_world_y = entity.y + image_with_relative_position.position_relative_to_entity[1]
+            chunk.blit(image_with_relative_position.image,
+                       (image_world_x - chunk_world_area.x, image_world_y - chunk_world_area.y))
+        # Blitting is faster when the surface has the same pixel format as the screen
+        return chunk.convert_alpha()
+
+    def _on_world_updated(self, state: Union[WallsState, DecorationsState],
+                          entity: Optional[Union[WorldEntity, DecorationEntity]], is_wall: bool):
+        # Observers are never unregistered, so we may still hear from a world that we no longer follow
+        if state is not self._walls_state and state is not self._decorations_state:
+            return
+        if is_wall:
+            self._non_flat_walls = None
+        if entity is None:
+            self._chunks.clear()
+            return
+        image_with_relative_position = self._get_image(entity)
+        image_world_area = Rect(
+            (entity.x + image_with_relative_position.position_relative_to_entity[0],
+             entity.y + image_with_relative_position.position_relative_to_entity[1]),
+            image_with_relative_position.image.get_size())
+        x0, y0, x1, y1 = _chunk_indices_covering(image_world_area)
+        for chunk_x in range(x0, x1 + 1):
+            for chunk_y in range(y0, y1 + 1):
+                self._chunks.pop((chunk_x, chunk_y), None)
+
+    def _is_flat(self, wall_entity: WorldEntity) -> bool:
+        wall_w, wall_h = wall_entity.pygame_collision_rect.size
+        key = (wall_entity.sprite, wall_w, wall_h)
+        if key not in self._is_flat_by_sprite_and_size:
+            image_with_relative_position = self._get_image(wall_entity)
+            relative_x, relative_y = image_with_relative_position.position_relative_to_entity
+            image_w, image_h = image_with_relative_position.image.get_size()
+            self._is_flat_by_sprite_and_size[key] = relative_x >= 0 and relative_y >= 0 \
+                                                    and relative_x + image_w <= wall_w \
+                                                    and relative_y + image_h <= wall_h
+        return self._is_flat_by_sprite_and_size[key]
+
+    def _get_image(self, entity: Union[WorldEntity, DecorationEntity]) -> ImageWithRelativePosition:
+        if entity.sprite not in self._images_by_sprite:
+            raise Exception("Unhandled sprite: " + str(entity.sprite))
+        images = self._images_by_sprite[entity.sprite]
+        if entity.direction in images:
+            return images[entity.direction][0]
+        return next(iter(images.values()))[0]
+
+
+def _chunk_indices_covering(world_area: Rect) -> Tuple[int, int, int, int]:
+    return (world_area.x // CHUNK_SIZE, world_area.y // CHUNK_SIZE,
+            (world_area.right - 1) // CHUNK_SIZE, (world_area.bottom - 1) // CHUNK_SIZE)
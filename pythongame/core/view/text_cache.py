@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from typing import Tuple, Dict, Any, List, Optional
+
+from pythongame.core.view.image_loading import get_surface_num_bytes
+
+# Rendered texts are kept until they take up more memory than this
+TEXT_CACHE_MAX_NUM_BYTES = 8 * 1024 * 1024
+# Texts that only contain these characters (damage and healing numbers, amounts of gold etc) are put together from
+# images of the individual characters, so that they don't fill up the cache with lots of different numbers
+NUMERIC_CHARACTERS = "0123456789+-.,:/% "
+
+TextCacheKey = Tuple[Any, str, Tuple[int, int, int], bool]  # (font, text, color, antialias)
+
+
+# Keeps track of the number of times that text is rendered with a font, which is costly. Used for profiling.
+class FontRenderCounter:
+    def __init__(self):
+        self.num_font_render_calls = 0
+
+    def render(self, font, text: str, antialias: bool, color):
+        self.num_font_render_calls += 1
+        return font.render(text, antialias, color)
+
+
+FONT_RENDER_COUNTER = FontRenderCounter()
+
+
+# Text that is made up of a small set of characters (like numbers) can be put together from images of the individual
+# characters, instead of rendering the whole text with the font every time it's drawn. Each character is placed where
+# the previous one's advance (from the font metrics) ends. Fonts that kern some pairs of the characters would place
+# them differently when rendering the whole text, so such fonts can't be used (see can_compose_text).
+class GlyphAtlas:
+    def __init__(self, font, color: Tuple[int, int, int]):
+        self.font = font
+        self.color = color
+        self._glyphs: Dict[str, Any] = {}
+        self._glyph_advances: Dict[str, int] = {}
+        self._can_compose_text: Optional[bool] = None
+
+    def get_glyph(self, character: str):
+        glyph = self._glyphs.get(character)
+        if glyph is None:
+            glyph = FONT_RENDER_COUNTER.render(self.font, character, True, self.color)
+            self._glyphs[character] = glyph
+            self._glyph_advances[character] = self._get_advance(character)
+        return glyph
+
+    # Checked once per atlas: putting two characters next to each other must give the same width as rendering them
+    # together with the font
+    def can_compose_text(self) -> bool:
+        if self._can_compose_text is None:
+            font = self.font
+            self._can_compose_text = all(
+                font.size(first + second)[0] == self._get_advance(first) + font.size(second)[0]
+                for first in NUMERIC_CHARACTERS for second in NUMERIC_CHARACTERS)
+        return self._can_compose_text
+
+    # Returns (glyph, position) pairs, to be drawn with Surface.blits()
+    def get_glyphs_for_text(self, text: str, pos: Tuple[int, int]) -> List[Tuple[Any, Tuple[int, int]]]:
+        glyphs = self._glyphs
+        glyph_advances = self._glyph_advances
+        x, y = pos
+        glyphs_for_text = []
+        for character in text:
+            glyph = glyphs.get(character)
+            if glyph is None:
+                glyph = self.get_glyph(character)
+            glyphs_for_text.append((glyph, (x, y)))
+            x += glyph_advances[character]
+        return glyphs_for_text
+
+    def _get_advance(self, character: str) -> int:
+        metrics = self.font.metrics(character)[0]
+        # Characters that the font doesn't have are rendered with the width that the font gives them
+        return metrics[4] if metrics else self.font.size(character)[0]
+
+
+# Remembers the most recently rendered texts, so that text that is shown every frame (labels, stats, tooltips, dialog
+# etc) only has to be rendered with the font once. The least recently used texts are thrown away when the cache grows
+# too large.
+class TextSurfaceCache:
+    def __init__(self, max_num_bytes: int):
+        self._max_num_bytes = max_num_bytes
+        self._surfaces: Dict[TextCacheKey, Any] = OrderedDict()
+        self._num_bytes = 0
+        self._glyph_atlases: Dict[Tuple[Any, Tuple[int, int, int]], GlyphAtlas] = {}
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+
+    def get_text_surface(self, font, text: str, color: Tuple[int, int, int], antialias: bool = True):
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.num_hits += 1
+            return surface
+
+        self.num_misses += 1
+        surface = FONT_RENDER_COUNTER.render(font, text, antialias, color)
+        self._surfaces[key] = surface
+        self._num_bytes += get_surface_num_bytes(surface)
+        while self._num_bytes > self._max_num_bytes and len(self._surfaces) > 1:
+            _key, evicted_surface = self._surfaces.popitem(last=False)
+            self._num_bytes -= get_surface_num_bytes(evicted_surface)
+            self.num_evictions += 1
+        return surface
+
+    def get_glyph_atlas(self, font, color: Tuple[int, int, int]) -> GlyphAtlas:
+        key = (font, color)
+        atlas = self._glyph_atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font, color)
+            self._glyph_atlases[key] = atlas
+        return atlas
+
+    def get_num_bytes(self) -> int:
+        return self._num_bytes
+
+
+def is_numeric_text(text: str) -> bool:
+    return text.strip(NUMERIC_CHARACTERS) == ""
+
+
+# Shared by all views
+TEXT_SURFACE_CACHE = TextSurfaceCache(TEXT_CACHE_MAX_NUM_BYTES)
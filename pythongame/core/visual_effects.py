@@ -9,6 +9,8 @@ from pythongame.core.game_state import WorldEntity
 
 
 class VisualEffect:
+    __slots__ = ('_age', '_max_age', 'has_expired', 'attached_to_entity')
+
     def __init__(self, max_age: Millis, attached_to_entity: Optional[WorldEntity]):
         self._age = 0
         self._max_age = max_age
@@ -25,6 +27,8 @@ class VisualEffect:
 
 
 class Particle:
+    __slots__ = ('rect', 'velocity', 'color', 'alpha', 'time_left')
+
     def __init__(self, rect: Rect, velocity: Tuple[int, int], color: Tuple[int, int, int], alpha: int,
                  time_left: Millis):
         self.rect = rect
@@ -40,20 +44,21 @@ class Particle:
 
 
 class VisualParticleSystem(VisualEffect):
+    __slots__ = ('_particles',)
 
     def __init__(self, num_particles: int, position: Tuple[int, int], colors: List[Tuple[int, int, int]], alpha: int,
-                 duration_interval: Tuple[Millis, Millis]):
+                 duration_interval: Tuple[Millis, Millis], rng: random.Random):
         super().__init__(Millis(250), None)
         self._particles: List[Particle] = []
         max_start_offset = 20
         for i in range(num_particles):
-            w = random.randint(8, 16)
+            w = rng.randint(8, 16)
             max_speed = 20 - w
-            x = position[0] + random.randint(-max_start_offset, max_start_offset) - w / 2
-            y = position[1] + random.randint(-max_start_offset, max_start_offset) - w / 2
-            velocity = random.randint(-max_speed, max_speed), random.randint(-max_speed, max_speed)
-            particle_color = random.choice(colors)
-            duration = random.randint(duration_interval[0], duration_interval[1])
+            x = position[0] + rng.randint(-max_start_offset, max_start_offset) - w / 2
+            y = position[1] + rng.randint(-max_start_offset, max_start_offset) - w / 2
+            velocity = rng.randint(-max_speed, max_speed), rng.randint(-max_speed, max_speed)
+            particle_color = rng.choice(colors)
+            duration = rng.randint(duration_interval[0], duration_interval[1])
             particle = Particle(Rect(x, y, w, w), velocity, particle_color, alpha, duration)
             self._particles.append(particle)
 
@@ -68,6 +73,8 @@ class VisualParticleSystem(VisualEffect):
 
 
 class VisualLine(VisualEffect):
+    __slots__ = ('color', 'start_position', 'end_position', 'line_width')
+
     def __init__(self, color: Tuple[int, int, int], start_position: Tuple[int, int], end_position: Tuple[int, int],
                  max_age: Millis, line_width: int):
         super().__init__(max_age, None)
@@ -78,6 +85,8 @@ class VisualLine(VisualEffect):
 
 
 class VisualCircle(VisualEffect):
+    __slots__ = ('color', 'center_position', 'start_radius', 'end_radius', 'line_width')
+
     def __init__(self, color: Tuple[int, int, int], center_position: Tuple[int, int], start_radius: int,
                  end_radius: int, max_age: Millis, line_width: int, attached_to_entity: WorldEntity = None):
         super().__init__(max_age, attached_to_entity)
@@ -98,6 +107,8 @@ class VisualCircle(VisualEffect):
 
 
 class VisualCross(VisualEffect):
+    __slots__ = ('radius', 'color', 'center_position', 'line_width')
+
     def __init__(self, color: Tuple[int, int, int], center_position: Tuple[int, int], radius: int, max_age: Millis,
                  line_width: int, attached_to_entity: WorldEntity = None):
         super().__init__(max_age, attached_to_entity)
@@ -121,6 +132,8 @@ class VisualCross(VisualEffect):
 
 
 class VisualRect(VisualEffect):
+    __slots__ = ('color', 'center_position', 'start_width', 'end_width', 'line_width')
+
     def __init__(self, color: Tuple[int, int, int], center_position: Tuple[int, int], start_width: int, end_width: int,
                  max_age: Millis, line_width: int, attached_to_entity: WorldEntity = None):
         super().__init__(max_age, attached_to_entity)
@@ -140,6 +153,8 @@ class VisualRect(VisualEffect):
 
 
 class VisualText(VisualEffect):
+    __slots__ = ('text', 'color', 'start_position', 'end_position', 'emphasis')
+
     def __init__(self, text: str, color: Tuple[int, int, int], start_position: Tuple[int, int],
                  end_position: Tuple[int, int], max_age: Millis, emphasis: bool = False):
         super().__init__(max_age, None)
@@ -156,6 +171,8 @@ class VisualText(VisualEffect):
 
 
 class VisualSprite(VisualEffect):
+    __slots__ = ('sprite', 'position', '_animation_progress', 'max_age')
+
     def __init__(self, sprite: Sprite, position: Tuple[int, int], max_age: Millis, attached_to_entity: WorldEntity):
         super().__init__(max_age, attached_to_entity)
         self.sprite = sprite
@@ -167,39 +184,39 @@ class VisualSprite(VisualEffect):
         return (self._animation_progress + float(self._age) / float(self.max_age)) % 1
 
 
-def create_visual_stun_text(entity: WorldEntity):
-    start_position, end_position = _get_entity_text_positions(entity, 10)
+def create_visual_stun_text(entity: WorldEntity, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 10, rng)
     return VisualText("STUN", (255, 255, 255), start_position, end_position, Millis(500))
 
 
-def create_visual_block_text(entity: WorldEntity):
-    start_position, end_position = _get_entity_text_positions(entity, 10)
+def create_visual_block_text(entity: WorldEntity, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 10, rng)
     return VisualText("BLOCK", (255, 255, 255), start_position, end_position, Millis(500))
 
 
-def create_visual_dodge_text(entity: WorldEntity):
-    start_position, end_position = _get_entity_text_positions(entity, 10)
+def create_visual_dodge_text(entity: WorldEntity, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 10, rng)
     return VisualText("DODGE", (255, 255, 255), start_position, end_position, Millis(500))
 
 
-def create_visual_damage_text(entity: WorldEntity, damage_amount: int, emphasis: bool = False):
-    start_position, end_position = _get_entity_text_positions(entity, 40)
+def create_visual_damage_text(entity: WorldEntity, damage_amount: int, rng: random.Random, emphasis: bool = False):
+    start_position, end_position = _get_entity_text_positions(entity, 40, rng)
     color = (220, 50, 100) if emphasis else (220, 0, 0)
     return VisualText(str(damage_amount), color, start_position, end_position, Millis(800), emphasis=emphasis)
 
 
-def create_visual_healing_text(entity: WorldEntity, healing_amount: int):
-    start_position, end_position = _get_entity_text_positions(entity, 40)
+def create_visual_healing_text(entity: WorldEntity, healing_amount: int, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 40, rng)
     return VisualText(str(healing_amount), (0, 140, 0), start_position, end_position, Millis(800))
 
 
-def create_visual_mana_text(entity: WorldEntity, healing_amount: int):
-    start_position, end_position = _get_entity_text_positions(entity, 40)
+def create_visual_mana_text(entity: WorldEntity, healing_amount: int, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 40, rng)
     return VisualText(str(healing_amount), (0, 0, 140), start_position, end_position, Millis(800))
 
 
-def create_visual_exp_text(entity: WorldEntity, exp_amount: int):
-    start_position, end_position = _get_entity_text_positions(entity, 40)
+def create_visual_exp_text(entity: WorldEntity, exp_amount: int, rng: random.Random):
+    start_position, end_position = _get_entity_text_positions(entity, 40, rng)
     return VisualText(str(exp_amount), (255, 255, 255), start_position, end_position, Millis(800))
 
 
@@ -210,11 +227,11 @@ def create_teleport_effects(effect_position: Tuple) -> List[VisualEffect]:
             VisualCircle(color, effect_position, 25, 50, Millis(300), 2)]
 
 
-def _get_entity_text_positions(entity: WorldEntity, text_y_travel_distance: int) -> Tuple[
+def _get_entity_text_positions(entity: WorldEntity, text_y_travel_distance: int, rng: random.Random) -> Tuple[
     Tuple[int, int], Tuple[int, int]]:
     sprite_size = ENTITY_SPRITE_SIZES[entity.sprite]
     y_start = entity.y + entity.pygame_collision_rect.h - sprite_size[1]
-    random_x_offset = random.randint(-10, 10)
+    random_x_offset = rng.randint(-10, 10)
     x = entity.get_center_position()[0] - 5 + random_x_offset
     start_position = (x, y_start)
     end_position = (x, y_start - text_y_travel_distance)
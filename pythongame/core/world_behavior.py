@@ -114,7 +114,7 @@ class ChallengeBehavior(AbstractWorldBehavior):
         if event == EngineEvent.PLAYER_DIED:
             return SceneTransition(self.picking_hero_scene(self.init_flags))
         elif event == EngineEvent.ENEMY_DIED:
-            num_enemies = len([npc for npc in self.game_state.non_player_characters if npc.is_enemy])
+            num_enemies = self.game_state.get_num_enemies()
             if num_enemies == 0:
                 return SceneTransition(self.challenge_complete_scene(self.total_time_played))
             self.info_message.set_message(str(num_enemies) + " enemies remaining")
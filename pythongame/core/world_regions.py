@@ -0,0 +1,169 @@
+from array import array
+from typing import Dict, List, Tuple, Optional
+
+from pythongame.core.common import NpcType, Millis
+from pythongame.core.entity_creation import create_npc
+from pythongame.core.game_data import NON_PLAYER_CHARACTERS, NpcCategory
+from pythongame.core.game_state import GameState, NonPlayerCharacter
+
+REGION_SIZE = 1000
+# NPCs become active when the camera is at most this many regions away from them ...
+ACTIVATION_DISTANCE = 1
+# ... and inactive when the camera is more than this many regions away. The gap between the two distances keeps NPCs
+# on a region border from being activated and deactivated over and over, when the player walks back and forth.
+DEACTIVATION_DISTANCE = 2
+# Inactive NPCs are only simulated (health regeneration and buffs) this often
+COARSE_TICK_INTERVAL = Millis(1000)
+
+RegionIndex = Tuple[int, int]
+
+_NPC_TYPES: List[NpcType] = list(NpcType)
+
+
+# The NPCs of a region that the camera is far away from.
+#
+# Enemies that haven't been touched (full health, no buffs) are stored in compact form, as just their type and
+# position, and are created anew when the region becomes active. Other NPCs are kept as they are ("frozen"), and so
+# are NPCs that other code may hold on to (summons, and NPCs whose minds keep track of other NPCs), as they must stay
+# the same objects. Frozen NPCs don't move or think, but their health regeneration and buffs are updated at a coarse
+# tick.
+class _InactiveRegion:
+    def __init__(self):
+        self.compact_npc_types = array('H')
+        self.compact_npc_positions = array('d')  # x and y for each NPC
+        self.frozen_npcs: List[NonPlayerCharacter] = []
+
+    def add_compact_npc(self, npc_type: NpcType, position: Tuple[float, float]):
+        self.compact_npc_types.append(_NPC_TYPES.index(npc_type))
+        self.compact_npc_positions.extend(position)
+
+    def get_compact_npcs(self) -> List[Tuple[NpcType, Tuple[float, float]]]:
+        positions = self.compact_npc_positions
+        return [(_NPC_TYPES[type_index], (positions[2 * i], positions[2 * i + 1]))
+                for i, type_index in enumerate(self.compact_npc_types)]
+
+
+# Splits the world into square regions, and only keeps the NPCs in the regions around the camera active (in
+# game_state.non_player_characters) so that the cost of a frame doesn't grow with the size of the map. NPCs in
+# regions further away are moved out of the game state into inactive regions, and are moved back when the camera
+# comes closer.
+#
+# This is only used while playing. The map editor works on all of the NPCs of the map.
+class WorldRegions:
+    def __init__(self, game_state: GameState):
+        self._game_state = game_state
+        self._inactive_regions: Dict[RegionIndex, _InactiveRegion] = {}
+        self._camera_region: Optional[RegionIndex] = None
+        self._time_since_coarse_tick = 0
+        self.num_activated_regions = 0
+        self.num_deactivated_npcs = 0
+        self.num_activated_npcs = 0
+
+    # Returns the time that has passed for frozen NPCs, if it's time for them to be simulated (otherwise 0)
+    def update(self, time_passed: Millis) -> Millis:
+        camera_region = _region_index(self._game_state.camera_world_area.center)
+        self._time_since_coarse_tick += time_passed
+        is_coarse_tick = self._time_since_coarse_tick >= COARSE_TICK_INTERVAL
+        if camera_region != self._camera_region:
+            self._camera_region = camera_region
+            self._activate_regions_close_to_camera()
+            self._deactivate_npcs_far_from_camera()
+        elif is_coarse_tick:
+            # NPCs that are added to the game state (summons etc) or that walk away are picked up here
+            self._deactivate_npcs_far_from_camera()
+        if is_coarse_tick:
+            self._compact_frozen_npcs()
+            coarse_time_passed = Millis(self._time_since_coarse_tick)
+            self._time_since_coarse_tick = 0
+            return coarse_time_passed
+        return Millis(0)
+
+    def get_frozen_npcs(self) -> List[NonPlayerCharacter]:
+        return [npc for region in self._inactive_regions.values() for npc in region.frozen_npcs]
+
+    def remove_dead_npcs(self) -> List[NonPlayerCharacter]:
+        npcs_that_died = []
+        for region in self._inactive_regions.values():
+            if any(npc.health_resource.is_at_or_below_zero() for npc in region.frozen_npcs):
+                npcs_that_died += [npc for npc in region.frozen_npcs if npc.health_resource.is_at_or_below_zero()]
+                region.frozen_npcs = [npc for npc in region.frozen_npcs
+                                      if not npc.health_resource.is_at_or_below_zero()]
+        return npcs_that_died
+
+    def remove_player_summons(self):
+        for region in self._inactive_regions.values():
+            region.frozen_npcs = [npc for npc in region.frozen_npcs
+                                  if npc.npc_category != NpcCategory.PLAYER_SUMMON]
+
+    def has_frozen_npc(self, npc: NonPlayerCharacter) -> bool:
+        return any(npc in region.frozen_npcs for region in self._inactive_regions.values())
+
+    def get_num_inactive_enemies(self) -> int:
+        num_enemies = 0
+        for region in self._inactive_regions.values():
+            num_enemies += len(region.compact_npc_types)  # Only enemies are stored in compact form
+            num_enemies += len([npc for npc in region.frozen_npcs if npc.is_enemy])
+        return num_enemies
+
+    def get_inactive_npc_center_position(self, npc_type: NpcType) -> Optional[Tuple[int, int]]:
+        npc_size = NON_PLAYER_CHARACTERS[npc_type].size
+        for region in self._inactive_regions.values():
+            for npc in region.frozen_npcs:
+                if npc.npc_type == npc_type:
+                    return npc.world_entity.get_center_position()
+            for compact_npc_type, (x, y) in region.get_compact_npcs():
+                if compact_npc_type == npc_type:
+                    return int(x + npc_size[0] / 2), int(y + npc_size[1] / 2)
+        return None
+
+    def get_num_inactive_npcs(self) -> int:
+        return sum([len(r.compact_npc_types) + len(r.frozen_npcs) for r in self._inactive_regions.values()])
+
+    def _activate_regions_close_to_camera(self):
+        camera_x, camera_y = self._camera_region
+        for region_x in range(camera_x - ACTIVATION_DISTANCE, camera_x + ACTIVATION_DISTANCE + 1):
+            for region_y in range(camera_y - ACTIVATION_DISTANCE, camera_y + ACTIVATION_DISTANCE + 1):
+                region = self._inactive_regions.pop((region_x, region_y), None)
+                if region is not None:
+                    self.num_activated_regions += 1
+                    for npc_type, position in region.get_compact_npcs():
+                        self._game_state.add_non_player_character(create_npc(npc_type, position))
+                    for npc in region.frozen_npcs:
+                        self._game_state.add_non_player_character(npc)
+                    self.num_activated_npcs += len(region.compact_npc_types) + len(region.frozen_npcs)
+
+    def _deactivate_npcs_far_from_camera(self):
+        camera_x, camera_y = self._camera_region
+        npcs_to_deactivate = []
+        for npc in self._game_state.non_player_characters:
+            region_index = _region_index(npc.world_entity.get_center_position())
+            if abs(region_index[0] - camera_x) > DEACTIVATION_DISTANCE \
+                    or abs(region_index[1] - camera_y) > DEACTIVATION_DISTANCE:
+                npcs_to_deactivate.append(npc)
+                region = self._inactive_regions.setdefault(region_index, _InactiveRegion())
+                if _can_be_stored_in_compact_form(npc):
+                    region.add_compact_npc(npc.npc_type, npc.world_entity.get_position())
+                else:
+                    region.frozen_npcs.append(npc)
+        if npcs_to_deactivate:
+            self._game_state.remove_non_player_characters(npcs_to_deactivate)
+            self.num_deactivated_npcs += len(npcs_to_deactivate)
+
+    # Damaged enemies that have regenerated all their health (and lost their buffs) can be stored in compact form
+    def _compact_frozen_npcs(self):
+        for region in self._inactive_regions.values():
+            if any(_can_be_stored_in_compact_form(npc) for npc in region.frozen_npcs):
+                for npc in region.frozen_npcs:
+                    if _can_be_stored_in_compact_form(npc):
+                        region.add_compact_npc(npc.npc_type, npc.world_entity.get_position())
+                region.frozen_npcs = [npc for npc in region.frozen_npcs if not _can_be_stored_in_compact_form(npc)]
+
+
+def _can_be_stored_in_compact_form(npc: NonPlayerCharacter) -> bool:
+    return npc.is_enemy and npc.health_resource.is_at_max() and not npc.active_buffs \
+           and not npc.stun_status.is_stunned() and not npc.invulnerable and not npc.is_summoned \
+           and not npc.npc_mind.has_state_to_keep()
+
+
+def _region_index(position: Tuple[int, int]) -> RegionIndex:
+    return int(position[0] // REGION_SIZE), int(position[1] // REGION_SIZE)
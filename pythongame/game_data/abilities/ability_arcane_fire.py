@@ -48,7 +48,7 @@ class Channeling(AbstractBuffEffect):
             entity = WorldEntity(projectile_pos, PROJECTILE_SIZE, Sprite.PROJECTILE_PLAYER_ARCANE_FIRE,
                                  game_state.player_entity.direction, PROJECTILE_SPEED)
             projectile = Projectile(entity, create_projectile_controller(ProjectileType.PLAYER_ARCANE_FIRE))
-            game_state.projectile_entities.append(projectile)
+            game_state.add_projectile(projectile)
             game_state.visual_effects.append(VisualRect((250, 0, 250), player_center_position, 45, 60, Millis(250), 1))
 
     def apply_end_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 
 from pythongame.core.ability_effects import register_ability_effect, AbilityResult, AbilityWasUsedSuccessfully
 from pythongame.core.buff_effects import register_buff_effect, get_buff_effect, \
@@ -53,6 +53,9 @@ class BloodLust(StatModifyingBuffEffect):
         sword_slash_data = ABILITIES[AbilityType.SWORD_SLASH]
         sword_slash_data.cooldown += SWORD_SLASH_CD_BONUS
 
+    def get_handled_event_types(self) -> List[type]:
+        return [EnemyDiedEvent]
+
     def buff_handle_event(self, event: Event) -> Optional[BuffEventOutcome]:
         if isinstance(event, EnemyDiedEvent):
             if has_blood_lust_duration_increase_upgrade:
@@ -59,7 +59,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
     entity = WorldEntity(projectile_pos, PROJECTILE_SIZE, PROJECTILE_SPRITE, player_entity.direction,
                          projectile_speed)
     projectile = Projectile(entity, create_projectile_controller(PROJECTILE_TYPE))
-    game_state.projectile_entities.append(projectile)
+    game_state.add_projectile(projectile)
     effect_position = (projectile_pos[0] + PROJECTILE_SIZE[0] // 2,
                        projectile_pos[1] + PROJECTILE_SIZE[1] // 2)
     game_state.visual_effects.append(VisualCircle((250, 150, 50), effect_position, 9, 18, Millis(80), 0))
@@ -73,7 +73,7 @@ class Rooted(AbstractBuffEffect):
 
     def apply_start_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         buffed_npc.stun_status.add_one()
-        game_state.visual_effects.append(create_visual_stun_text(buffed_entity))
+        game_state.visual_effects.append(create_visual_stun_text(buffed_entity, game_state.random))
 
     def apply_middle_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter,
                             time_passed: Millis):
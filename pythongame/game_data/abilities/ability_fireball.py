@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import get_buff_effect, AbstractBuffEffect, register_buff_effect
 from pythongame.core.common import Sprite, ProjectileType, AbilityType, Millis, \
@@ -41,7 +39,8 @@ def _create_visual_splash(effect_position, game_state):
         position=effect_position,
         colors=particle_colors,
         alpha=100,
-        duration_interval=(Millis(50), Millis(200)))
+        duration_interval=(Millis(50), Millis(200)),
+        rng=game_state.random)
     game_state.visual_effects.append(particle_system)
 
 
@@ -50,7 +49,7 @@ class ProjectileController(AbstractProjectileController):
         super().__init__(1500)
 
     def apply_enemy_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage_amount: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+        damage_amount: float = MIN_DMG + game_state.random.random() * (MAX_DMG - MIN_DMG)
         deal_player_damage_to_enemy(game_state, npc, damage_amount, DamageType.MAGIC)
         _create_visual_splash(npc.world_entity.get_center_position(), game_state)
         has_burn_upgrade = game_state.player_state.has_upgrade(HeroUpgradeId.ABILITY_FIREBALL_BURN)
@@ -92,7 +91,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
     entity = WorldEntity(projectile_pos, PROJECTILE_SIZE, Sprite.PROJECTILE_PLAYER_FIREBALL, player_entity.direction,
                          projectile_speed)
     projectile = Projectile(entity, create_projectile_controller(ProjectileType.PLAYER_FIREBALL))
-    game_state.projectile_entities.append(projectile)
+    game_state.add_projectile(projectile)
     effect_position = (projectile_pos[0] + PROJECTILE_SIZE[0] // 2,
                        projectile_pos[1] + PROJECTILE_SIZE[1] // 2)
     game_state.visual_effects.append(VisualCircle((250, 150, 50), effect_position, 15, 5, Millis(300), 0))
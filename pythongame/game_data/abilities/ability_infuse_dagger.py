@@ -54,7 +54,7 @@ class DamagedByInfusedDagger(AbstractBuffEffect):
     def apply_start_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         if self.should_stun:
             buffed_npc.stun_status.add_one()
-            game_state.visual_effects.append(create_visual_stun_text(buffed_entity))
+            game_state.visual_effects.append(create_visual_stun_text(buffed_entity, game_state.random))
 
     def apply_middle_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter,
                             time_passed: Millis):
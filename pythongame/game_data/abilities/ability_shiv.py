@@ -1,5 +1,3 @@
-import random
-
 from pygame.rect import Rect
 
 from pythongame.core.ability_effects import register_ability_effect, AbilityResult, AbilityWasUsedSuccessfully
@@ -38,7 +36,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
     else:
         play_sound(SoundId.ABILITY_SHIV)
     for enemy in affected_enemies:
-        damage: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+        damage: float = MIN_DMG + game_state.random.random() * (MAX_DMG - MIN_DMG)
 
         # Note: Dependency on other ability 'stealth'
         if is_stealthed:
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import get_buff_effect, AbstractBuffEffect, register_buff_effect, \
@@ -48,6 +48,9 @@ class Stealthing(StatModifyingBuffEffect):
         super().apply_end_effect(game_state, buffed_entity, buffed_npc)
         game_state.player_state.is_invisible = False
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerUsedAbilityEvent, PlayerLostHealthEvent]
+
     def buff_handle_event(self, event: Event) -> Optional[BuffEventOutcome]:
         used_ability = isinstance(event, PlayerUsedAbilityEvent) and event.ability != AbilityType.STEALTH
         player_lost_health = isinstance(event, PlayerLostHealthEvent)
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import get_buff_effect, AbstractBuffEffect, register_buff_effect
 from pythongame.core.common import AbilityType, Millis, BuffType, UiIconSprite, SoundId, PeriodicTimer
@@ -55,7 +53,7 @@ class ChannelingStomp(AbstractBuffEffect):
         game_state.visual_effects.append(
             VisualRect((250, 250, 0), hero_center_pos, distance, distance * 2, Millis(100), 4, None))
         for enemy in affected_enemies:
-            damage: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+            damage: float = MIN_DMG + game_state.random.random() * (MAX_DMG - MIN_DMG)
             deal_player_damage_to_enemy(game_state, enemy, damage, DamageType.PHYSICAL)
             enemy.gain_buff_effect(get_buff_effect(STUNNED_BY_STOMP), STUN_DURATION)
         game_state.player_state.gain_buff_effect(get_buff_effect(BuffType.RECOVERING_AFTER_ABILITY), Millis(300))
@@ -71,7 +69,7 @@ class StunnedFromStomp(AbstractBuffEffect):
     def apply_start_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         buffed_npc.stun_status.add_one()
         buffed_entity.set_not_moving()
-        game_state.visual_effects.append(create_visual_stun_text(buffed_entity))
+        game_state.visual_effects.append(create_visual_stun_text(buffed_entity, game_state.random))
 
     def apply_end_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         buffed_npc.stun_status.remove_one()
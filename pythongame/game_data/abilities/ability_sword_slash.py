@@ -1,5 +1,3 @@
-import random
-
 from pygame.rect import Rect
 
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
@@ -39,7 +37,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
         if has_aoe_upgrade and hit_multiple_enemies:
             damage: float = MAX_DMG
         else:
-            damage: float = MIN_DMG + random.random() * (MAX_DMG - MIN_DMG)
+            damage: float = MIN_DMG + game_state.random.random() * (MAX_DMG - MIN_DMG)
         deal_player_damage_to_enemy(game_state, enemy, damage, DamageType.PHYSICAL)
 
     game_state.visual_effects.append(
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.ability_effects import register_ability_effect, AbilityWasUsedSuccessfully, AbilityResult
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect, register_buff_effect
 from pythongame.core.common import AbilityType, Sprite, \
@@ -33,7 +31,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
     projectile_speed = 0.1
     entity = WorldEntity(aoe_pos, PROJECTILE_SIZE, PROJECTILE_SPRITE, player_entity.direction, projectile_speed)
     projectile = Projectile(entity, create_projectile_controller(PROJECTILE_TYPE))
-    game_state.projectile_entities.append(projectile)
+    game_state.add_projectile(projectile)
     has_lightfooted_upgrade = game_state.player_state.has_upgrade(HeroUpgradeId.MAGE_LIGHT_FOOTED)
     if not has_lightfooted_upgrade:
         game_state.player_state.gain_buff_effect(get_buff_effect(BuffType.RECOVERING_AFTER_ABILITY), Millis(300))
@@ -46,10 +44,13 @@ class ProjectileController(AbstractProjectileController):
         self.damage_timer = PeriodicTimer(PROJECTILE_DAMAGE_INTERVAL)
         self.direction_change_timer = PeriodicTimer(Millis(250))
         self._relative_direction = 0
-        self._rotation_motion = random.choice([-1, 1])
+        # Decided when the projectile first moves, as that's when the game state's random generator is available
+        self._rotation_motion = None
 
     def notify_time_passed(self, game_state: GameState, projectile: Projectile, time_passed: Millis):
         super().notify_time_passed(game_state, projectile, time_passed)
+        if self._rotation_motion is None:
+            self._rotation_motion = game_state.random.choice([-1, 1])
         projectile_entity = projectile.world_entity
 
         if self.damage_timer.update_and_check_if_ready(time_passed):
@@ -58,13 +59,13 @@ class ProjectileController(AbstractProjectileController):
                 damage_was_dealt = deal_player_damage_to_enemy(game_state, enemy, damage_amount, DamageType.MAGIC)
                 if damage_was_dealt:
                     has_stun_upgrade = game_state.player_state.has_upgrade(HeroUpgradeId.ABILITY_WHIRLWIND_STUN)
-                    if has_stun_upgrade and random.random() < 0.2:
+                    if has_stun_upgrade and game_state.random.random() < 0.2:
                         enemy.gain_buff_effect(get_buff_effect(BUFF_TYPE), WHIRLWIND_TALENT_STUN_DURATION)
 
         if self.direction_change_timer.update_and_check_if_ready(time_passed):
             should_rotate = True
             # keep going straight ahead sometimes
-            if self._relative_direction == 0 and random.random() < 0.5:
+            if self._relative_direction == 0 and game_state.random.random() < 0.5:
                 should_rotate = False
 
             if should_rotate:
@@ -90,7 +91,7 @@ class Stunned(AbstractBuffEffect):
         effect_position = buffed_entity.get_center_position()
         game_state.visual_effects.append(
             VisualRect((250, 250, 50), effect_position, 30, 40, Millis(100), 1, buffed_entity))
-        game_state.visual_effects.append(create_visual_stun_text(buffed_entity))
+        game_state.visual_effects.append(create_visual_stun_text(buffed_entity, game_state.random))
 
     def apply_middle_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter,
                             time_passed: Millis):
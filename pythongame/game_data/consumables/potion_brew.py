@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect, register_buff_effect
 from pythongame.core.common import ConsumableType, Sprite, UiIconSprite, Millis, BuffType, PeriodicTimer, SoundId
@@ -38,6 +38,9 @@ class RestoringHealthFromBrew(AbstractBuffEffect):
     def get_buff_type(self):
         return BUFF_TYPE
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerLostHealthEvent]
+
     def buff_handle_event(self, event: Event) -> Optional[BuffEventOutcome]:
         if isinstance(event, PlayerLostHealthEvent):
             return BuffEventOutcome.cancel_effect()
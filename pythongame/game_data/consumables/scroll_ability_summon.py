@@ -54,7 +54,8 @@ class NpcMind(AbstractNpcMind):
         self._attack_interval = 1000
         self._time_since_attack = self._attack_interval
         self._update_path_interval = 900
-        self._time_since_updated_path = random.randint(0, self._update_path_interval)
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
+        self._time_since_updated_path = None
         self.pathfinder = NpcPathfinder(global_path_finder)
         self.next_waypoint = None
         self._reevaluate_next_waypoint_direction_interval = 1000
@@ -62,6 +63,8 @@ class NpcMind(AbstractNpcMind):
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._time_since_updated_path is None:
+            self._time_since_updated_path = game_state.random.randint(0, self._update_path_interval)
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
         self._time_since_attack += time_passed
@@ -115,6 +118,7 @@ class DieAfterDuration(AbstractBuffEffect):
 
     def apply_end_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         buffed_npc.health_resource.set_zero()
+        game_state.may_have_dead_npcs = True
 
     def get_buff_type(self):
         return BuffType.SUMMON_DIE_AFTER_DURATION
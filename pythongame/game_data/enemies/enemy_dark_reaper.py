@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.buff_effects import AbstractBuffEffect, register_buff_effect, get_buff_effect
 from pythongame.core.common import Millis, NpcType, Sprite, Direction, BuffType
 from pythongame.core.damage_interactions import deal_damage_to_player, DamageType
@@ -24,7 +22,8 @@ class NpcMind(AbstractNpcMind):
         self._attack_interval = 1000
         self._time_since_attack = self._attack_interval
         self._update_path_interval = 900
-        self._time_since_updated_path = random.randint(0, self._update_path_interval)
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
+        self._time_since_updated_path = None
         self.pathfinder = NpcPathfinder(global_path_finder)
         self.next_waypoint = None
         self._reevaluate_next_waypoint_direction_interval = 1000
@@ -35,6 +34,8 @@ class NpcMind(AbstractNpcMind):
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._time_since_updated_path is None:
+            self._time_since_updated_path = game_state.random.randint(0, self._update_path_interval)
         self._time_since_attack += time_passed
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
@@ -58,8 +59,8 @@ class NpcMind(AbstractNpcMind):
             if self.next_waypoint:
                 direction = self.pathfinder.get_dir_towards_considering_collisions(
                     game_state, enemy_entity, self.next_waypoint)
-                if random.random() < 0.1 and direction:
-                    direction = random.choice(get_perpendicular_directions(direction))
+                if game_state.random.random() < 0.1 and direction:
+                    direction = game_state.random.choice(get_perpendicular_directions(direction))
                 _move_in_dir(enemy_entity, direction)
             else:
                 enemy_entity.set_not_moving()
@@ -16,15 +16,18 @@ SPRINT_MAX_COOLDOWN = Millis(10000)
 class NpcMind(MeleeEnemyNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder, Millis(1000), 4, 0, Millis(900))
-        self.sprint_cooldown_remaining = self.random_cooldown()
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
+        self.sprint_cooldown_remaining = None
 
     @staticmethod
-    def random_cooldown():
-        return random.randint(SPRINT_MAX_COOLDOWN // 2, SPRINT_MAX_COOLDOWN)
+    def random_cooldown(rng: random.Random):
+        return rng.randint(SPRINT_MAX_COOLDOWN // 2, SPRINT_MAX_COOLDOWN)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
         super().control_npc(game_state, npc, player_entity, is_player_invisible, time_passed)
+        if self.sprint_cooldown_remaining is None:
+            self.sprint_cooldown_remaining = self.random_cooldown(game_state.random)
         self.sprint_cooldown_remaining -= time_passed
         sprint_distance_limit = 250
         if self.sprint_cooldown_remaining <= 0:
@@ -32,7 +35,7 @@ class NpcMind(MeleeEnemyNpcMind):
                 npc.world_entity.get_position(), player_entity.get_position()) > sprint_distance_limit
             if is_far_away:
                 npc.gain_buff_effect(get_buff_effect(BuffType.ENEMY_GOBLIN_SPEARMAN_SPRINT), Millis(2500))
-                self.sprint_cooldown_remaining = self.random_cooldown()
+                self.sprint_cooldown_remaining = self.random_cooldown(game_state.random)
 
 
 def register_goblin_spearman_enemy():
@@ -28,10 +28,11 @@ PROJECTILE_SIZE = (20, 20)
 class NpcMind(AbstractNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder)
-        self._update_attack_interval()
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
+        self._attack_interval = None
         self._time_since_attack = 0
         self._update_path_interval = 900
-        self._time_since_updated_path = random.randint(0, self._update_path_interval)
+        self._time_since_updated_path = None
         self.pathfinder = NpcPathfinder(global_path_finder)
         self.next_waypoint = None
         self._reevaluate_next_waypoint_direction_interval = 1000
@@ -39,6 +40,9 @@ class NpcMind(AbstractNpcMind):
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._attack_interval is None:
+            self._update_attack_interval(game_state.random)
+            self._time_since_updated_path = game_state.random.randint(0, self._update_path_interval)
         self._time_since_attack += time_passed
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
@@ -63,18 +67,18 @@ class NpcMind(AbstractNpcMind):
             if self.next_waypoint:
                 direction = self.pathfinder.get_dir_towards_considering_collisions(
                     game_state, enemy_entity, self.next_waypoint)
-                if random.random() < 0.5 and direction:
-                    direction = random.choice(get_perpendicular_directions(direction))
+                if game_state.random.random() < 0.5 and direction:
+                    direction = game_state.random.choice(get_perpendicular_directions(direction))
                 _move_in_dir(enemy_entity, direction)
             else:
                 enemy_entity.set_not_moving()
 
         if self._time_since_attack > self._attack_interval:
             self._time_since_attack = 0
-            self._update_attack_interval()
+            self._update_attack_interval(game_state.random)
             directions_to_player = get_directions_to_position(npc.world_entity, player_entity.get_position())
             new_direction = directions_to_player[0]
-            if random.random() < 0.3 and directions_to_player[1] is not None:
+            if game_state.random.random() < 0.3 and directions_to_player[1] is not None:
                 new_direction = directions_to_player[1]
             npc.world_entity.direction = new_direction
             npc.world_entity.set_not_moving()
@@ -87,11 +91,11 @@ class NpcMind(AbstractNpcMind):
             projectile_entity = WorldEntity(projectile_pos, PROJECTILE_SIZE, PROJECTILE_SPRITE,
                                             npc.world_entity.direction, projectile_speed)
             projectile = Projectile(projectile_entity, create_projectile_controller(PROJECTILE_TYPE))
-            game_state.projectile_entities.append(projectile)
+            game_state.add_projectile(projectile)
             play_sound(SoundId.ENEMY_ATTACK_GOBLIN_WARLOCK)
 
-    def _update_attack_interval(self):
-        self._attack_interval = 500 + random.random() * 4500
+    def _update_attack_interval(self, rng: random.Random):
+        self._attack_interval = 500 + rng.random() * 4500
 
 
 def _move_in_dir(enemy_entity, direction):
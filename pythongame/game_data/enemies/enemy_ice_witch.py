@@ -27,9 +27,9 @@ class NpcMind(AbstractNpcMind):
     def __init__(self, global_path_finder: GlobalPathFinder):
         super().__init__(global_path_finder)
         self._base_attack_interval = 3000
+        # Randomized when the NPC is first controlled, as that's when the game state's random generator is available
         self._attack_interval = None
-        self.randomize_attack_interval()
-        self._time_since_attack = self._attack_interval
+        self._time_since_attack = None
         self._update_path_interval = 600
         self._time_since_updated_path = self._update_path_interval
         self.pathfinder = NpcPathfinder(global_path_finder)
@@ -37,11 +37,14 @@ class NpcMind(AbstractNpcMind):
         self._reevaluate_next_waypoint_direction_interval = 1000
         self._time_since_reevaluated = self._reevaluate_next_waypoint_direction_interval
 
-    def randomize_attack_interval(self):
-        self._attack_interval = self._base_attack_interval + random.randint(-250, 250)
+    def randomize_attack_interval(self, rng: random.Random):
+        self._attack_interval = self._base_attack_interval + rng.randint(-250, 250)
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
+        if self._attack_interval is None:
+            self.randomize_attack_interval(game_state.random)
+            self._time_since_attack = self._attack_interval
         self._time_since_attack += time_passed
         self._time_since_updated_path += time_passed
         self._time_since_reevaluated += time_passed
@@ -76,9 +79,9 @@ class NpcMind(AbstractNpcMind):
                 target_center_pos = target.entity.get_center_position()
                 if is_x_and_y_within_distance(enemy_position, target_center_pos, 200):
                     self._time_since_attack = 0
-                    self.randomize_attack_interval()
+                    self.randomize_attack_interval(game_state.random)
                     play_sound(SoundId.ENEMY_ATTACK_ICE_WITCH)
-                    damage = random.randint(DAMAGE_MIN, DAMAGE_MAX)
+                    damage = game_state.random.randint(DAMAGE_MIN, DAMAGE_MAX)
                     deal_npc_damage(damage, DamageType.MAGIC, game_state, enemy_entity, npc, target)
                     game_state.visual_effects += [
                         (VisualLine((100, 100, 200), enemy_position, target_center_pos, Millis(120), 3)),
@@ -28,16 +28,25 @@ class NpcMind(AbstractNpcMind):
         super().__init__(global_path_finder)
         self._time_since_decision = 0
         self._decision_interval = 750
+        # Cooldowns are randomized when the NPC is first controlled, as that's when the game state's random generator
+        # is available
         self._time_since_summoning = 0
-        self._summoning_cooldown = self._random_summoning_cooldown()
+        self._summoning_cooldown = None
         self._time_since_healing = 0
-        self._healing_cooldown = self._random_healing_cooldown()
+        self._healing_cooldown = None
         self._alive_summons = []
         self._time_since_shoot = 0
-        self._shoot_cooldown = self._random_shoot_cooldown()
+        self._shoot_cooldown = None
+
+    def has_state_to_keep(self) -> bool:
+        return len(self._alive_summons) > 0
 
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     _is_player_invisible: bool, time_passed: Millis):
+        if self._summoning_cooldown is None:
+            self._summoning_cooldown = self._random_summoning_cooldown(game_state.random)
+            self._healing_cooldown = self._random_healing_cooldown(game_state.random)
+            self._shoot_cooldown = self._random_shoot_cooldown(game_state.random)
         self._time_since_decision += time_passed
         self._time_since_summoning += time_passed
         self._time_since_healing += time_passed
@@ -45,12 +54,12 @@ class NpcMind(AbstractNpcMind):
         if self._time_since_summoning > self._summoning_cooldown:
             necro_center_pos = npc.world_entity.get_center_position()
             self._time_since_summoning = 0
-            self._alive_summons = [summon for summon in self._alive_summons
-                                   if summon in game_state.non_player_characters]
+            self._alive_summons = [summon for summon in self._alive_summons if game_state.is_npc_in_world(summon)]
             if len(self._alive_summons) < 3:
-                relative_pos_from_summoner = (random.randint(-150, 150), random.randint(-150, 150))
+                relative_pos_from_summoner = (game_state.random.randint(-150, 150),
+                                              game_state.random.randint(-150, 150))
                 summon_center_pos = sum_of_vectors(necro_center_pos, relative_pos_from_summoner)
-                summon_type = random.choice([NpcType.ZOMBIE, NpcType.MUMMY])
+                summon_type = game_state.random.choice([NpcType.ZOMBIE, NpcType.MUMMY])
                 summon_size = NON_PLAYER_CHARACTERS[summon_type].size
                 summon_pos = game_state.get_within_world(
                     get_position_from_center_position(summon_center_pos, summon_size), summon_size)
@@ -59,7 +68,8 @@ class NpcMind(AbstractNpcMind):
                     rect_from_corners(necro_center_pos, summon_center_pos))
                 is_position_blocked = game_state.would_entity_collide_if_new_pos(summon_enemy.world_entity, summon_pos)
                 if not is_wall_blocking and not is_position_blocked:
-                    self._summoning_cooldown = self._random_summoning_cooldown()
+                    self._summoning_cooldown = self._random_summoning_cooldown(game_state.random)
+                    summon_enemy.is_summoned = True
                     game_state.add_non_player_character(summon_enemy)
                     self._alive_summons.append(summon_enemy)
                     game_state.visual_effects.append(
@@ -71,11 +81,11 @@ class NpcMind(AbstractNpcMind):
                     # Failed to summon, so try again without waiting full duration
                     self._summoning_cooldown = 500
             else:
-                self._summoning_cooldown = self._random_summoning_cooldown()
+                self._summoning_cooldown = self._random_summoning_cooldown(game_state.random)
 
         if self._time_since_healing > self._healing_cooldown:
             self._time_since_healing = 0
-            self._healing_cooldown = self._random_healing_cooldown()
+            self._healing_cooldown = self._random_healing_cooldown(game_state.random)
             necro_center_pos = npc.world_entity.get_center_position()
             nearby_hurt_enemies = [
                 e for e in game_state.non_player_characters
@@ -93,7 +103,7 @@ class NpcMind(AbstractNpcMind):
 
         if self._time_since_shoot > self._shoot_cooldown:
             self._time_since_shoot = 0
-            self._shoot_cooldown = self._random_shoot_cooldown()
+            self._shoot_cooldown = self._random_shoot_cooldown(game_state.random)
             npc.world_entity.direction = get_directions_to_position(npc.world_entity, player_entity.get_position())[0]
             npc.world_entity.set_not_moving()
             center_position = npc.world_entity.get_center_position()
@@ -105,28 +115,28 @@ class NpcMind(AbstractNpcMind):
             projectile_entity = WorldEntity(projectile_pos, PROJECTILE_SIZE, Sprite.NONE, npc.world_entity.direction,
                                             projectile_speed)
             projectile = Projectile(projectile_entity, create_projectile_controller(PROJECTILE_TYPE))
-            game_state.projectile_entities.append(projectile)
+            game_state.add_projectile(projectile)
             play_sound(SoundId.ENEMY_ATTACK_NECRO)
 
         if self._time_since_decision > self._decision_interval:
             self._time_since_decision = 0
-            if random.random() < 0.2:
-                direction = random_direction()
+            if game_state.random.random() < 0.2:
+                direction = random_direction(game_state.random)
                 npc.world_entity.set_moving_in_dir(direction)
             else:
                 npc.world_entity.set_not_moving()
 
     @staticmethod
-    def _random_summoning_cooldown():
-        return random.randint(500, 5500)
+    def _random_summoning_cooldown(rng: random.Random):
+        return rng.randint(500, 5500)
 
     @staticmethod
-    def _random_healing_cooldown():
-        return random.randint(1000, 9000)
+    def _random_healing_cooldown(rng: random.Random):
+        return rng.randint(1000, 9000)
 
     @staticmethod
-    def _random_shoot_cooldown():
-        return random.randint(2000, 10_000)
+    def _random_shoot_cooldown(rng: random.Random):
+        return rng.randint(2000, 10_000)
 
 
 class ProjectileController(AbstractProjectileController):
@@ -147,14 +157,14 @@ class ProjectileController(AbstractProjectileController):
             game_state.visual_effects += [head, tail]
 
     def apply_player_collision(self, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.random.randint(self._min_damage, self._max_damage)
         deal_damage_to_player(game_state, damage, DamageType.MAGIC, None)
         game_state.visual_effects.append(VisualCircle(self._color, game_state.player_entity.get_center_position(),
                                                       25, 50, Millis(100), 0))
         projectile.has_collided_and_should_be_removed = True
 
     def apply_player_summon_collision(self, npc: NonPlayerCharacter, game_state: GameState, projectile: Projectile):
-        damage = random.randint(self._min_damage, self._max_damage)
+        damage = game_state.random.randint(self._min_damage, self._max_damage)
         deal_npc_damage_to_npc(game_state, npc, damage)
         game_state.visual_effects.append(
             VisualCircle(self._color, npc.world_entity.get_center_position(), 25, 50, Millis(100), 0))
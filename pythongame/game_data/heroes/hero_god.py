@@ -63,6 +63,7 @@ def _apply_ability(game_state: GameState) -> AbilityResult:
     player_entity = game_state.player_entity
     for enemy in game_state.get_enemies_within_x_y_distance_of(400, player_entity.get_center_position()):
         enemy.health_resource.set_zero()
+    game_state.may_have_dead_npcs = True
     return AbilityWasUsedSuccessfully()
 
 
@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.buff_effects import register_buff_effect, StatModifyingBuffEffect, get_buff_effect
 from pythongame.core.common import HeroId, PortraitIconSprite, PLAYER_ENTITY_SIZE, HeroUpgradeId, UiIconSprite, \
     ItemType, \
@@ -61,6 +63,9 @@ class BuffedFromRetribution(StatModifyingBuffEffect):
 
 class RetributionHeroUpgrade(HeroUpgrade):
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerBlockedEvent]
+
     def handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerBlockedEvent):
             game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_RETRIBUTION), BUFF_RETRIBUTION_DURATION)
@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.common import ItemType, Sprite, UiIconSprite, HeroStat
 from pythongame.core.damage_interactions import player_receive_healing
 from pythongame.core.game_data import register_ui_icon_sprite_path, register_item_data, ItemData, \
@@ -14,6 +16,9 @@ class ItemEffect(StatModifyingItemEffect):
         super().__init__(item_type, stat_modifiers)
         self.healing_amount = healing_amount
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerBlockedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerBlockedEvent):
             player_receive_healing(self.healing_amount, game_state)
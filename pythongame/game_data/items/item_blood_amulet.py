@@ -1,4 +1,4 @@
-import random
+from typing import List
 
 from pythongame.core.common import ItemType, Sprite
 from pythongame.core.damage_interactions import player_receive_healing
@@ -19,9 +19,12 @@ class ItemEffect(AbstractItemEffect):
     def __init__(self, item_type: ItemType):
         super().__init__(item_type)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [EnemyDiedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, EnemyDiedEvent):
-            if random.random() < PROC_CHANCE:
+            if game_state.random.random() < PROC_CHANCE:
                 player_receive_healing(HEALTH_ON_KILL_AMOUNT, game_state)
 
 
@@ -1,4 +1,4 @@
-import random
+from typing import List
 
 from pythongame.core.buff_effects import get_buff_effect, register_buff_effect, AbstractBuffEffect
 from pythongame.core.common import ItemType, Sprite, UiIconSprite, HeroStat, BuffType, Millis, PeriodicTimer
@@ -22,10 +22,13 @@ class ItemEffect(StatModifyingItemEffect):
     def __init__(self):
         super().__init__(ITEM_TYPE, {HeroStat.PHYSICAL_DAMAGE: 0.2})
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerDamagedEnemy]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerDamagedEnemy):
             if event.damage_source != DAMAGE_SOURCE:  # the bleed shouldn't trigger new bleeds
-                if random.random() < PROC_CHANCE:
+                if game_state.random.random() < PROC_CHANCE:
                     event.enemy_npc.gain_buff_effect(get_buff_effect(BUFF_TYPE), BUFF_DURATION)
 
     def get_description(self):
@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.buff_effects import get_buff_effect, register_buff_effect, AbstractBuffEffect
 from pythongame.core.common import ItemType, Sprite, BuffType, Millis, PeriodicTimer
 from pythongame.core.game_data import UiIconSprite, register_ui_icon_sprite_path, register_item_data, ItemData, \
@@ -21,6 +23,9 @@ class ItemEffect(AbstractItemEffect):
     def __init__(self, item_type: ItemType):
         super().__init__(item_type)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerDamagedEnemy]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerDamagedEnemy):
             event.enemy_npc.gain_buff_effect(get_buff_effect(BUFF_TYPE), SLOW_DURATION)
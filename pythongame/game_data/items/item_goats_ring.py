@@ -1,4 +1,4 @@
-import random
+from typing import List
 
 from pythongame.core.buff_effects import get_buff_effect, register_buff_effect, AbstractBuffEffect
 from pythongame.core.common import ItemType, Sprite, BuffType, Millis, PeriodicTimer
@@ -23,9 +23,12 @@ class ItemEffect(AbstractItemEffect):
     def __init__(self, item_type: ItemType):
         super().__init__(item_type)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerDamagedEnemy]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerDamagedEnemy):
-            if random.random() < PROC_CHANCE:
+            if game_state.random.random() < PROC_CHANCE:
                 # Compare "source" to prevent the debuff from renewing itself indefinitely
                 if event.damage_source != DAMAGE_SOURCE:
                     event.enemy_npc.gain_buff_effect(get_buff_effect(BUFF_TYPE), Millis(6000))
@@ -18,6 +18,9 @@ class ItemEffect(StatModifyingItemEffect):
     def __init__(self):
         super().__init__(ITEM_TYPE, {HeroStat.DAMAGE: 0.1})
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerLostHealthEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerLostHealthEvent):
             game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_TYPE), BUFF_DURATION)
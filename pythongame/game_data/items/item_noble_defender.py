@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.buff_effects import register_buff_effect, get_buff_effect, \
     StatModifyingBuffEffect
 from pythongame.core.common import ItemType, Sprite, BuffType, Millis, HeroStat
@@ -18,6 +20,9 @@ class ItemEffect(StatModifyingItemEffect):
     def __init__(self, item_type: ItemType, stat_modifiers):
         super().__init__(item_type, stat_modifiers)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerWasAttackedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerWasAttackedEvent):
             game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_TYPE_SLOWED), SLOW_DURATION)
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.common import ItemType, Millis, Sprite, UiIconSprite, PeriodicTimer
 from pythongame.core.damage_interactions import deal_player_damage_to_enemy, DamageType
 from pythongame.core.game_state import GameState
@@ -23,7 +21,7 @@ class ItemEffect(AbstractItemEffect):
             player_center_position = player_entity.get_center_position()
             close_enemies = game_state.get_enemies_within_x_y_distance_of(140, player_center_position)
             if close_enemies:
-                damage_amount: float = self.min_dmg + random.random() * (self.max_dmg - self.min_dmg)
+                damage_amount: float = self.min_dmg + game_state.random.random() * (self.max_dmg - self.min_dmg)
                 deal_player_damage_to_enemy(game_state, close_enemies[0], damage_amount, DamageType.MAGIC)
                 enemy_center_position = close_enemies[0].world_entity.get_center_position()
                 game_state.visual_effects.append(
@@ -15,6 +15,9 @@ class ItemEffect(StatModifyingItemEffect):
         super().__init__(item_type, {HeroStat.ARMOR: 2, HeroStat.BLOCK_AMOUNT: 7})
         self.damage_amount = 5
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerBlockedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerBlockedEvent):
             deal_player_damage_to_enemy(game_state, event.npc_attacker, self.damage_amount, DamageType.MAGIC)
@@ -1,4 +1,4 @@
-import random
+from typing import List
 
 from pythongame.core.buff_effects import register_buff_effect, get_buff_effect, \
     StatModifyingBuffEffect
@@ -21,9 +21,12 @@ class ItemEffect(AbstractItemEffect):
     def __init__(self, item_type: ItemType):
         super().__init__(item_type)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [EnemyDiedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, EnemyDiedEvent):
-            if random.random() < PROC_CHANCE:
+            if game_state.random.random() < PROC_CHANCE:
                 game_state.player_state.gain_buff_effect(get_buff_effect(BUFF_TYPE), BUFF_DURATION)
 
     def get_description(self):
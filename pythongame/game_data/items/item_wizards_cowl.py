@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.common import ItemType, Sprite
 from pythongame.core.damage_interactions import player_receive_mana
 from pythongame.core.game_data import UiIconSprite
@@ -13,6 +15,9 @@ class ItemEffect(AbstractItemEffect):
         super().__init__(item_type)
         self.mana_on_kill = 3
 
+    def get_handled_event_types(self) -> List[type]:
+        return [EnemyDiedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, EnemyDiedEvent):
             player_receive_mana(self.mana_on_kill, game_state)
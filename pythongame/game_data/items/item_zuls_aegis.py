@@ -1,3 +1,5 @@
+from typing import List
+
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect, register_buff_effect
 from pythongame.core.common import ItemType, Sprite, BuffType, Millis, HeroStat
 from pythongame.core.game_data import UiIconSprite
@@ -18,6 +20,9 @@ class ItemEffect(StatModifyingItemEffect):
     def __init__(self, item_type: ItemType, stat_modifiers):
         super().__init__(item_type, stat_modifiers)
 
+    def get_handled_event_types(self) -> List[type]:
+        return [PlayerBlockedEvent]
+
     def item_handle_event(self, event: Event, game_state: GameState):
         if isinstance(event, PlayerBlockedEvent):
             event.npc_attacker.gain_buff_effect(get_buff_effect(BUFF_TYPE_STUNNED), STUN_DURATION)
@@ -32,7 +37,7 @@ class StunnedFromAegis(AbstractBuffEffect):
     def apply_start_effect(self, game_state: GameState, buffed_entity: WorldEntity, buffed_npc: NonPlayerCharacter):
         visual_effect = VisualCircle((220, 220, 50), buffed_entity.get_center_position(), 9, 16, Millis(250), 2)
         game_state.visual_effects.append(visual_effect)
-        game_state.visual_effects.append(create_visual_stun_text(buffed_entity))
+        game_state.visual_effects.append(create_visual_stun_text(buffed_entity, game_state.random))
         buffed_npc.stun_status.add_one()
         buffed_entity.set_not_moving()
 
@@ -1,5 +1,3 @@
-import random
-
 from pythongame.core.common import NpcType, Sprite, Direction, Millis, get_all_directions, ConsumableType, \
     PortraitIconSprite, PeriodicTimer
 from pythongame.core.game_data import register_npc_data, NpcData, SpriteSheet, register_entity_sprite_map, \
@@ -21,10 +19,10 @@ class NpcMind(AbstractNpcMind):
     def control_npc(self, game_state: GameState, npc: NonPlayerCharacter, player_entity: WorldEntity,
                     is_player_invisible: bool, time_passed: Millis):
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.random.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.random.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
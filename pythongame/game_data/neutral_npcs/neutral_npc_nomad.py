@@ -1,4 +1,3 @@
-import random
 from typing import Optional
 
 from pythongame.core.common import NpcType, Sprite, Direction, Millis, get_all_directions, PortraitIconSprite, \
@@ -46,10 +45,10 @@ class NpcMind(AbstractNpcMind):
                 npc.quest_giver_state = None
 
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.random.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.random.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
@@ -63,7 +62,8 @@ class HealAction(AbstractNpcAction):
     def on_select(self, game_state: GameState) -> Optional[str]:
         if not game_state.player_state.health_resource.is_at_max():
             health_gained = game_state.player_state.health_resource.gain_to_max()
-            game_state.visual_effects.append(create_visual_healing_text(game_state.player_entity, health_gained))
+            game_state.visual_effects.append(
+                create_visual_healing_text(game_state.player_entity, health_gained, game_state.random))
             play_sound(SoundId.CONSUMABLE_POTION)
             return "You feel healthy again!"
         play_sound(SoundId.WARNING)
@@ -107,9 +107,8 @@ class CompleteQuest(AbstractNpcAction):
 
 
 def highlight_boss_position(game_state, ui_view):
-    bosses = [npc for npc in game_state.non_player_characters if npc.npc_type == NpcType.WARRIOR_KING]
-    if bosses:
-        position = bosses[0].world_entity.get_center_position()
+    position = game_state.get_center_position_of_npc(NpcType.WARRIOR_KING)
+    if position:
         world_area = game_state.entire_world_area
         position_ratio = ((position[0] - world_area.x) / world_area.w,
                           (position[1] - world_area.y) / world_area.h)
@@ -1,4 +1,3 @@
-import random
 from typing import Optional
 
 from pythongame.core.common import NpcType, Sprite, Direction, Millis, get_all_directions, PortraitIconSprite, \
@@ -44,10 +43,10 @@ class NpcMind(AbstractNpcMind):
                 npc.quest_giver_state = QuestGiverState.CAN_GIVE_NEW_QUEST
 
         if self.timer.update_and_check_if_ready(time_passed):
-            if random.random() < 0.8:
+            if game_state.random.random() < 0.8:
                 npc.world_entity.set_not_moving()
             else:
-                direction = random.choice(get_all_directions())
+                direction = game_state.random.choice(get_all_directions())
                 npc.world_entity.set_moving_in_dir(direction)
 
 
@@ -105,9 +104,8 @@ def _get_reward_for_hero(hero_id: HeroId):
 
 
 def _highlight_boss_location(game_state, ui_view):
-    bosses = [npc for npc in game_state.non_player_characters if npc.npc_type == NpcType.GOBLIN_WARRIOR]
-    if bosses:
-        position = bosses[0].world_entity.get_center_position()
+    position = game_state.get_center_position_of_npc(NpcType.GOBLIN_WARRIOR)
+    if position:
         world_area = game_state.entire_world_area
         position_ratio = ((position[0] - world_area.x) / world_area.w,
                           (position[1] - world_area.y) / world_area.h)
@@ -0,0 +1,142 @@
+import json
+import time
+from typing import Optional
+
+from pythongame.core.common import Millis, HeroId
+from pythongame.core.entity_creation import set_global_path_finder
+from pythongame.core.game_state import GameState
+from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
+from pythongame.core.sound_player import init_silent_sound_player
+from pythongame.core.world_behavior import StoryBehavior
+from pythongame.map_file import load_map_from_file
+from pythongame.register_game_data import register_all_game_data
+from pythongame.replay import REPLAY_VERSION, apply_command, get_state_checksum
+from pythongame.scenes_game.game_engine import GameEngine
+from pythongame.scenes_game.game_ui_view import InfoMessage
+from pythongame.scenes_game.player_environment_interactions import PlayerInteractionsState
+
+# Same camera size as when running the game with a display. NPC's are only controlled when they are close to the
+# camera, so this needs to match for the simulation to be representative.
+CAMERA_SIZE = (800, 430)
+DEFAULT_TIME_STEP = Millis(16)
+
+
+# Runs the game engine without any display, audio or fonts. Nothing is rendered, and the simulation is stepped
+# with a fixed time step as fast as the CPU allows. Useful for benchmarking the engine on machines without a screen,
+# and for replaying recorded games. The world is set up in the same order as when the game is played, so that a
+# recorded game gives the same result when it's replayed here.
+class HeadlessSimulation:
+    def __init__(self, map_file_path: str, hero_id: HeroId, time_step: Millis, hero_start_level: int = 1,
+                 start_money: int = 0, seed: Optional[int] = None):
+        self.time_step = time_step
+
+        # NPC's share a "global path finder" that needs to be initialized before we start creating NPCs.
+        self.path_finder = GlobalPathFinder()
+        set_global_path_finder(self.path_finder)
+        map_data = load_map_from_file(CAMERA_SIZE, map_file_path, hero_id)
+        self.path_finder.set_grid(map_data.game_state.pathfinder_wall_grid)
+
+        self.game_state: GameState = map_data.game_state
+        self.info_message = InfoMessage()
+        self.game_engine = GameEngine(self.game_state, self.info_message)
+        self.player_interactions_state = PlayerInteractionsState()
+        self.game_state.center_camera_on_player()
+        # There are no scenes to transition to. If the story is completed, the simulation ends.
+        self.world_behavior = StoryBehavior(lambda: None, self.game_state, self.info_message)
+        if hero_start_level > 1:
+            self.game_engine.gain_levels(hero_start_level - 1)
+        if start_money > 0:
+            self.game_state.player_state.modify_money(start_money)
+        if seed is not None:
+            self.game_state.random.seed(seed)
+        self.world_behavior.on_startup(True)
+
+    # Returns whether or not the simulation can keep running
+    def run_one_frame(self) -> bool:
+        self.player_interactions_state.handle_nearby_entities(
+            self.game_state.player_entity, self.game_state, self.game_engine)
+        scene_transition = self.world_behavior.control(self.time_step)
+        engine_events = self.game_engine.run_one_frame(self.time_step)
+        self.info_message.notify_time_passed(self.time_step)
+        for event in engine_events:
+            scene_transition = self.world_behavior.handle_event(event)
+        return scene_transition is None
+
+
+def start(map_file_name: Optional[str], chosen_hero_id: Optional[str], num_frames: int, time_step: Millis,
+          seed: Optional[int] = None):
+    register_all_game_data()
+    init_silent_sound_player()
+    map_file_path = "resources/maps/" + (map_file_name or "map1.json")
+    hero_id = HeroId[chosen_hero_id] if chosen_hero_id else HeroId.MAGE
+    simulation = HeadlessSimulation(map_file_path, hero_id, time_step, seed=seed)
+
+    print("Running headless simulation of " + map_file_path + " (" + str(num_frames) + " frames, time step: "
+          + str(time_step) + "ms)")
+    num_simulated_frames = 0
+    start_time = time.perf_counter()
+    while num_simulated_frames < num_frames:
+        num_simulated_frames += 1
+        if not simulation.run_one_frame():
+            print("Simulation ended early, after " + str(num_simulated_frames) + " frames")
+            break
+    elapsed_seconds = time.perf_counter() - start_time
+
+    simulated_fps = num_simulated_frames / elapsed_seconds if elapsed_seconds > 0 else float('inf')
+    print("Simulated " + str(num_simulated_frames) + " frames (" + str(num_simulated_frames * time_step // 1000)
+          + "s of game time) in " + "{:.2f}".format(elapsed_seconds) + "s")
+    print("Simulated frames per second: " + "{:.1f}".format(simulated_fps))
+    path_cache = simulation.path_finder.path_cache
+    print("Path cache: " + str(path_cache.num_hits) + " hits, " + str(path_cache.num_suffix_hits) + " suffix hits, "
+          + str(path_cache.num_misses) + " misses (hit rate: " + "{:.0%}".format(path_cache.get_hit_rate()) + "), "
+          + str(path_cache.num_evictions) + " evictions")
+    game_engine = simulation.game_engine
+    print("NPCs in the last frame: " + str(game_engine.num_active_npcs) + " active, "
+          + str(game_engine.num_dormant_npcs) + " dormant, " + str(game_engine.num_sleeping_npcs) + " sleeping")
+    event_dispatch_counts = simulation.game_state.player_state.event_dispatch_counts
+    print("Events dispatched: " + (", ".join(name + ": " + str(count) for name, count in
+                                             sorted(event_dispatch_counts.items())) or "none"))
+
+
+# Replays a game that was recorded with "./run.py --record", and checks that the game state ends up exactly the same as
+# when it was recorded
+def start_replay(replay_file_path: str):
+    with open(replay_file_path) as file:
+        replay = json.load(file)
+    if replay["version"] != REPLAY_VERSION:
+        raise Exception("Unsupported replay version: " + str(replay["version"]))
+    register_all_game_data()
+    init_silent_sound_player()
+    time_step = replay["time_step"]
+    simulation = HeadlessSimulation(replay["map_file_path"], HeroId[replay["hero_id"]], time_step,
+                                    replay["hero_start_level"], replay["start_money"], replay["seed"])
+    commands = replay["commands"]
+    checksums = {tick: checksum for tick, checksum in replay["checksums"]}
+    num_ticks = replay["num_ticks"]
+
+    print("Replaying " + replay_file_path + " (" + str(num_ticks) + " frames, " + str(len(commands))
+          + " commands, map: " + replay["map_file_path"] + ")")
+    command_index = 0
+    num_verified_checksums = 0
+    start_time = time.perf_counter()
+    for tick in range(num_ticks):
+        while command_index < len(commands) and commands[command_index][0] == tick:
+            apply_command(commands[command_index][1:], simulation.game_state, simulation.game_engine,
+                          simulation.player_interactions_state)
+            command_index += 1
+        simulation.run_one_frame()
+        if tick + 1 in checksums:
+            if get_state_checksum(simulation.game_state) != checksums[tick + 1]:
+                print("Replay diverged from the recording! The game state differs after frame " + str(tick + 1))
+                return
+            num_verified_checksums += 1
+    elapsed_seconds = time.perf_counter() - start_time
+
+    simulated_fps = num_ticks / elapsed_seconds if elapsed_seconds > 0 else float('inf')
+    print("Replay matched the recording (" + str(num_verified_checksums) + " checksums verified)")
+    print("Simulated " + str(num_ticks) + " frames in " + "{:.2f}".format(elapsed_seconds) + "s ("
+          + "{:.1f}".format(simulated_fps) + " frames per second)")
+    player_state = simulation.game_state.player_state
+    print("Final state: level " + str(player_state.level) + ", " + str(player_state.health_resource.value)
+          + " health, " + str(player_state.money) + " money, "
+          + str(len(simulation.game_state.non_player_characters)) + " NPCs")
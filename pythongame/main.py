@@ -1,21 +1,29 @@
 import sys
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 
 import pygame
 
-from pythongame.core.common import Millis, SceneTransition, AbstractScene
+from pythongame.core.common import Millis, SceneTransition, AbstractScene, Observable, FRAME_NOTIFICATIONS
+from pythongame.core.frame_profiler import FRAME_PROFILER
 from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, \
     UI_ICON_SPRITE_PATHS, PORTRAIT_ICON_SPRITE_PATHS
 from pythongame.core.game_state import GameState
+from pythongame.core.lazy_game_data import GAME_DATA_LOADER
 from pythongame.core.sound_player import init_sound_player
+from pythongame.core.view.frame_profiler_view import FrameProfilerView
 from pythongame.core.view.game_world_view import GameWorldView
-from pythongame.core.view.image_loading import load_images_by_sprite, \
-    load_images_by_ui_sprite, load_images_by_portrait_sprite
+from pythongame.core.view.image_loading import create_lazy_images_by_sprite, create_lazy_images_by_icon_sprite, \
+    IMAGES_BY_SPRITE_MAX_NUM_BYTES, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES
+from pythongame.core.view.render_util import TRANSPARENT_SURFACE_POOL
+from pythongame.core.view.sprite_atlas import SpriteAtlas, SPRITE_ATLAS_DIR
+from pythongame.core.view.text_cache import FONT_RENDER_COUNTER, TEXT_SURFACE_CACHE
 from pythongame.core.world_behavior import AbstractWorldBehavior
 from pythongame.player_file import SaveFileHandler
 from pythongame.register_game_data import register_all_game_data
+from pythongame.replay import ReplayRecorder
 from pythongame.scene_challenge_complete_screen.scene_challenge_complete_screen import ChallengeCompleteScreenScene
-from pythongame.scene_creating_world.scene_creating_world import CreatingWorldScene, InitFlags
+from pythongame.scene_creating_world.scene_creating_world import CreatingWorldScene, InitFlags, \
+    CHALLENGE_MAP_FILE_PATH
 from pythongame.scene_main_menu.scene_main_menu import MainMenuScene
 from pythongame.scene_main_menu.view_main_menu import MainMenuView
 from pythongame.scene_picking_hero.scene_picking_hero import PickingHeroScene
@@ -29,13 +37,21 @@ from pythongame.scenes_game.scene_playing import PlayingScene
 ABILITY_KEY_LABELS = ["Q", "W", "E", "R", "T"]
 SCREEN_SIZE = (800, 600)  # If this is not a supported resolution, performance takes a big hit
 CAMERA_SIZE = (800, 430)
-
-register_all_game_data()
+DEFAULT_TIME_STEP = Millis(16)
+# If a frame takes longer than this (for instance while a map is loading), the game slows down instead of simulating
+# all of the time that passed
+MAX_FRAME_TIME = Millis(250)
+# The number of simulation ticks that can be run to catch up with the clock before a frame is rendered
+MAX_TICKS_PER_FRAME = 5
+# The frame profiler overlay is toggled with one key, and the timings of the recent frames are saved with the other
+KEY_TOGGLE_FRAME_PROFILER = pygame.K_F3
+KEY_EXPORT_FRAME_PROFILE = pygame.K_F4
+FRAME_PROFILE_FILE_NAME = "frame_profile"
 
 
 class Main:
     def __init__(self, map_file_name: Optional[str], chosen_hero_id: Optional[str], hero_start_level: Optional[int],
-                 start_money: Optional[int]):
+                 start_money: Optional[int], time_step: Millis, record_file: Optional[str]):
 
         cmd_flags = CommandlineFlags(map_file_name, chosen_hero_id, hero_start_level, start_money)
 
@@ -45,10 +61,21 @@ class Main:
 
         self.fullscreen = True
         self.pygame_screen = self.setup_screen()
-        images_by_sprite = load_images_by_sprite(ENTITY_SPRITE_INITIALIZERS)
-        images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, UI_ICON_SIZE)
-        big_images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, UI_ICON_BIG_SIZE)
-        self.images_by_portrait_sprite = load_images_by_portrait_sprite(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+        sprite_atlas = SpriteAtlas.load(SPRITE_ATLAS_DIR)
+        if sprite_atlas is None:
+            print("No sprite atlas found. (Run build_sprite_atlas.py to make the game load faster.)")
+        elif sprite_atlas.num_stale_images > 0:
+            print(str(sprite_atlas.num_stale_images) + " images in the sprite atlas are out of date.")
+        # Images are loaded when they are first needed
+        images_by_sprite = create_lazy_images_by_sprite(
+            ENTITY_SPRITE_INITIALIZERS, IMAGES_BY_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        images_by_ui_sprite = create_lazy_images_by_icon_sprite(
+            UI_ICON_SPRITE_PATHS, UI_ICON_SIZE, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        big_images_by_ui_sprite = create_lazy_images_by_icon_sprite(
+            UI_ICON_SPRITE_PATHS, UI_ICON_BIG_SIZE, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        self.images_by_portrait_sprite = create_lazy_images_by_icon_sprite(
+            PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        self.images_by_sprite = images_by_sprite
         self.world_view = GameWorldView(self.pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
         self.ui_view = GameUiView(
             self.pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_ui_sprite,
@@ -56,6 +83,13 @@ class Main:
         self.save_file_handler = SaveFileHandler()
         init_sound_player()
         self.clock = pygame.time.Clock()
+        # The game is simulated with a fixed time step, independently of how often it's rendered
+        self.time_step = time_step
+        self.time_not_yet_simulated = 0
+        self.frame_profiler_view = FrameProfilerView(self.pygame_screen, SCREEN_SIZE)
+        self.replay_recorder = ReplayRecorder(record_file) if record_file else None
+        # The flags that the world that is being created (or was created last) was created with
+        self.world_init_flags: Optional[InitFlags] = None
 
         self.scene: AbstractScene = StartingProgramScene(
             self.main_menu_scene, self.creating_world_scene, self.picking_hero_scene, cmd_flags, self.save_file_handler)
@@ -63,7 +97,9 @@ class Main:
     def main_loop(self):
         while True:
             self.clock.tick()
-            time_passed = Millis(self.clock.get_time())
+            FRAME_PROFILER.start_frame()
+            FRAME_PROFILER.start("input")
+            frame_time = min(Millis(self.clock.get_time()), MAX_FRAME_TIME)
             fps_string = str(int(self.clock.get_fps()))
             self.ui_view.update_fps_string(fps_string)
 
@@ -74,19 +110,97 @@ class Main:
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and self.fullscreen:
                     self.toggle_fullscreen()
                     self.ui_view.on_fullscreen_changed(self.fullscreen)
+                elif event.type == pygame.KEYDOWN and event.key == KEY_TOGGLE_FRAME_PROFILER:
+                    FRAME_PROFILER.set_enabled(not FRAME_PROFILER.is_enabled)
+                elif event.type == pygame.KEYDOWN and event.key == KEY_EXPORT_FRAME_PROFILE \
+                        and FRAME_PROFILER.is_enabled:
+                    self.export_frame_profile()
 
             transition: Optional[SceneTransition] = self.scene.handle_user_input(input_events)
+            FRAME_PROFILER.stop("input")
             if transition:
                 self.change_scene(transition)
                 continue
 
-            transition: Optional[SceneTransition] = self.scene.run_one_frame(time_passed)
+            FRAME_PROFILER.start("simulation")
+            transition: Optional[SceneTransition] = self.run_simulation_ticks(frame_time)
+            # The UI is updated with what changed in the frame
+            FRAME_NOTIFICATIONS.notify_all()
+            FRAME_PROFILER.stop("simulation")
             if transition:
                 self.change_scene(transition)
                 continue
 
+            self.scene.set_render_interpolation(self.time_not_yet_simulated / self.time_step)
             self.scene.render()
+            if FRAME_PROFILER.is_enabled:
+                self.frame_profiler_view.render(FRAME_PROFILER, self.get_profiling_counters())
+            FRAME_PROFILER.start("display_update")
             pygame.display.update()
+            FRAME_PROFILER.stop("display_update")
+
+    # Runs as many simulation ticks as fit in the time that has passed. Time that is left over is simulated in a later
+    # frame, once it adds up to a whole time step.
+    def run_simulation_ticks(self, frame_time: Millis) -> Optional[SceneTransition]:
+        self.time_not_yet_simulated += frame_time
+        num_ticks = 0
+        while self.time_not_yet_simulated >= self.time_step:
+            if num_ticks == MAX_TICKS_PER_FRAME:
+                # The simulation can't keep up. Rather than falling further and further behind, the game slows down.
+                self.time_not_yet_simulated %= self.time_step
+                break
+            self.time_not_yet_simulated -= self.time_step
+            num_ticks += 1
+            transition: Optional[SceneTransition] = self.scene.run_one_frame(self.time_step)
+            if transition:
+                return transition
+        return None
+
+    # Counters that are kept by caches etc, and that help explain the frame timings
+    def get_profiling_counters(self) -> Dict[str, int]:
+        counters = {
+            "font renders": FONT_RENDER_COUNTER.num_font_render_calls,
+            "text cache misses": TEXT_SURFACE_CACHE.num_misses,
+            "transparent surfaces": TRANSPARENT_SURFACE_POOL.num_created_surfaces,
+            "sprites loaded": self.images_by_sprite.num_loaded_keys,
+            "sprite evictions": self.images_by_sprite.num_evictions,
+            "lazy game data loads": GAME_DATA_LOADER.num_lazily_called_register_functions
+        }
+        if isinstance(self.scene, PlayingScene):
+            game_engine = self.scene.game_engine
+            counters["active NPCs"] = game_engine.num_active_npcs
+            counters["dormant NPCs"] = game_engine.num_dormant_npcs
+            counters["sleeping NPCs"] = game_engine.num_sleeping_npcs
+            counters["scheduled calls made"] = self.scene.game_state.scheduler.num_made_calls
+            for event_name, count in self.scene.game_state.player_state.event_dispatch_counts.items():
+                counters["events " + event_name] = count
+            num_skipped_notifications = 0
+            for name, observable in self.get_ui_observables(self.scene.game_state).items():
+                counters["notified " + name] = observable.num_notifications
+                num_skipped_notifications += observable.num_notify_calls - observable.num_notifications
+            counters["skipped notifications"] = num_skipped_notifications
+        return counters
+
+    # Observables that notify the UI often, and whose notifications are skipped when nothing changed, or coalesced
+    @staticmethod
+    def get_ui_observables(game_state: GameState) -> Dict[str, Observable]:
+        player_state = game_state.player_state
+        observables = {
+            "health": player_state.health_resource.value_was_updated,
+            "mana": player_state.mana_resource.value_was_updated,
+            "stats": player_state.stats_were_updated,
+            "cooldowns": player_state.cooldowns_were_updated,
+            "buffs": player_state.buffs_were_updated,
+            "movement speed": game_state.player_movement_speed_was_updated
+        }
+        if game_state.player_entity.position_changed is not None:
+            observables["position"] = game_state.player_entity.position_changed
+        return observables
+
+    def export_frame_profile(self):
+        FRAME_PROFILER.export_csv(FRAME_PROFILE_FILE_NAME + ".csv")
+        FRAME_PROFILER.export_json(FRAME_PROFILE_FILE_NAME + ".json", self.get_profiling_counters())
+        print("Saved frame timings to " + FRAME_PROFILE_FILE_NAME + ".csv and " + FRAME_PROFILE_FILE_NAME + ".json")
 
     def toggle_fullscreen(self):
         self.fullscreen = not self.fullscreen
@@ -99,6 +213,8 @@ class Main:
         return pygame.display.set_mode(SCREEN_SIZE, flags)
 
     def quit_game(self):
+        if self.replay_recorder:
+            self.replay_recorder.stop("The game was closed")
         pygame.quit()
         sys.exit()
 
@@ -112,6 +228,7 @@ class Main:
             self.save_file_handler, self.picking_hero_scene, self.creating_world_scene, flags, view)
 
     def creating_world_scene(self, flags: InitFlags):
+        self.world_init_flags = flags
         return CreatingWorldScene(self.playing_scene, self.picking_hero_scene, self.challenge_complete_scene,
                                   self.victory_screen_scene, CAMERA_SIZE, self.ui_view, flags)
 
@@ -123,9 +240,22 @@ class Main:
             self, game_state: GameState, game_engine: GameEngine, world_behavior: AbstractWorldBehavior,
             ui_view: GameUiView, new_hero_was_created: bool, character_file: Optional[str],
             total_time_played_on_character: Millis):
+        if self.replay_recorder:
+            self._start_recording(game_state)
         return PlayingScene(
             self.world_view, game_state, game_engine, world_behavior, ui_view, new_hero_was_created,
-            character_file, self.save_file_handler, total_time_played_on_character, self.toggle_fullscreen)
+            character_file, self.save_file_handler, total_time_played_on_character, self.toggle_fullscreen,
+            self.replay_recorder)
+
+    def _start_recording(self, game_state: GameState):
+        flags = self.world_init_flags
+        if flags.saved_player_state is not None:
+            self.replay_recorder.stop("Only games with a new hero can be recorded")
+        elif flags.map_file_path == CHALLENGE_MAP_FILE_PATH:
+            self.replay_recorder.stop("Challenges can't be recorded")
+        else:
+            self.replay_recorder.start(game_state, flags.map_file_path, flags.picked_hero, flags.hero_start_level,
+                                       flags.start_money, self.time_step)
 
     def challenge_complete_scene(self, total_time_played: Millis):
         return ChallengeCompleteScreenScene(self.pygame_screen, total_time_played)
@@ -135,6 +265,7 @@ class Main:
 
 
 def start(map_file_name: Optional[str], chosen_hero_id: Optional[str], hero_start_level: Optional[int],
-          start_money: Optional[int]):
-    main = Main(map_file_name, chosen_hero_id, hero_start_level, start_money)
+          start_money: Optional[int], time_step: Millis = DEFAULT_TIME_STEP, record_file: Optional[str] = None):
+    register_all_game_data()
+    main = Main(map_file_name, chosen_hero_id, hero_start_level, start_money, time_step, record_file)
     main.main_loop()
@@ -15,20 +15,19 @@ from pythongame.core.game_data import ENTITY_SPRITE_INITIALIZERS, UI_ICON_SPRITE
 from pythongame.core.game_state import GameState
 from pythongame.core.math import sum_of_vectors
 from pythongame.core.view.game_world_view import GameWorldView
-from pythongame.core.view.image_loading import load_images_by_sprite, load_images_by_ui_sprite, \
-    load_images_by_portrait_sprite
+from pythongame.core.view.image_loading import create_lazy_images_by_sprite, create_lazy_images_by_icon_sprite, \
+    IMAGES_BY_SPRITE_MAX_NUM_BYTES, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES
+from pythongame.core.view.sprite_atlas import SpriteAtlas, SPRITE_ATLAS_DIR
 from pythongame.map_editor.map_editor_ui_view import MapEditorView, PORTRAIT_ICON_SIZE, MAP_EDITOR_UI_ICON_SIZE, \
     EntityTab, GenerateRandomMap, SetCameraPosition, AddEntity, DeleteEntities, DeleteDecorations, MapEditorAction, \
     SaveMap, ToggleOutlines, AddSmartFloorTiles, DeleteSmartFloorTiles
 from pythongame.map_editor.map_editor_world_entity import MapEditorWorldEntity
-from pythongame.map_file import save_map_to_json_file, load_map_from_json_file, create_map_from_json, MapData, \
+from pythongame.map_file import save_map_to_file, load_map_from_file, create_map_from_json, MapData, \
     MapEditorConfig
 from pythongame.register_game_data import register_all_game_data
 
 MAP_DIR = "resources/maps/"
 
-register_all_game_data()
-
 GRID_CELL_SIZE = 25
 
 ADVANCED_ENTITIES = [
@@ -80,7 +79,7 @@ class MapEditor:
 
         if Path(self.map_file_path).exists():
             print("Loading map '%s' from file." % self.map_file_path)
-            map_data = load_map_from_json_file(CAMERA_SIZE, self.map_file_path, HERO_ID)
+            map_data = load_map_from_file(CAMERA_SIZE, self.map_file_path, HERO_ID)
             game_state = map_data.game_state
             self._set_game_state(game_state)
             self.config = map_data.map_editor_config
@@ -108,9 +107,13 @@ class MapEditor:
         pygame.init()
 
         pygame_screen = pygame.display.set_mode(SCREEN_SIZE)
-        images_by_sprite = load_images_by_sprite(ENTITY_SPRITE_INITIALIZERS)
-        images_by_ui_sprite = load_images_by_ui_sprite(UI_ICON_SPRITE_PATHS, MAP_EDITOR_UI_ICON_SIZE)
-        images_by_portrait_sprite = load_images_by_portrait_sprite(PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE)
+        sprite_atlas = SpriteAtlas.load(SPRITE_ATLAS_DIR)
+        images_by_sprite = create_lazy_images_by_sprite(
+            ENTITY_SPRITE_INITIALIZERS, IMAGES_BY_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        images_by_ui_sprite = create_lazy_images_by_icon_sprite(
+            UI_ICON_SPRITE_PATHS, MAP_EDITOR_UI_ICON_SIZE, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES, sprite_atlas)
+        images_by_portrait_sprite = create_lazy_images_by_icon_sprite(
+            PORTRAIT_ICON_SPRITE_PATHS, PORTRAIT_ICON_SIZE, IMAGES_BY_ICON_SPRITE_MAX_NUM_BYTES, sprite_atlas)
         world_view = GameWorldView(pygame_screen, CAMERA_SIZE, SCREEN_SIZE, images_by_sprite)
 
         self.render_outlines = False
@@ -189,7 +192,8 @@ class MapEditor:
 
             world_view.render_world(
                 all_entities_to_render=self.game_state.get_all_entities_to_render(),
-                decorations_to_render=self.game_state.get_decorations_to_render(),
+                walls_state=self.game_state.walls_state,
+                decorations_state=self.game_state.decorations_state,
                 player_entity=self.game_state.player_entity,
                 is_player_invisible=self.game_state.player_state.is_invisible,
                 player_active_buffs=self.game_state.player_state.active_buffs,
@@ -219,7 +223,7 @@ class MapEditor:
     def save(self):
         grid_string = self.grid.serialize()
         map_data = MapData(self.game_state, self.config, grid_string)
-        save_map_to_json_file(map_data, self.map_file_path)
+        save_map_to_file(map_data, self.map_file_path)
         print("Saved state to " + self.map_file_path)
 
     def _handle_action(self, action: MapEditorAction, grid_cell_size: int):
@@ -350,6 +354,7 @@ class MapEditor:
 
 
 def main(map_file_name: Optional[str]):
+    register_all_game_data()
     MapEditor(map_file_name)
 
 
@@ -424,7 +429,7 @@ def _delete_map_entities_from_position(game_state: GameState, snapped_mouse_worl
     game_state.walls_state.remove_all_from_position(snapped_mouse_world_position)
     for enemy in [e for e in game_state.non_player_characters if
                   e.world_entity.get_position() == snapped_mouse_world_position]:
-        game_state.non_player_characters.remove(enemy)
+        game_state.remove_non_player_character(enemy)
     for consumable in [p for p in game_state.consumables_on_ground
                        if p.world_entity.get_position() == snapped_mouse_world_position]:
         game_state.consumables_on_ground.remove(consumable)
@@ -1,5 +1,10 @@
 import json
-from typing import Tuple
+import struct
+import sys
+from array import array
+from ast import literal_eval
+from itertools import chain
+from typing import Tuple, Dict, Callable
 
 from pygame.rect import Rect
 
@@ -17,10 +22,31 @@ class MapEditorConfig:
 
 
 class MapData:
-    def __init__(self, game_state: GameState, map_editor_config: MapEditorConfig, grid_string: str):
+    def __init__(self, game_state: GameState, map_editor_config: MapEditorConfig, grid_string: Optional[str],
+                 load_grid_string: Optional[Callable[[], Optional[str]]] = None):
         self.game_state = game_state
         self.map_editor_config = map_editor_config
-        self.grid_string = grid_string
+        self._grid_string = grid_string
+        # The grid is only used by the map editor. If this is set, the grid isn't decoded until it's asked for.
+        self._load_grid_string = load_grid_string
+
+    @property
+    def grid_string(self) -> Optional[str]:
+        if self._load_grid_string is not None:
+            self._grid_string = self._load_grid_string()
+            self._load_grid_string = None
+        return self._grid_string
+
+
+# Maps can be stored either as JSON (which is easy to read and edit) or in a compact binary format (which is faster to
+# load). The format is detected from the contents of the file.
+def load_map_from_file(camera_size: Tuple[int, int], map_file_path: str, hero_id: HeroId) -> MapData:
+    with open(map_file_path, 'rb') as map_file:
+        file_contents = map_file.read()
+    if MapBinary.is_binary_map(file_contents):
+        player_state = create_player_state(hero_id)
+        return MapBinary.deserialize(file_contents, player_state, camera_size)
+    return create_map_from_json(camera_size, json.loads(file_contents), hero_id)
 
 
 def load_map_from_json_file(camera_size: Tuple[int, int], map_file_path: str, hero_id: HeroId) -> MapData:
@@ -44,6 +70,15 @@ def write_json_to_file(json_data, map_file: str):
         map_file.write(json.dumps(json_data, indent=2))
 
 
+# Saves the map in the binary format if the file has the binary map extension, and as JSON otherwise
+def save_map_to_file(map_data: MapData, map_file: str):
+    if map_file.endswith(BINARY_MAP_FILE_EXTENSION):
+        with open(map_file, 'wb') as file:
+            file.write(MapBinary.serialize_from_json(MapJson.serialize(map_data)))
+    else:
+        save_map_to_json_file(map_data, map_file)
+
+
 class MapJson:
 
     @staticmethod
@@ -212,3 +247,243 @@ class WorldAreaJson:
     @staticmethod
     def deserialize(data) -> Rect:
         return Rect(data[0], data[1], data[2], data[3])
+
+
+BINARY_MAP_FILE_EXTENSION = ".map"
+
+
+# The binary map format. All numbers are little-endian.
+#
+#   magic bytes, format version (uint16)
+#   entire world area (4 x int32), player position (2 x int32), disable_smart_grid (uint8)
+#   one section per kind of entity (see _BINARY_SECTIONS), each with:
+#       number of names (uint16), followed by each name (uint8 length + utf-8)
+#       number of entities (uint32), followed by (value, x, y) for each entity (3 x int32)
+#       The value is an index into the section's names (the wall type for walls etc) or, for money piles, the amount.
+#   the map editor's grid: width and height (2 x uint32, both zero if there is no grid), followed by the cells, packed
+#       with 2 bits per cell, in the same order as in the grid string (column by column)
+#
+# Entity types are stored by name (like in the JSON format), so that maps keep working when enums are reordered.
+class MapBinary:
+    MAGIC = b"PGMAP"
+    VERSION = 1
+
+    @staticmethod
+    def is_binary_map(file_contents: bytes) -> bool:
+        return file_contents.startswith(MapBinary.MAGIC)
+
+    @staticmethod
+    def serialize_from_json(json_data) -> bytes:
+        writer = _BinaryWriter()
+        writer.write_bytes(MapBinary.MAGIC)
+        writer.write("<H", MapBinary.VERSION)
+        writer.write("<iiii", *json_data["entire_world_area"])
+        writer.write("<ii", *json_data["player"]["position"])
+        writer.write("<B", 1 if json_data.get("disable_smart_grid", False) else 0)
+        for section_key, value_key, _enum_type in _BINARY_SECTIONS:
+            entries = json_data.get(section_key, [])
+            if value_key is None:
+                names = []
+                values = [0] * len(entries)
+            elif value_key == "amount":
+                names = []
+                values = [e[value_key] for e in entries]
+            else:
+                names = sorted(set(e[value_key] for e in entries))
+                index_by_name = {name: i for i, name in enumerate(names)}
+                values = [index_by_name[e[value_key]] for e in entries]
+            writer.write_names(names)
+            numbers = array('i')
+            for value, entry in zip(values, entries):
+                numbers.extend((value, _whole_number(entry["position"][0]), _whole_number(entry["position"][1])))
+            writer.write("<I", len(entries))
+            writer.write_array(numbers)
+        writer.write_grid(json_data.get("grid", None))
+        return writer.get_bytes()
+
+    @staticmethod
+    def deserialize(file_contents: bytes, player_state: PlayerState, camera_size: Tuple[int, int]) -> MapData:
+        reader = _BinaryReader(file_contents)
+        entire_world_area, player_position, disable_smart_grid = MapBinary._read_header(reader)
+        entities_by_section: Dict[str, List[Any]] = {}
+        for section_key, value_key, enum_type in _BINARY_SECTIONS:
+            names = reader.read_names()
+            numbers = reader.read_array()
+            create_entity = _BINARY_SECTION_ENTITY_FACTORIES[section_key]
+            if value_key is None or value_key == "amount":
+                types = None
+            else:
+                types = [enum_type[name] for name in names]
+            entities = []
+            for i in range(0, len(numbers), 3):
+                value = numbers[i] if types is None else types[numbers[i]]
+                entities.append(create_entity(value, (numbers[i + 1], numbers[i + 2])))
+            entities_by_section[section_key] = entities
+
+        game_state = GameState(player_entity=create_hero_world_entity(player_state.hero_id, player_position),
+                               consumables_on_ground=entities_by_section["consumables_on_ground"],
+                               items_on_ground=entities_by_section["items_on_ground"],
+                               money_piles_on_ground=entities_by_section["money_piles_on_ground"],
+                               non_player_characters=entities_by_section["non_player_characters"],
+                               walls=entities_by_section["walls"], camera_size=camera_size,
+                               entire_world_area=entire_world_area,
+                               player_state=player_state,
+                               decoration_entities=entities_by_section["decorations"],
+                               portals=entities_by_section["portals"],
+                               chests=entities_by_section["chests"])
+        map_editor_config = MapEditorConfig(disable_smart_grid=disable_smart_grid)
+        return MapData(game_state, map_editor_config, None, reader.read_grid)
+
+    # Used for converting binary maps back to JSON, so that they can be edited
+    @staticmethod
+    def deserialize_to_json(file_contents: bytes):
+        reader = _BinaryReader(file_contents)
+        entire_world_area, player_position, disable_smart_grid = MapBinary._read_header(reader)
+        json_data = {
+            "player": PlayerJson.serialize_from_position(player_position),
+            "entire_world_area": WorldAreaJson.serialize(entire_world_area),
+            "disable_smart_grid": disable_smart_grid
+        }
+        for section_key, value_key, _enum_type in _BINARY_SECTIONS:
+            names = reader.read_names()
+            numbers = reader.read_array()
+            entries = []
+            for i in range(0, len(numbers), 3):
+                entry = {"position": (numbers[i + 1], numbers[i + 2])}
+                if value_key == "amount":
+                    entry[value_key] = numbers[i]
+                elif value_key is not None:
+                    entry[value_key] = names[numbers[i]]
+                entries.append(entry)
+            json_data[section_key] = entries
+        json_data["grid"] = reader.read_grid()
+        return json_data
+
+    @staticmethod
+    def _read_header(reader) -> Tuple[Rect, Tuple[int, int], bool]:
+        if reader.read_bytes(len(MapBinary.MAGIC)) != MapBinary.MAGIC:
+            raise Exception("Not a binary map file")
+        version = reader.read("<H")[0]
+        if version != MapBinary.VERSION:
+            raise Exception("Unsupported binary map format version: " + str(version))
+        entire_world_area = Rect(*reader.read("<iiii"))
+        player_position = reader.read("<ii")
+        disable_smart_grid = reader.read("<B")[0] == 1
+        return entire_world_area, player_position, disable_smart_grid
+
+
+# (key in the JSON format, key of the entity's type or amount, enum type), in the order they are stored
+_BINARY_SECTIONS = [
+    ("walls", "wall_type", WallType),
+    ("decorations", "sprite", Sprite),
+    ("non_player_characters", "npc_type", NpcType),
+    ("portals", "portal_id", PortalId),
+    ("chests", None, None),
+    ("items_on_ground", "item_type", ItemType),
+    ("consumables_on_ground", "consumable_type", ConsumableType),
+    ("money_piles_on_ground", "amount", None)
+]
+
+_BINARY_SECTION_ENTITY_FACTORIES = {
+    "walls": create_wall,
+    "decorations": lambda sprite, position: create_decoration_entity(position, sprite),
+    "non_player_characters": create_npc,
+    "portals": create_portal,
+    "chests": lambda _value, position: create_chest(position),
+    "items_on_ground": create_item_on_ground,
+    "consumables_on_ground": create_consumable_on_ground,
+    "money_piles_on_ground": create_money_pile_on_ground
+}
+
+
+# Some positions are stored as floats in the JSON maps (like 425.0)
+def _whole_number(number) -> int:
+    if number != int(number):
+        raise Exception("Position can't be stored in the binary map format: " + str(number))
+    return int(number)
+
+
+_GRID_CELLS_PER_BYTE = 4
+# The cell values that are stored in each byte of the grid, for every possible byte
+_GRID_CELLS_BY_BYTE = [tuple((b >> (2 * i)) & 3 for i in range(_GRID_CELLS_PER_BYTE)) for b in range(256)]
+
+
+class _BinaryWriter:
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, struct_format: str, *values):
+        self._parts.append(struct.pack(struct_format, *values))
+
+    def write_bytes(self, data: bytes):
+        self._parts.append(data)
+
+    def write_names(self, names: List[str]):
+        self.write("<H", len(names))
+        for name in names:
+            encoded_name = name.encode("utf-8")
+            self.write("<B", len(encoded_name))
+            self.write_bytes(encoded_name)
+
+    def write_array(self, numbers: array):
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        self.write_bytes(numbers.tobytes())
+
+    def write_grid(self, grid_string: Optional[str]):
+        if not grid_string:
+            self.write("<II", 0, 0)
+            return
+        grid = literal_eval(grid_string)
+        self.write("<II", len(grid), len(grid[0]))
+        cells = list(chain.from_iterable(grid))
+        # Pad, so that the last byte is full
+        cells += [0] * (-len(cells) % _GRID_CELLS_PER_BYTE)
+        packed = bytearray(len(cells) // _GRID_CELLS_PER_BYTE)
+        for i, cell in enumerate(cells):
+            if not 0 <= cell <= 3:
+                raise Exception("Grid cell value doesn't fit in 2 bits: " + str(cell))
+            packed[i // _GRID_CELLS_PER_BYTE] |= cell << (2 * (i % _GRID_CELLS_PER_BYTE))
+        self.write_bytes(bytes(packed))
+
+    def get_bytes(self) -> bytes:
+        return b"".join(self._parts)
+
+
+class _BinaryReader:
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def read(self, struct_format: str) -> Tuple:
+        values = struct.unpack_from(struct_format, self._data, self._offset)
+        self._offset += struct.calcsize(struct_format)
+        return values
+
+    def read_bytes(self, num_bytes: int) -> bytes:
+        data = bytes(self._data[self._offset:self._offset + num_bytes])
+        self._offset += num_bytes
+        return data
+
+    def read_names(self) -> List[str]:
+        num_names = self.read("<H")[0]
+        return [self.read_bytes(self.read("<B")[0]).decode("utf-8") for _ in range(num_names)]
+
+    # Reads the number of (value, x, y) entries, followed by the entries
+    def read_array(self) -> array:
+        num_entries = self.read("<I")[0]
+        numbers = array('i')
+        numbers.frombytes(self.read_bytes(num_entries * 3 * numbers.itemsize))
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        return numbers
+
+    # Returns the grid in the format that the map editor uses (a Python literal), or None if there is no grid
+    def read_grid(self) -> Optional[str]:
+        width, height = self.read("<II")
+        if width == 0:
+            return None
+        num_cells = width * height
+        packed = self.read_bytes((num_cells + _GRID_CELLS_PER_BYTE - 1) // _GRID_CELLS_PER_BYTE)
+        cells = list(chain.from_iterable(_GRID_CELLS_BY_BYTE[b] for b in packed))
+        return str([cells[x * height:(x + 1) * height] for x in range(width)])
@@ -1,3 +1,4 @@
+from pythongame.core.lazy_game_data import GAME_DATA_LOADER
 from pythongame.game_data.abilities.ability_arcane_fire import register_arcane_fire_ability
 from pythongame.game_data.abilities.ability_bloodlust import register_bloodlust_ability
 from pythongame.game_data.abilities.ability_charge import register_charge_ability
@@ -119,138 +120,147 @@ from pythongame.game_data.walls import register_walls
 from pythongame.game_data.warp_points import register_warp_point
 
 
-def register_all_game_data():
-    register_fireball_ability()
-    register_frost_nova_ability()
-    register_heal_ability()
-    register_arcane_fire_ability()
-    register_teleport_ability()
-    register_sword_slash_ability()
-    register_bloodlust_ability()
-    register_charge_ability()
-    register_whirlwind_ability()
-    register_entangling_roots_ability()
-    register_stomp_ability()
-    register_shiv_ability()
-    register_stealth_ability()
-    register_infuse_dagger_ability()
-    register_dash_ability()
+# All register functions, in the order that they must be called in when all game data is registered
+REGISTER_FUNCTIONS = [
+    register_fireball_ability,
+    register_frost_nova_ability,
+    register_heal_ability,
+    register_arcane_fire_ability,
+    register_teleport_ability,
+    register_sword_slash_ability,
+    register_bloodlust_ability,
+    register_charge_ability,
+    register_whirlwind_ability,
+    register_entangling_roots_ability,
+    register_stomp_ability,
+    register_shiv_ability,
+    register_stealth_ability,
+    register_infuse_dagger_ability,
+    register_dash_ability,
 
-    register_recovering_after_ability_buff()
-    register_spawn_buff()
+    register_recovering_after_ability_buff,
+    register_spawn_buff,
 
-    register_lesser_health_potion()
-    register_health_potion()
-    register_lesser_mana_potion()
-    register_mana_potion()
-    register_invis_potion()
-    register_speed_potion()
-    register_summon_scroll()
-    register_brew_potion()
-    register_warpstone_consumable()
-    register_elixir_of_power()
+    register_lesser_health_potion,
+    register_health_potion,
+    register_lesser_mana_potion,
+    register_mana_potion,
+    register_invis_potion,
+    register_speed_potion,
+    register_summon_scroll,
+    register_brew_potion,
+    register_warpstone_consumable,
+    register_elixir_of_power,
 
-    register_necromancer_enemy()
-    register_rat_1_enemy()
-    register_rat_2_enemy()
-    register_dark_reaper_enemy()
-    register_goblin_warlock_enemy()
-    register_zombie_enemy()
-    register_mummy_enemy()
-    register_warrior_enemy()
-    register_veteran_enemy()
-    register_ice_witch_enemy()
-    register_warrior_king_enemy()
-    register_goblin_worker_enemy()
-    register_goblin_spearman_enemy()
-    register_goblin_spearman_elite_enemy()
-    register_goblin_warrior_enemy()
-    register_goblin_sprint_buff()
+    register_necromancer_enemy,
+    register_rat_1_enemy,
+    register_rat_2_enemy,
+    register_dark_reaper_enemy,
+    register_goblin_warlock_enemy,
+    register_zombie_enemy,
+    register_mummy_enemy,
+    register_warrior_enemy,
+    register_veteran_enemy,
+    register_ice_witch_enemy,
+    register_warrior_king_enemy,
+    register_goblin_worker_enemy,
+    register_goblin_spearman_enemy,
+    register_goblin_spearman_elite_enemy,
+    register_goblin_warrior_enemy,
+    register_goblin_sprint_buff,
 
-    register_hero_mage()
-    register_hero_warrior()
-    register_hero_rogue()
-    register_hero_god()
+    register_hero_mage,
+    register_hero_warrior,
+    register_hero_rogue,
+    register_hero_god,
 
-    register_messengers_hat_item()
-    register_amulet_of_mana_item()
-    register_skull_staff_item()
-    register_rod_of_lightning_item()
-    register_soldiers_helmet_item()
-    register_blessed_shield_item()
-    register_staff_of_fire_item()
-    register_blue_robe_item()
-    register_orb_of_the_magi_item()
-    register_orb_of_wisdom_item()
-    register_orb_of_life_item()
-    register_wizards_cowl()
-    register_zuls_aegis()
-    register_knights_armor()
-    register_goats_ring()
-    register_blood_amulet()
-    register_wooden_shield()
-    register_elven_armor()
-    register_gold_nugget()
-    register_saphire()
-    register_leather_cowl_item()
-    register_winged_helmet_item()
-    register_elite_armor()
-    register_ring_of_power_item()
-    register_leather_armor_item()
-    register_freezing_gauntlet_item()
-    register_royal_dagger_item()
-    register_royal_sword_item()
-    register_molten_axe_item()
-    register_wand_item()
-    register_gladiator_armor()
-    register_noble_defender()
-    register_frog_item()
-    register_hatchet_item()
-    register_elite_helmet_item()
-    register_stone_amulet_item()
-    register_torn_document_item()
-    register_key_item()
-    register_practice_sword_item()
-    register_wooden_sword_item()
-    register_druids_ring_item()
-    register_warlocks_cowl_item()
-    register_lich_armor_item()
-    register_warlords_armor_item()
-    register_healing_wand_item()
-    register_skull_shield_item()
-    register_thiefs_mask_item()
-    register_serpent_sword_item()
-    register_whip_item()
-    register_cleaver_item()
-    register_desert_blade_item()
-    register_novice_wand_item()
-    register_sorceress_robe_item()
-    register_blessed_chalice_item()
-    register_necklace_of_suffering_item()
-    register_fire_wand_item()
+    register_messengers_hat_item,
+    register_amulet_of_mana_item,
+    register_skull_staff_item,
+    register_rod_of_lightning_item,
+    register_soldiers_helmet_item,
+    register_blessed_shield_item,
+    register_staff_of_fire_item,
+    register_blue_robe_item,
+    register_orb_of_the_magi_item,
+    register_orb_of_wisdom_item,
+    register_orb_of_life_item,
+    register_wizards_cowl,
+    register_zuls_aegis,
+    register_knights_armor,
+    register_goats_ring,
+    register_blood_amulet,
+    register_wooden_shield,
+    register_elven_armor,
+    register_gold_nugget,
+    register_saphire,
+    register_leather_cowl_item,
+    register_winged_helmet_item,
+    register_elite_armor,
+    register_ring_of_power_item,
+    register_leather_armor_item,
+    register_freezing_gauntlet_item,
+    register_royal_dagger_item,
+    register_royal_sword_item,
+    register_molten_axe_item,
+    register_wand_item,
+    register_gladiator_armor,
+    register_noble_defender,
+    register_frog_item,
+    register_hatchet_item,
+    register_elite_helmet_item,
+    register_stone_amulet_item,
+    register_torn_document_item,
+    register_key_item,
+    register_practice_sword_item,
+    register_wooden_sword_item,
+    register_druids_ring_item,
+    register_warlocks_cowl_item,
+    register_lich_armor_item,
+    register_warlords_armor_item,
+    register_healing_wand_item,
+    register_skull_shield_item,
+    register_thiefs_mask_item,
+    register_serpent_sword_item,
+    register_whip_item,
+    register_cleaver_item,
+    register_desert_blade_item,
+    register_novice_wand_item,
+    register_sorceress_robe_item,
+    register_blessed_chalice_item,
+    register_necklace_of_suffering_item,
+    register_fire_wand_item,
 
     # Register items before NPCs as vendors may rely on item data
 
-    register_dwarf_npc()
-    register_nomad_npc()
-    register_ninja_npc()
-    register_sorcerer_npc()
-    register_young_sorceress_npc()
-    register_warpstone_merchant_npc()
-    register_challenge_starter_npc()
+    register_dwarf_npc,
+    register_nomad_npc,
+    register_ninja_npc,
+    register_sorcerer_npc,
+    register_young_sorceress_npc,
+    register_warpstone_merchant_npc,
+    register_challenge_starter_npc,
+
+    register_decorations,
+    register_map_editor_icons,
+    register_map_smart_floor_tile_sprites,
+    register_ui_icons,
+    register_walls,
 
-    register_decorations()
-    register_map_editor_icons()
-    register_map_smart_floor_tile_sprites()
-    register_ui_icons()
-    register_walls()
+    register_coin,
 
-    register_coin()
+    register_portal,
 
-    register_portal()
+    register_warp_point,
 
-    register_warp_point()
+    register_chest_entity,
 
-    register_chest_entity()
+    register_generic_talents
+]
 
-    register_generic_talents()
+
+# Game data is otherwise registered lazily, as it's looked up (see LazyRegistry)
+def register_all_game_data():
+    GAME_DATA_LOADER.stop_lazy_loading()
+    for register_function in REGISTER_FUNCTIONS:
+        GAME_DATA_LOADER.call_register_function(register_function)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import random
+import time
+from typing import List, Any, Optional, Tuple, Dict
+
+from pythongame.core.common import Millis, HeroId, Direction, AbilityType
+from pythongame.core.game_state import GameState
+from pythongame.core.hero_upgrades import pick_talent
+from pythongame.core.user_input import ActionMoveInDirection, ActionStopMoving, ActionTryUseAbility, \
+    ActionTryUsePotion
+from pythongame.scenes_game.game_engine import GameEngine
+from pythongame.scenes_game.player_environment_interactions import PlayerInteractionsState, interact_with_entity
+
+REPLAY_VERSION = 1
+# A checksum of the game state is recorded this often, so that a replay that diverges from the recording is detected
+# close to where it happened
+CHECKSUM_INTERVAL = 60
+
+# A command is something the player did that changed the game state (moving, using an ability, picking a talent etc),
+# stored as a list of its name followed by its arguments, so that it can be saved as JSON.
+Command = List[Any]
+
+
+# Records a play session, so that it can be replayed without a display (see run_replay). As the game is simulated with a
+# fixed time step, and all randomness in the game logic comes from the game state's seeded random generator, replaying
+# the same commands at the same simulation ticks gives exactly the same game state.
+#
+# Only sessions that start with a new hero can be recorded. Talking to NPCs can't be replayed (it depends on the dialog
+# UI), so the recording is stopped if the player starts a dialog.
+class ReplayRecorder:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.is_recording = False
+        self._header: Dict[str, Any] = None
+        self._commands: List[Tuple[int, Command]] = []
+        self._checksums: List[Tuple[int, str]] = []
+        self._num_ticks = 0
+
+    # Seeds the game state's random generator, and starts recording
+    def start(self, game_state: GameState, map_file_path: str, hero_id: HeroId, hero_start_level: int,
+              start_money: int, time_step: Millis):
+        if self._header is not None:
+            self.stop("Only one game can be recorded at a time")
+            return
+        seed = random.randrange(2 ** 32)
+        game_state.random.seed(seed)
+        self._header = {
+            "version": REPLAY_VERSION,
+            "map_file_path": map_file_path,
+            "hero_id": hero_id.name,
+            "hero_start_level": hero_start_level,
+            "start_money": start_money,
+            "seed": seed,
+            "time_step": time_step
+        }
+        self.is_recording = True
+        print("Recording game to " + self.file_path)
+
+    def record_action(self, action: Any):
+        if self.is_recording:
+            command = command_from_action(action)
+            if command is not None:
+                self._commands.append((self._num_ticks, command))
+
+    def record_command(self, command: Command):
+        if self.is_recording:
+            self._commands.append((self._num_ticks, command))
+
+    # Called after each simulation tick
+    def record_tick(self, game_state: GameState):
+        if self.is_recording:
+            self._num_ticks += 1
+            if self._num_ticks % CHECKSUM_INTERVAL == 0:
+                self._checksums.append((self._num_ticks, get_state_checksum(game_state)))
+
+    def stop(self, reason: str):
+        if self.is_recording:
+            self.is_recording = False
+            self.save()
+            print("Stopped recording: " + reason)
+
+    def save(self):
+        if self._header is None:
+            return
+        data = dict(self._header)
+        data["num_ticks"] = self._num_ticks
+        data["commands"] = [[tick] + command for tick, command in self._commands]
+        data["checksums"] = [[tick, checksum] for tick, checksum in self._checksums]
+        with open(self.file_path, 'w') as file:
+            json.dump(data, file)
+        print("Saved recording of " + str(self._num_ticks) + " ticks to " + self.file_path)
+
+
+def command_from_action(action: Any) -> Optional[Command]:
+    if isinstance(action, ActionMoveInDirection):
+        return ["move", action.direction.name]
+    if isinstance(action, ActionStopMoving):
+        return ["stop"]
+    if isinstance(action, ActionTryUseAbility):
+        return ["ability", action.ability_type.name]
+    if isinstance(action, ActionTryUsePotion):
+        return ["consumable", action.slot_number]
+    return None
+
+
+def apply_command(command: Command, game_state: GameState, game_engine: GameEngine,
+                  player_interactions_state: PlayerInteractionsState):
+    name, args = command[0], command[1:]
+    if name == "move":
+        game_engine.move_in_direction(Direction[args[0]])
+    elif name == "stop":
+        game_engine.stop_moving()
+    elif name == "ability":
+        game_engine.try_use_ability(AbilityType[args[0]])
+    elif name == "consumable":
+        game_engine.try_use_consumable(args[0])
+    elif name == "interact":
+        interact_with_entity(player_interactions_state.get_entity_to_interact_with(), game_engine)
+    elif name == "drag_item":
+        game_engine.drag_item_between_inventory_slots(args[0], args[1])
+    elif name == "drop_item":
+        game_engine.drop_inventory_item_on_ground(args[0], (args[1], args[2]))
+    elif name == "drag_consumable":
+        game_engine.drag_consumable_between_inventory_slots(args[0], args[1])
+    elif name == "drop_consumable":
+        game_engine.drop_consumable_on_ground(args[0], (args[1], args[2]))
+    elif name == "switch_item":
+        game_engine.try_switch_item_at_slot(args[0])
+    elif name == "talent":
+        pick_talent(game_state, args[0], args[1])
+    else:
+        raise Exception("Unhandled replay command: " + str(command))
+
+
+# A fingerprint of the state that matters for the simulation. Floats are included exactly (with repr), so any
+# difference at all is detected.
+def get_state_checksum(game_state: GameState) -> str:
+    player_state = game_state.player_state
+    values = [
+        game_state.player_entity.x, game_state.player_entity.y,
+        player_state.health_resource.value, player_state.mana_resource.value,
+        player_state.money, player_state.exp, player_state.level,
+        [(b.buff_effect.get_buff_type().name, b.get_ratio_duration_remaining()) for b in player_state.active_buffs],
+        [(n.npc_type.name, n.world_entity.x, n.world_entity.y, n.health_resource.value)
+         for n in game_state.non_player_characters],
+        [(p.world_entity.x, p.world_entity.y) for p in game_state.projectile_entities],
+        [(i.item_type.name, i.world_entity.x, i.world_entity.y) for i in game_state.items_on_ground],
+        [(c.consumable_type.name, c.world_entity.x, c.world_entity.y) for c in game_state.consumables_on_ground],
+        game_state.random.getstate()
+    ]
+    return hashlib.md5(repr(values).encode()).hexdigest()
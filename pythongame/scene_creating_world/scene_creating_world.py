@@ -13,11 +13,13 @@ from pythongame.core.hero_upgrades import pick_talent
 from pythongame.core.npc_behaviors import get_quest
 from pythongame.core.pathfinding.grid_astar_pathfinder import GlobalPathFinder
 from pythongame.core.world_behavior import ChallengeBehavior, StoryBehavior, AbstractWorldBehavior
-from pythongame.map_file import load_map_from_json_file
+from pythongame.map_file import load_map_from_file
 from pythongame.player_file import SavedPlayerState
 from pythongame.scenes_game.game_engine import GameEngine
 from pythongame.scenes_game.game_ui_view import GameUiView
 
+CHALLENGE_MAP_FILE_PATH = 'resources/maps/challenge.json'
+
 
 class InitFlags:
     def __init__(self,
@@ -83,7 +85,7 @@ class CreatingWorldScene(AbstractScene):
         path_finder = GlobalPathFinder()
         set_global_path_finder(path_finder)
 
-        map_data = load_map_from_json_file(self.camera_size, map_file_path, picked_hero)
+        map_data = load_map_from_file(self.camera_size, map_file_path, picked_hero)
 
         path_finder.set_grid(map_data.game_state.pathfinder_wall_grid)
 
@@ -110,7 +112,7 @@ class CreatingWorldScene(AbstractScene):
         game_state.player_state.quests_were_updated.register_observer(self.ui_view.on_player_quests_updated)
         game_state.player_entity.movement_changed = Observable()
         game_state.player_entity.movement_changed.register_observer(play_or_stop_footstep_sounds)
-        game_state.player_entity.position_changed = Observable()
+        game_state.player_entity.position_changed = Observable(only_on_change=True, coalesce=True)
         game_state.player_entity.position_changed.register_observer(self.ui_view.on_player_position_updated)
         game_state.player_entity.position_changed.register_observer(
             lambda _: self.ui_view.on_walls_seen([w.get_position() for w in game_state.get_walls_in_sight_of_player()]))
@@ -119,7 +121,7 @@ class CreatingWorldScene(AbstractScene):
         game_state.center_camera_on_player()
         game_state.player_entity.notify_position_observers()  # Must notify the initial state
 
-        if map_file_path == 'resources/maps/challenge.json':
+        if map_file_path == CHALLENGE_MAP_FILE_PATH:
             world_behavior = ChallengeBehavior(
                 self.picking_hero_scene, self.challenge_complete_scene, game_state, self.ui_view.info_message,
                 game_engine, self.flags)
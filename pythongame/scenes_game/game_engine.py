@@ -1,21 +1,25 @@
-from typing import Tuple
+from typing import Tuple, Dict
+
+from pygame.rect import Rect
 
 from pythongame.core.buff_effects import AbstractBuffEffect, get_buff_effect
 from pythongame.core.common import *
 from pythongame.core.entity_creation import create_money_pile_on_ground, create_item_on_ground, \
     create_consumable_on_ground
+from pythongame.core.frame_profiler import FRAME_PROFILER
 from pythongame.core.game_data import CONSUMABLES, ITEMS, NON_PLAYER_CHARACTERS, allocate_input_keys_for_abilities, \
-    NpcCategory, PORTALS, ABILITIES
-from pythongame.core.game_state import GameState, ItemOnGround, ConsumableOnGround, LootableOnGround, BuffWithDuration, \
+    NpcCategory, PORTALS, ABILITIES, NpcActivity, MAX_DORMANT_CAMERA_MARGIN
+from pythongame.core.game_state import GameState, ItemOnGround, ConsumableOnGround, LootableOnGround, \
     EnemyDiedEvent, NonPlayerCharacter, Portal, PlayerLeveledUp, PlayerLearnedNewAbility, WarpPoint, Chest, \
-    PlayerUnlockedNewTalent, AgentBuffsUpdate
+    PlayerUnlockedNewTalent
 from pythongame.core.item_effects import get_item_effect, try_add_item_to_inventory
 from pythongame.core.item_inventory import ItemWasDeactivated, ItemWasActivated
 from pythongame.core.loot import LootEntry
-from pythongame.core.math import boxes_intersect, rects_intersect, sum_of_vectors, \
+from pythongame.core.math import boxes_intersect, sum_of_vectors, \
     get_rect_with_increased_size_in_all_directions, translate_in_direction
 from pythongame.core.sound_player import play_sound
 from pythongame.core.visual_effects import create_visual_exp_text, create_teleport_effects, VisualRect, VisualCircle
+from pythongame.core.world_regions import WorldRegions
 from pythongame.game_data.portals import PORTAL_DELAY
 from pythongame.scenes_game.game_ui_view import InfoMessage
 from pythongame.scenes_game.player_controls import PlayerControls
@@ -30,10 +34,17 @@ class GameEngine:
 
     def __init__(self, game_state: GameState, info_message: InfoMessage):
         self.game_state = game_state
+        self.game_state.world_regions = WorldRegions(game_state)
+        self.game_state.decorations_state.pack()
         self.info_message = info_message
         self.talent_was_unlocked = Observable()
         self.ability_was_clicked = Observable()
         self.consumable_was_clicked = Observable()
+        self._has_opened_chests = False
+        # How many NPCs were in each activity tier (see NpcActivity) in the last frame
+        self.num_active_npcs = 0
+        self.num_dormant_npcs = 0
+        self.num_sleeping_npcs = 0
 
     def try_use_ability(self, ability_type: AbilityType):
         PlayerControls.try_use_ability(ability_type, self.game_state, self.info_message)
@@ -61,9 +72,13 @@ class GameEngine:
 
     def _handle_item_equip_event(self, event):
         if isinstance(event, ItemWasDeactivated):
-            get_item_effect(event.item_type).apply_end_effect(self.game_state)
+            item_effect = get_item_effect(event.item_type)
+            item_effect.apply_end_effect(self.game_state)
+            self.game_state.player_state.unsubscribe_item_effect(item_effect)
         elif isinstance(event, ItemWasActivated):
-            get_item_effect(event.item_type).apply_start_effect(self.game_state)
+            item_effect = get_item_effect(event.item_type)
+            item_effect.apply_start_effect(self.game_state)
+            self.game_state.player_state.subscribe_item_effect(item_effect)
 
     def drag_consumable_between_inventory_slots(self, from_slot: int, to_slot: int):
         self.game_state.player_state.consumable_inventory.drag_consumable_between_inventory_slots(from_slot, to_slot)
@@ -159,10 +174,11 @@ class GameEngine:
         self.game_state.player_state.gain_buff_effect(teleport_buff_effect, PORTAL_DELAY)
 
     def open_chest(self, chest: Chest):
-        loot = chest.loot_table.generate_loot()
+        loot = chest.loot_table.generate_loot(self.game_state.random)
         chest_position = chest.world_entity.get_position()
         self._put_loot_on_ground(chest_position, loot)
         chest.has_been_opened = True
+        self._has_opened_chests = True
         visual_effects = [
             VisualRect((200, 0, 200), chest.world_entity.get_center_position(), 50, 100, Millis(100), 2),
             VisualRect((200, 0, 200), chest.world_entity.get_center_position(), 50, 100, Millis(180), 3)
@@ -178,17 +194,22 @@ class GameEngine:
 
         events = []
 
-        for npc in self.game_state.non_player_characters:
-            # NonPlayerCharacter AI shouldn't run if enemy is too far out of sight
-            if self._is_npc_close_to_camera(npc) and not npc.stun_status.is_stunned():
-                npc.npc_mind.control_npc(self.game_state, npc, self.game_state.player_entity,
-                                         self.game_state.player_state.is_invisible, time_passed)
+        self.game_state.simulated_time += time_passed
+        # Buffs that expire are only marked here. They are ended when their agent handles its buffs.
+        self.game_state.scheduler.advance_to(self.game_state.simulated_time)
 
-        for projectile in self.game_state.projectile_entities:
-            projectile.projectile_controller.notify_time_passed(self.game_state, projectile, time_passed)
+        # NPCs far away from the camera are deactivated, and the ones that come closer are activated again
+        frozen_npcs_time_passed = self.game_state.world_regions.update(time_passed)
 
-        for visual_effect in self.game_state.visual_effects:
-            visual_effect.notify_time_passed(time_passed)
+        # Each kind of entity is updated in one pass (AI, buffs, animation and movement of an NPC, then the next NPC
+        # etc) rather than in one pass per kind of update
+        FRAME_PROFILER.start("npcs")
+        self._update_npcs(time_passed)
+        FRAME_PROFILER.stop("npcs")
+
+        FRAME_PROFILER.start("projectiles")
+        has_removed_projectiles = self._update_projectiles(time_passed)
+        FRAME_PROFILER.stop("projectiles")
 
         self.game_state.handle_camera_shake(time_passed)
 
@@ -196,7 +217,8 @@ class GameEngine:
         enemies_that_died = [e for e in npcs_that_died if e.is_enemy]
         if enemies_that_died:
             exp_gained = sum([NON_PLAYER_CHARACTERS[e.npc_type].exp_reward for e in enemies_that_died])
-            self.game_state.visual_effects.append(create_visual_exp_text(self.game_state.player_entity, exp_gained))
+            self.game_state.visual_effects.append(
+                create_visual_exp_text(self.game_state.player_entity, exp_gained, self.game_state.random))
             gain_exp_events = self.game_state.player_state.gain_exp(exp_gained)
             self._handle_gain_exp_events(gain_exp_events)
 
@@ -205,17 +227,20 @@ class GameEngine:
                     play_sound(enemy_that_died.death_sound_id)
                 else:
                     play_sound(SoundId.EVENT_ENEMY_DIED)
-                loot = enemy_that_died.enemy_loot_table.generate_loot()
+                loot = enemy_that_died.enemy_loot_table.generate_loot(self.game_state.random)
                 enemy_death_position = enemy_that_died.world_entity.get_position()
                 self._put_loot_on_ground(enemy_death_position, loot)
                 self.game_state.player_state.notify_about_event(EnemyDiedEvent(), self.game_state)
             events.append(EngineEvent.ENEMY_DIED)
 
-        self.game_state.remove_expired_projectiles()
-        self.game_state.remove_expired_visual_effects()
-        self.game_state.remove_opened_chests()
+        if has_removed_projectiles:
+            self.game_state.remove_expired_projectiles()
+        if self._has_opened_chests:
+            self._has_opened_chests = False
+            self.game_state.remove_opened_chests()
 
-        player_buffs_update = self.game_state.player_state.handle_buffs(time_passed)
+        FRAME_PROFILER.start("player")
+        player_buffs_update = self.game_state.player_state.handle_buffs()
         for buff in player_buffs_update.buffs_that_started:
             buff.buff_effect.apply_start_effect(self.game_state, self.game_state.player_entity, None)
         for buff in player_buffs_update.buffs_that_were_active:
@@ -227,15 +252,10 @@ class GameEngine:
         for buff in player_buffs_update.buffs_that_ended:
             buff.buff_effect.apply_end_effect(self.game_state, self.game_state.player_entity, None)
 
-        for enemy in self.game_state.non_player_characters:
-            enemy.health_resource.regenerate(time_passed)
-            buffs_update = handle_buffs(enemy.active_buffs, time_passed)
-            for buff in buffs_update.buffs_that_started:
-                buff.buff_effect.apply_start_effect(self.game_state, enemy.world_entity, enemy)
-            for buff in buffs_update.buffs_that_were_active:
-                buff.buff_effect.apply_middle_effect(self.game_state, enemy.world_entity, enemy, time_passed)
-            for buff in buffs_update.buffs_that_ended:
-                buff.buff_effect.apply_end_effect(self.game_state, enemy.world_entity, enemy)
+        # NPCs in inactive world regions are only updated once in a while
+        if frozen_npcs_time_passed:
+            for npc in self.game_state.world_regions.get_frozen_npcs():
+                self._catch_up_npc_health_and_buffs(npc)
 
         for item_effect in self.game_state.player_state.item_inventory.get_all_active_item_effects():
             item_effect.apply_middle_effect(self.game_state, time_passed)
@@ -245,64 +265,61 @@ class GameEngine:
         self.game_state.player_state.recharge_ability_cooldowns(time_passed)
 
         self.game_state.player_entity.update_movement_animation(time_passed)
-        for npc in self.game_state.non_player_characters:
-            npc.world_entity.update_movement_animation(time_passed)
-        for projectile in self.game_state.projectile_entities:
-            projectile.world_entity.update_movement_animation(time_passed)
         for warp_point in self.game_state.warp_points:
             warp_point.world_entity.update_animation(time_passed)
-
-        for npc in self.game_state.non_player_characters:
-            # Enemies shouldn't move towards player when they are out of sight
-            if self._is_npc_close_to_camera(npc) and not npc.stun_status.is_stunned():
-                self.game_state.update_npc_position_within_game_world(npc, time_passed)
         # player can still move when stunned (could be charging)
         self.game_state.update_world_entity_position_within_game_world(self.game_state.player_entity, time_passed)
-        for projectile in self.game_state.projectile_entities:
-            new_pos = projectile.world_entity.get_new_position_according_to_dir_and_speed(time_passed)
-            projectile.world_entity.set_position(new_pos)
+        FRAME_PROFILER.stop("player")
 
-        for visual_effect in self.game_state.visual_effects:
-            visual_effect.update_position_if_attached_to_entity()
-            if visual_effect.attached_to_entity:
-                npcs = [e.world_entity for e in self.game_state.non_player_characters]
-                projectiles = [p.world_entity for p in self.game_state.projectile_entities]
-                if not visual_effect.attached_to_entity in npcs + projectiles + [self.game_state.player_entity]:
-                    visual_effect.has_expired = True
+        FRAME_PROFILER.start("visual_effects")
+        self._update_visual_effects(time_passed)
+        FRAME_PROFILER.stop("visual_effects")
 
         # ------------------------------------
         #          HANDLE COLLISIONS
         # ------------------------------------
 
+        FRAME_PROFILER.start("collisions")
+        has_picked_up_money = False
         for money_pile in self.game_state.money_piles_on_ground:
             if boxes_intersect(self.game_state.player_entity.rect(), money_pile.world_entity.rect()):
                 play_sound(SoundId.EVENT_PICKED_UP_MONEY)
                 money_pile.has_been_picked_up_and_should_be_removed = True
+                has_picked_up_money = True
                 self.game_state.player_state.modify_money(money_pile.amount)
 
-        for enemy in [e for e in self.game_state.non_player_characters if e.is_enemy]:
-            for projectile in self.game_state.get_projectiles_intersecting_with(enemy.world_entity):
-                if not projectile.has_collided_and_should_be_removed:
+        # Projectiles hit NPCs in all activity tiers, so the NPCs are looked up around each projectile
+        has_destroyed_projectiles = False
+        for projectile in self.game_state.projectile_entities:
+            if projectile.has_collided_and_should_be_removed:
+                continue
+            npcs = self.game_state.get_npcs_intersecting_rect(projectile.world_entity.rect())
+            for enemy in npcs:
+                if enemy.is_enemy and not projectile.has_collided_and_should_be_removed:
                     projectile.projectile_controller.apply_enemy_collision(enemy, self.game_state, projectile)
-
-        for player_summon in [npc for npc in self.game_state.non_player_characters
-                              if npc.npc_category == NpcCategory.PLAYER_SUMMON]:
-            for projectile in self.game_state.get_projectiles_intersecting_with(player_summon.world_entity):
-                if not projectile.has_collided_and_should_be_removed:
+            for player_summon in npcs:
+                if player_summon.npc_category == NpcCategory.PLAYER_SUMMON \
+                        and not projectile.has_collided_and_should_be_removed:
                     projectile.projectile_controller.apply_player_summon_collision(player_summon, self.game_state,
                                                                                    projectile)
+            has_destroyed_projectiles |= projectile.has_collided_and_should_be_removed
 
         for projectile in self.game_state.get_projectiles_intersecting_with(self.game_state.player_entity):
             if not projectile.has_collided_and_should_be_removed:
                 projectile.projectile_controller.apply_player_collision(self.game_state, projectile)
+                has_destroyed_projectiles |= projectile.has_collided_and_should_be_removed
 
         for projectile in self.game_state.projectile_entities:
             if not projectile.has_collided_and_should_be_removed:
                 if self.game_state.walls_state.does_entity_intersect_with_wall(projectile.world_entity):
                     projectile.projectile_controller.apply_wall_collision(self.game_state, projectile)
+                    has_destroyed_projectiles |= projectile.has_collided_and_should_be_removed
 
-        self.game_state.remove_money_piles_that_have_been_picked_up()
-        self.game_state.remove_projectiles_that_have_been_destroyed()
+        if has_picked_up_money:
+            self.game_state.remove_money_piles_that_have_been_picked_up()
+        if has_destroyed_projectiles:
+            self.game_state.remove_projectiles_that_have_been_destroyed()
+        FRAME_PROFILER.stop("collisions")
 
         # ------------------------------------
         #       UPDATE CAMERA POSITION
@@ -315,6 +332,89 @@ class GameEngine:
 
         return events
 
+    # NPCs are updated depending on how close they are to the camera (see NpcActivity). Only the NPCs that are within
+    # MAX_DORMANT_CAMERA_MARGIN of the camera are looked at, as all others are sleeping.
+    def _update_npcs(self, time_passed: Millis):
+        game_state = self.game_state
+        player_entity = game_state.player_entity
+        is_player_invisible = game_state.player_state.is_invisible
+        camera_world_area = game_state.camera_world_area
+        # The camera only moves at the end of the frame, so the active and dormant areas are the same for all NPCs
+        activity_areas: Dict[NpcActivity, Tuple[Rect, Rect]] = {}
+        num_active_npcs = 0
+        num_dormant_npcs = 0
+        num_sleeping_npcs = 0
+        npcs_close_to_camera = game_state.get_npcs_intersecting_rect(
+            Rect(get_rect_with_increased_size_in_all_directions(camera_world_area, MAX_DORMANT_CAMERA_MARGIN)))
+        for npc in npcs_close_to_camera:
+            if npc.health_resource.is_at_or_below_zero():
+                # It's removed, together with any other dead NPCs, after this
+                game_state.may_have_dead_npcs = True
+                continue
+            activity = npc.activity
+            areas = activity_areas.get(activity)
+            if areas is None:
+                areas = (Rect(get_rect_with_increased_size_in_all_directions(
+                    camera_world_area, activity.active_camera_margin)),
+                         Rect(get_rect_with_increased_size_in_all_directions(
+                             camera_world_area, activity.dormant_camera_margin)))
+                activity_areas[activity] = areas
+            active_area, dormant_area = areas
+            world_entity = npc.world_entity
+            if world_entity.pygame_collision_rect.colliderect(active_area):
+                num_active_npcs += 1
+                if not npc.stun_status.is_stunned():
+                    npc.npc_mind.control_npc(game_state, npc, player_entity, is_player_invisible, time_passed)
+                self._catch_up_npc_health_and_buffs(npc)
+                world_entity.update_movement_animation(time_passed)
+                # The NPC may have been moved or stunned by its mind or buffs
+                if world_entity.pygame_collision_rect.colliderect(active_area) and not npc.stun_status.is_stunned():
+                    game_state.update_npc_position_within_game_world(npc, time_passed)
+            elif world_entity.pygame_collision_rect.colliderect(dormant_area):
+                num_dormant_npcs += 1
+                if game_state.simulated_time - npc.last_simulated_time >= activity.dormant_tick_interval:
+                    world_entity.update_movement_animation(self._catch_up_npc_health_and_buffs(npc))
+            else:
+                num_sleeping_npcs += 1
+        # NPCs further away from the camera, and those in inactive world regions, are sleeping too
+        num_sleeping_npcs += len(game_state.non_player_characters) - len(npcs_close_to_camera)
+        if game_state.world_regions:
+            num_sleeping_npcs += game_state.world_regions.get_num_inactive_npcs()
+        self.num_active_npcs = num_active_npcs
+        self.num_dormant_npcs = num_dormant_npcs
+        self.num_sleeping_npcs = num_sleeping_npcs
+
+    # Returns whether or not any projectile expired
+    def _update_projectiles(self, time_passed: Millis) -> bool:
+        game_state = self.game_state
+        has_expired_projectiles = False
+        for projectile in game_state.projectile_entities:
+            projectile.projectile_controller.notify_time_passed(game_state, projectile, time_passed)
+            world_entity = projectile.world_entity
+            world_entity.update_movement_animation(time_passed)
+            world_entity.set_position(world_entity.get_new_position_according_to_dir_and_speed(time_passed))
+            has_expired_projectiles |= projectile.has_expired
+        return has_expired_projectiles
+
+    def _update_visual_effects(self, time_passed: Millis):
+        game_state = self.game_state
+        # Only gathered if some visual effect is attached to an entity
+        entities_in_game = None
+        has_expired_visual_effects = False
+        for visual_effect in game_state.visual_effects:
+            visual_effect.notify_time_passed(time_passed)
+            visual_effect.update_position_if_attached_to_entity()
+            if visual_effect.attached_to_entity:
+                if entities_in_game is None:
+                    entities_in_game = {npc.world_entity for npc in game_state.non_player_characters}
+                    entities_in_game.update(p.world_entity for p in game_state.projectile_entities)
+                    entities_in_game.add(game_state.player_entity)
+                if visual_effect.attached_to_entity not in entities_in_game:
+                    visual_effect.has_expired = True
+            has_expired_visual_effects |= visual_effect.has_expired
+        if has_expired_visual_effects:
+            game_state.remove_expired_visual_effects()
+
     def _handle_gain_exp_events(self, gain_exp_events):
         did_level_up = False
         new_abilities: List[str] = []
@@ -343,15 +443,42 @@ class GameEngine:
             self.talent_was_unlocked.notify(None)
             self.info_message.enqueue_message("You can pick a talent!")
 
-    def _is_npc_close_to_camera(self, npc: NonPlayerCharacter):
-        camera_rect_with_margin = get_rect_with_increased_size_in_all_directions(
-            self.game_state.camera_world_area, 100)
-        return rects_intersect(npc.world_entity.rect(), camera_rect_with_margin)
+    # Updates the NPC with all the time that has passed since it was last updated. Returns that time.
+    def _catch_up_npc_health_and_buffs(self, npc: NonPlayerCharacter) -> Millis:
+        time_passed = Millis(self.game_state.simulated_time - npc.last_simulated_time)
+        npc.last_simulated_time = self.game_state.simulated_time
+        if time_passed > 0:
+            self._update_npc_health_and_buffs(npc, time_passed)
+        return time_passed
+
+    def _update_npc_health_and_buffs(self, npc: NonPlayerCharacter, time_passed: Millis):
+        npc.health_resource.regenerate(time_passed)
+        if not npc.active_buffs:
+            return
+        buffs_update = npc.handle_buffs()
+        for buff in buffs_update.buffs_that_started:
+            buff.buff_effect.apply_start_effect(self.game_state, npc.world_entity, npc)
+        # Buffs that damage over time etc use timers that can only fire once per call, so when an NPC is caught up after
+        # having been dormant or asleep, the time is handed to them in steps no longer than the dormant tick interval.
+        # A buff only gets the time that it had left (but at least one step, like a buff that ends during a regular
+        # update), so that its effect doesn't grow with how long the NPC was left alone.
+        max_step = npc.activity.dormant_tick_interval
+        previous_simulated_time = npc.last_simulated_time - time_passed
+        for buff in buffs_update.buffs_that_were_active:
+            time_left = min(time_passed, max(buff.get_remaining_duration_at(previous_simulated_time), max_step))
+            while True:
+                step = min(time_left, max_step)
+                buff.buff_effect.apply_middle_effect(self.game_state, npc.world_entity, npc, Millis(step))
+                time_left -= step
+                if time_left <= 0 or npc.health_resource.is_at_or_below_zero():
+                    break
+        for buff in buffs_update.buffs_that_ended:
+            buff.buff_effect.apply_end_effect(self.game_state, npc.world_entity, npc)
 
     def _put_loot_on_ground(self, enemy_death_position: Tuple[int, int], loot: List[LootEntry]):
         for loot_entry in loot:
             if len(loot) > 1:
-                position_offset = (random.randint(-20, 20), random.randint(-20, 20))
+                position_offset = (self.game_state.random.randint(-20, 20), self.game_state.random.randint(-20, 20))
             else:
                 position_offset = (0, 0)
             loot_position = sum_of_vectors(enemy_death_position, position_offset)
@@ -366,21 +493,3 @@ class GameEngine:
                 consumable_on_ground = create_consumable_on_ground(loot_entry.consumable_type, loot_position)
                 self.game_state.consumables_on_ground.append(consumable_on_ground)
 
-
-def handle_buffs(active_buffs: List[BuffWithDuration], time_passed: Millis) -> AgentBuffsUpdate:
-    # NOTE: duplication between NPC's and player's buff handling
-    copied_buffs_list = list(active_buffs)
-    buffs_that_started = []
-    buffs_that_ended = []
-    buffs_that_were_active = []
-    for buff in copied_buffs_list:
-        buff.notify_time_passed(time_passed)
-        if not buff.has_been_force_cancelled:
-            buffs_that_were_active.append(buff)
-        if not buff.has_applied_start_effect:
-            buffs_that_started.append(buff)
-            buff.has_applied_start_effect = True
-        elif buff.has_expired():
-            active_buffs.remove(buff)
-            buffs_that_ended.append(buff)
-    return AgentBuffsUpdate(buffs_that_started, buffs_that_were_active, buffs_that_ended)
@@ -1,7 +1,7 @@
 import sys
 from typing import List, Any
 
-from pythongame.core.game_state import GameState, WorldEntity, LootableOnGround
+from pythongame.core.game_state import GameState, WorldEntity, LootableOnGround, Portal, WarpPoint, Chest
 from pythongame.core.math import boxes_intersect, is_x_and_y_within_distance, \
     get_manhattan_distance_between_rects
 from pythongame.core.npc_behaviors import has_npc_dialog
@@ -57,3 +57,17 @@ class PlayerInteractionsState:
 
     def get_entity_to_interact_with(self):
         return self.entity_to_interact_with
+
+
+# Interacting with NPCs is handled separately, as it opens a dialog
+def interact_with_entity(entity: Any, game_engine: GameEngine):
+    if isinstance(entity, LootableOnGround):
+        game_engine.try_pick_up_loot_from_ground(entity)
+    elif isinstance(entity, Portal):
+        game_engine.interact_with_portal(entity)
+    elif isinstance(entity, WarpPoint):
+        game_engine.use_warp_point(entity)
+    elif isinstance(entity, Chest):
+        game_engine.open_chest(entity)
+    else:
+        raise Exception("Unhandled entity: " + str(entity))
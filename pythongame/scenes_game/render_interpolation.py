@@ -0,0 +1,66 @@
+from typing import Dict, Tuple, List
+
+from pythongame.core.game_state import GameState, WorldEntity
+
+# If something moved further than this during one simulation tick, it was teleported (by a warp point for example)
+# rather than moved, and is rendered where it is without interpolating.
+MAX_INTERPOLATION_DISTANCE = 100
+
+
+# The game is simulated with a fixed time step, but rendered as often as possible. In between two simulation ticks,
+# moving entities (and the camera) are rendered at a position in between where they were before the last tick and
+# where they are now, so that movement looks smooth even if the number of ticks per rendered frame varies.
+class RenderInterpolation:
+    def __init__(self):
+        self._previous_positions: Dict[WorldEntity, Tuple[float, float]] = {}
+        self._previous_camera_position: Tuple[int, int] = None
+        # Positions that have been overwritten by apply(), and that are put back by restore()
+        self._actual_positions: List[Tuple[WorldEntity, float, float]] = []
+        self._actual_camera_position: Tuple[int, int] = None
+
+    # Called before each simulation tick
+    def save_positions(self, game_state: GameState):
+        previous_positions = {game_state.player_entity: (game_state.player_entity.x, game_state.player_entity.y)}
+        for npc in game_state.non_player_characters:
+            previous_positions[npc.world_entity] = (npc.world_entity.x, npc.world_entity.y)
+        for projectile in game_state.projectile_entities:
+            previous_positions[projectile.world_entity] = (projectile.world_entity.x, projectile.world_entity.y)
+        self._previous_positions = previous_positions
+        self._previous_camera_position = game_state.camera_world_area.topleft
+
+    # Temporarily moves entities and the camera to where they should be rendered. The ratio is how far (0 to 1) the
+    # simulation has come from the last tick towards the next one. Positions are only changed for rendering, so
+    # buckets and observers are not updated.
+    def apply(self, game_state: GameState, ratio: float):
+        for entity, (previous_x, previous_y) in self._previous_positions.items():
+            x, y = entity.x, entity.y
+            if (x, y) != (previous_x, previous_y) and _is_close(x - previous_x, y - previous_y):
+                self._actual_positions.append((entity, x, y))
+                _set_render_position(entity, previous_x + (x - previous_x) * ratio,
+                                     previous_y + (y - previous_y) * ratio)
+        if self._previous_camera_position is not None:
+            camera_x, camera_y = game_state.camera_world_area.topleft
+            previous_x, previous_y = self._previous_camera_position
+            if _is_close(camera_x - previous_x, camera_y - previous_y):
+                self._actual_camera_position = (camera_x, camera_y)
+                game_state.camera_world_area.topleft = (round(previous_x + (camera_x - previous_x) * ratio),
+                                                        round(previous_y + (camera_y - previous_y) * ratio))
+
+    def restore(self, game_state: GameState):
+        for entity, x, y in self._actual_positions:
+            _set_render_position(entity, x, y)
+        self._actual_positions = []
+        if self._actual_camera_position is not None:
+            game_state.camera_world_area.topleft = self._actual_camera_position
+            self._actual_camera_position = None
+
+
+def _is_close(dx: float, dy: float) -> bool:
+    return abs(dx) <= MAX_INTERPOLATION_DISTANCE and abs(dy) <= MAX_INTERPOLATION_DISTANCE
+
+
+def _set_render_position(entity: WorldEntity, x: float, y: float):
+    entity.x = x
+    entity.y = y
+    entity.pygame_collision_rect.x = x
+    entity.pygame_collision_rect.y = y
@@ -1,9 +1,8 @@
 from typing import Optional, Any, List, Tuple, Callable
 
-import pythongame.core.pathfinding.npc_pathfinding
-import pythongame.core.pathfinding.npc_pathfinding
 import pythongame.core.pathfinding.npc_pathfinding
 from pythongame.core.common import Millis, SoundId, AbstractScene, SceneTransition, NpcType
+from pythongame.core.frame_profiler import FRAME_PROFILER
 from pythongame.core.game_data import CONSUMABLES, ITEMS
 from pythongame.core.game_state import GameState, NonPlayerCharacter, LootableOnGround, Portal, WarpPoint, \
     ConsumableOnGround, ItemOnGround, Chest
@@ -19,12 +18,14 @@ from pythongame.core.user_input import ActionTryUseAbility, ActionTryUsePotion,
 from pythongame.core.view.game_world_view import GameWorldView, EntityActionText
 from pythongame.core.world_behavior import AbstractWorldBehavior
 from pythongame.player_file import SaveFileHandler
+from pythongame.replay import ReplayRecorder
 from pythongame.scenes_game.game_engine import GameEngine
 from pythongame.scenes_game.game_ui_view import DragItemBetweenInventorySlots, DropItemOnGround, \
     DragConsumableBetweenInventorySlots, DropConsumableOnGround, \
     PickTalent, StartDraggingItemOrConsumable, TrySwitchItemInInventory, ToggleSound, SaveGame, EventTriggeredFromUi
 from pythongame.scenes_game.game_ui_view import GameUiView
-from pythongame.scenes_game.player_environment_interactions import PlayerInteractionsState
+from pythongame.scenes_game.player_environment_interactions import PlayerInteractionsState, interact_with_entity
+from pythongame.scenes_game.render_interpolation import RenderInterpolation
 from pythongame.scenes_game.scene_paused import PausedScene
 from pythongame.scenes_game.ui_events import ToggleFullscreen, ToggleWindow
 
@@ -40,10 +41,12 @@ class PlayingScene(AbstractScene):
                  character_file: Optional[str],
                  save_file_handler: SaveFileHandler,
                  total_time_played_on_character: Millis,
-                 toggle_fullscreen_callback: Callable[[], Any]):
+                 toggle_fullscreen_callback: Callable[[], Any],
+                 replay_recorder: Optional[ReplayRecorder]):
 
         self.player_interactions_state = PlayerInteractionsState()
         self.world_view = world_view
+        self.world_view.prefetch_images(game_state.get_all_sprites())
         self.render_hit_and_collision_boxes = False
         self.total_time_played = 0
         self.game_state: GameState = game_state
@@ -56,6 +59,9 @@ class PlayingScene(AbstractScene):
         self.save_file_handler = save_file_handler
         self.total_time_played_on_character = total_time_played_on_character
         self.toggle_fullscreen_callback = toggle_fullscreen_callback
+        self.render_interpolation = RenderInterpolation()
+        self.render_interpolation_ratio = 0
+        self.replay_recorder = replay_recorder
 
     def on_enter(self):
         self.ui_view.set_paused(False)
@@ -104,6 +110,8 @@ class PlayingScene(AbstractScene):
         else:
             user_actions = self.user_input_handler.get_actions(events)
             for action in user_actions:
+                if self.replay_recorder:
+                    self.replay_recorder.record_action(action)
                 if isinstance(action, ActionToggleRenderDebugging):
                     self.render_hit_and_collision_boxes = not self.render_hit_and_collision_boxes
                     # TODO: Handle this better than accessing a global variable from here
@@ -140,21 +148,19 @@ class PlayingScene(AbstractScene):
                             option_index = self.ui_view.start_dialog_with_npc(ready_entity, dialog_data)
                             play_sound(SoundId.DIALOG)
                             hover_npc_action(npc_type, option_index, self.game_state, self.ui_view)
-                        elif isinstance(ready_entity, LootableOnGround):
-                            self.game_engine.try_pick_up_loot_from_ground(ready_entity)
-                        elif isinstance(ready_entity, Portal):
-                            self.game_engine.interact_with_portal(ready_entity)
-                        elif isinstance(ready_entity, WarpPoint):
-                            self.game_engine.use_warp_point(ready_entity)
-                        elif isinstance(ready_entity, Chest):
-                            self.game_engine.open_chest(ready_entity)
+                            if self.replay_recorder:
+                                self.replay_recorder.stop("Dialogs with NPCs can't be replayed")
                         else:
-                            raise Exception("Unhandled entity: " + str(ready_entity))
+                            if self.replay_recorder:
+                                self.replay_recorder.record_command(["interact"])
+                            interact_with_entity(ready_entity, self.game_engine)
                 elif isinstance(action, ActionPressKey):
                     events_triggered_from_ui += self.ui_view.handle_key_press(action.key)
 
         # TODO Much noise below around playing sounds. Perhaps game_engine should play the sounds in these cases?
         for event in events_triggered_from_ui:
+            if self.replay_recorder:
+                self._record_ui_event(event)
             if isinstance(event, StartDraggingItemOrConsumable):
                 play_sound(SoundId.UI_START_DRAGGING_ITEM)
             elif isinstance(event, DragItemBetweenInventorySlots):
@@ -200,6 +206,23 @@ class PlayingScene(AbstractScene):
         if transition_to_pause:
             return SceneTransition(PausedScene(self, self.world_view, self.ui_view, self.game_state))
 
+    def _record_ui_event(self, event: EventTriggeredFromUi):
+        if isinstance(event, DragItemBetweenInventorySlots):
+            self.replay_recorder.record_command(["drag_item", event.from_slot, event.to_slot])
+        elif isinstance(event, DropItemOnGround):
+            world_position = _get_mouse_world_pos(self.game_state, event.screen_position)
+            self.replay_recorder.record_command(["drop_item", event.from_slot, world_position[0], world_position[1]])
+        elif isinstance(event, DragConsumableBetweenInventorySlots):
+            self.replay_recorder.record_command(["drag_consumable", event.from_slot, event.to_slot])
+        elif isinstance(event, DropConsumableOnGround):
+            world_position = _get_mouse_world_pos(self.game_state, event.screen_position)
+            self.replay_recorder.record_command(
+                ["drop_consumable", event.from_slot, world_position[0], world_position[1]])
+        elif isinstance(event, PickTalent):
+            self.replay_recorder.record_command(["talent", event.tier_index, event.option_index])
+        elif isinstance(event, TrySwitchItemInInventory):
+            self.replay_recorder.record_command(["switch_item", event.slot])
+
     def _handle_dialog_change_option(self, npc_type: NpcType, previous_index: int, new_index: int):
         play_sound(SoundId.DIALOG)
         blur_npc_action(npc_type, previous_index, self.game_state, self.ui_view)
@@ -207,6 +230,7 @@ class PlayingScene(AbstractScene):
 
     def run_one_frame(self, time_passed: Millis) -> Optional[SceneTransition]:
 
+        self.render_interpolation.save_positions(self.game_state)
         self.total_time_played += time_passed
         self.total_time_played_on_character += time_passed
 
@@ -223,13 +247,25 @@ class PlayingScene(AbstractScene):
         self.ui_view.update(time_passed)
         for event in engine_events:
             scene_transition = self.world_behavior.handle_event(event)
+        if self.replay_recorder:
+            self.replay_recorder.record_tick(self.game_state)
 
         if scene_transition is not None:
             return scene_transition
 
         return None
 
+    def set_render_interpolation(self, ratio: float):
+        self.render_interpolation_ratio = ratio
+
     def render(self):
+        self.render_interpolation.apply(self.game_state, self.render_interpolation_ratio)
+        try:
+            self._render_world_and_ui()
+        finally:
+            self.render_interpolation.restore(self.game_state)
+
+    def _render_world_and_ui(self):
 
         entity_action_text = None
         # Don't display any actions on screen if player is stunned. It would look weird when using warp stones
@@ -238,9 +274,11 @@ class PlayingScene(AbstractScene):
             if ready_entity is not None:
                 entity_action_text = _get_entity_action_text(ready_entity, self.user_input_handler.is_shift_held_down())
 
+        FRAME_PROFILER.start("world_render")
         self.world_view.render_world(
             all_entities_to_render=self.game_state.get_all_entities_to_render(),
-            decorations_to_render=self.game_state.get_decorations_to_render(),
+            walls_state=self.game_state.walls_state,
+            decorations_state=self.game_state.decorations_state,
             player_entity=self.game_state.player_entity,
             is_player_invisible=self.game_state.player_state.is_invisible,
             player_active_buffs=self.game_state.player_state.active_buffs,
@@ -252,8 +290,11 @@ class PlayingScene(AbstractScene):
             player_max_health=self.game_state.player_state.health_resource.max_value,
             entire_world_area=self.game_state.entire_world_area,
             entity_action_text=entity_action_text)
+        FRAME_PROFILER.stop("world_render")
 
+        FRAME_PROFILER.start("ui_render")
         self.ui_view.render()
+        FRAME_PROFILER.stop("ui_render")
 
     def _save_game(self):
         play_sound(SoundId.EVENT_SAVED_GAME)
@@ -2,13 +2,29 @@
 
 import argparse
 
-from pythongame import main
-
 parser = argparse.ArgumentParser()
 parser.add_argument('--map')
 parser.add_argument('--hero')
 parser.add_argument('--level')
 parser.add_argument('--money')
+parser.add_argument('--headless', action='store_true', help='simulate the game without display, audio or fonts')
+parser.add_argument('--frames', type=int, default=1000, help='number of frames to simulate (headless only)')
+parser.add_argument('--time-step', type=int, default=16, help='fixed time step in ms that the game is simulated with')
+parser.add_argument('--seed', type=int, help='seed for the random generator of the game (headless only)')
+parser.add_argument('--record', metavar='FILE', help='record the game, so that it can be replayed with --replay')
+parser.add_argument('--replay', metavar='FILE', help='replay a recorded game without display, audio or fonts')
 args = parser.parse_args()
 
-main.start(args.map, args.hero, args.level, args.money)
+# Only import the module that is used, as the headless one shouldn't touch pygame's display
+if args.replay:
+    from pythongame import headless
+
+    headless.start_replay(args.replay)
+elif args.headless:
+    from pythongame import headless
+
+    headless.start(args.map, args.hero, args.frames, args.time_step, args.seed)
+else:
+    from pythongame import main
+
+    main.start(args.map, args.hero, args.level, args.money, args.time_step, args.record)
@@ -0,0 +1,157 @@
+import unittest
+from typing import List, Tuple, Optional, Dict
+
+from pythongame.core.game_state import BuffWithDuration, _handle_agent_buffs
+from pythongame.core.timing_wheel import TimingWheel
+
+TIME_STEP = 16
+
+
+# How buffs were handled before they were scheduled on the timing wheel: every time the agent handled its buffs, each
+# buff was counted down by the time that had passed since the last time.
+class CountdownBuff:
+    def __init__(self, name: str, duration: int):
+        self.name = name
+        self.time_until_expiration = duration
+        self.total_duration = duration
+        self.has_applied_start_effect = False
+
+    def set_remaining_duration(self, time: int):
+        self.time_until_expiration = time
+
+    def change_remaining_duration(self, delta: int):
+        self.time_until_expiration = min(self.time_until_expiration + delta, self.total_duration)
+
+    def force_cancel(self):
+        self.time_until_expiration = 0
+
+
+class CountdownAgent:
+    def __init__(self):
+        self.active_buffs: List[CountdownBuff] = []
+
+    def gain_buff(self, name: str, duration: int):
+        existing = [b for b in self.active_buffs if b.name == name]
+        if existing:
+            existing[0].set_remaining_duration(duration)
+        else:
+            self.active_buffs.append(CountdownBuff(name, duration))
+
+    def get_buff(self, name: str) -> CountdownBuff:
+        return [b for b in self.active_buffs if b.name == name][0]
+
+    def handle_buffs(self, time: int, time_passed: int) -> List[str]:
+        ended = []
+        for buff in list(self.active_buffs):
+            buff.time_until_expiration -= time_passed
+            if not buff.has_applied_start_effect:
+                buff.has_applied_start_effect = True
+            elif buff.time_until_expiration <= 0:
+                self.active_buffs.remove(buff)
+                ended.append(buff.name)
+        return ended
+
+
+class _Effect:
+    def __init__(self, name: str):
+        self.name = name
+
+
+# The same agent with buffs on a timing wheel, like an NPC or the player
+class ScheduledAgent:
+    def __init__(self):
+        self.scheduler = TimingWheel()
+        self.last_simulated_time = 0
+        self.active_buffs: List[BuffWithDuration] = []
+        self._buffs_to_start: List[BuffWithDuration] = []
+        self._expired_buffs: List[BuffWithDuration] = []
+
+    def gain_buff(self, name: str, duration: int):
+        existing = [b for b in self.active_buffs if b.buff_effect.name == name]
+        if existing:
+            existing[0].set_remaining_duration(duration)
+        else:
+            buff = BuffWithDuration(_Effect(name), duration, self, self._expired_buffs.append)
+            self.active_buffs.append(buff)
+            self._buffs_to_start.append(buff)
+
+    def get_buff(self, name: str) -> BuffWithDuration:
+        return [b for b in self.active_buffs if b.buff_effect.name == name][0]
+
+    def handle_buffs(self, time: int, time_passed: int) -> List[str]:
+        self.last_simulated_time = time
+        update = _handle_agent_buffs(self.active_buffs, self._buffs_to_start, self._expired_buffs)
+        return [b.buff_effect.name for b in update.buffs_that_ended]
+
+
+# An action is (frame, whether it happens before or after the agent handles its buffs in that frame, what it does)
+Action = Tuple[int, bool, str, str, int]
+
+
+def get_buff_end_frames(agent, actions: List[Action], handling_interval: int, num_frames: int) -> Dict[str, int]:
+    end_frames = {}
+    time = 0
+    last_handling_time = 0
+    for frame in range(num_frames):
+        time += TIME_STEP
+        if isinstance(agent, ScheduledAgent):
+            agent.scheduler.advance_to(time)
+        is_handling_frame = frame % handling_interval == 0
+
+        def do_actions(before_handling: bool):
+            for action_frame, is_before, action, name, amount in actions:
+                if action_frame == frame and is_before == before_handling:
+                    if action == "gain":
+                        agent.gain_buff(name, amount)
+                    elif action == "change":
+                        agent.get_buff(name).change_remaining_duration(amount)
+                    elif action == "cancel":
+                        agent.get_buff(name).force_cancel()
+
+        do_actions(True)
+        if is_handling_frame:
+            for name in agent.handle_buffs(time, time - last_handling_time):
+                end_frames[name] = frame
+            last_handling_time = time
+        do_actions(False)
+    return end_frames
+
+
+class TestBuffDurations(unittest.TestCase):
+
+    def assert_same_end_frames(self, actions: List[Action], handling_interval: int = 1, num_frames: int = 300):
+        expected = get_buff_end_frames(CountdownAgent(), actions, handling_interval, num_frames)
+        actual = get_buff_end_frames(ScheduledAgent(), actions, handling_interval, num_frames)
+        self.assertTrue(expected)
+        self.assertEqual(expected, actual)
+
+    def test_gained_before_and_after_handling(self):
+        self.assert_same_end_frames([(3, True, "gain", "a", 500), (3, False, "gain", "b", 500),
+                                     (4, True, "gain", "c", 16), (4, False, "gain", "d", 16),
+                                     (5, True, "gain", "e", 1), (5, False, "gain", "f", 0)])
+
+    def test_regained_before_and_after_handling(self):
+        self.assert_same_end_frames([(0, True, "gain", "a", 500), (10, True, "gain", "a", 300),
+                                     (0, True, "gain", "b", 500), (10, False, "gain", "b", 300)])
+
+    def test_changed_remaining_duration(self):
+        self.assert_same_end_frames([(0, False, "gain", "a", 500), (5, True, "change", "a", 1000),
+                                     (0, False, "gain", "b", 500), (5, False, "change", "b", -200),
+                                     (0, True, "gain", "c", 500), (20, True, "change", "c", -1000)])
+
+    def test_force_cancelled(self):
+        self.assert_same_end_frames([(0, True, "gain", "a", 500), (7, True, "cancel", "a", 0),
+                                     (0, True, "gain", "b", 500), (7, False, "cancel", "b", 0),
+                                     (2, False, "gain", "c", 500), (2, False, "cancel", "c", 0)])
+
+    # Like dormant NPCs, that handle their buffs a few times per second
+    def test_agent_that_handles_buffs_less_often(self):
+        for interval in [3, 16]:
+            self.assert_same_end_frames([(1, True, "gain", "a", 500), (2, False, "gain", "b", 100),
+                                         (5, True, "gain", "c", 1000), (40, True, "change", "c", 300),
+                                         (17, False, "gain", "d", 40), (50, True, "gain", "b", 200)],
+                                        handling_interval=interval)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from typing import List, Tuple
+
+from pythongame.core.pathfinding.flow_field import FlowField
+from pythongame.core.pathfinding.grid_astar_pathfinder import AStarStrategy
+from pythongame.core.pathfinding.wall_grid import WallGrid
+
+AGENT_SIZE = (2, 2)
+
+
+def create_grid(walls: List[Tuple[int, int]]) -> WallGrid:
+    grid = WallGrid(12, 12)
+    for wall in walls:
+        grid.add_wall(*wall)
+    return grid
+
+
+def is_free(grid: WallGrid, cell: Tuple[int, int]) -> bool:
+    return grid.get_clearance_map(AGENT_SIZE)[cell[0] * grid.height + cell[1]] == 1
+
+
+class TestFlowField(unittest.TestCase):
+
+    def assert_valid_path(self, grid: WallGrid, path: List[Tuple[int, int]], start: Tuple[int, int],
+                          goal: Tuple[int, int]):
+        self.assertEqual(start, path[0])
+        # Like A* searches, the path may end right above or to the left of the goal
+        self.assertIn(path[-1], [goal, (goal[0], goal[1] - 1), (goal[0] - 1, goal[1])])
+        for cell, next_cell in zip(path, path[1:]):
+            self.assertEqual(1, abs(cell[0] - next_cell[0]) + abs(cell[1] - next_cell[1]))
+        for cell in path[1:]:
+            self.assertTrue(is_free(grid, cell))
+
+    def test_path_from_free_cell(self):
+        grid = create_grid([(5, 5)])
+        flow_field = FlowField(grid, AGENT_SIZE, 20)
+        flow_field.compute((8, 4))
+        path = flow_field.get_path((1, 4))
+        self.assert_valid_path(grid, path, (1, 4), (8, 4))
+        self.assertLessEqual(len(path), len(AStarStrategy(grid, AGENT_SIZE).find_path((1, 4), (8, 4))))
+
+    # NPCs that are touching a wall often stand on a cell that isn't free for their size
+    def test_path_from_blocked_cell_next_to_free_cells(self):
+        grid = create_grid([(5, 5)])
+        start = (4, 4)
+        self.assertFalse(is_free(grid, start))
+        flow_field = FlowField(grid, AGENT_SIZE, 20)
+        flow_field.compute((8, 4))
+        path = flow_field.get_path(start)
+        self.assert_valid_path(grid, path, start, (8, 4))
+        self.assertLessEqual(len(path), len(AStarStrategy(grid, AGENT_SIZE).find_path(start, (8, 4))))
+
+    def test_no_path_from_blocked_cell_without_free_neighbors(self):
+        grid = create_grid([(5, 5), (4, 4), (6, 4), (4, 6), (6, 6)])
+        flow_field = FlowField(grid, AGENT_SIZE, 20)
+        flow_field.compute((8, 8))
+        self.assertIsNone(flow_field.get_path((4, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()